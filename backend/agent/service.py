@@ -3,10 +3,12 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Tuple
 
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from ..common.config import settings
 
 from ..common import models
+from ..common.counters import read_counts
 from ..policy.engine import evaluate_policies
 
 
@@ -119,22 +121,17 @@ class AgentService:
         return ans, "Heuristic narrative without external LLM."
 
     def narrative_summary(self, db: Session) -> dict:
-        anomalies = self._recent_anomalies(db, 12 * 60)
-        actions = self._recent_actions(db, 12 * 60)
-        incidents_open = (
-            db.query(models.Incident)
-            .filter(models.Incident.status == "open")
-            .count()
-        )
-        incidents_mitigated = (
-            db.query(models.Incident)
-            .filter(models.Incident.status == "mitigated")
-            .count()
-        )
-        downtime_avoided_min = 5 * len(actions)
+        cutoff = datetime.utcnow() - timedelta(hours=12)
+        # windowed counts stay on the (created_at, id) indexes; totals come from the counters table
+        anomalies = db.execute(select(func.count()).select_from(models.Anomaly).where(models.Anomaly.created_at >= cutoff)).scalar_one()
+        actions = db.execute(select(func.count()).select_from(models.Action).where(models.Action.created_at >= cutoff)).scalar_one()
+        counts = read_counts(db)
+        incidents_open = counts["incidents.open"]
+        incidents_mitigated = counts["incidents.mitigated"]
+        downtime_avoided_min = 5 * actions
         cost_avoided = downtime_avoided_min * 1500
         bullets = [
-            f"{len(anomalies)} anomalies observed in the last 12h; {len(actions)} remediation actions executed.",
+            f"{anomalies} anomalies observed in the last 12h; {actions} remediation actions executed.",
             f"{incidents_mitigated} incidents mitigated; {incidents_open} currently open.",
             f"Estimated downtime avoided: ~{downtime_avoided_min} minutes.",
             f"Estimated cost avoided: ${cost_avoided:,}.",
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002_metric_points'
+down_revision = '0001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'metric_series',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('metric', sa.String(length=64), nullable=False),
+        sa.Column('source', sa.String(length=128), nullable=False),
+        sa.Column('tags_key', sa.String(length=40), nullable=False),
+        sa.Column('tags', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('metric', 'source', 'tags_key', name='uq_metric_series_key'),
+    )
+    op.create_table(
+        'metric_points',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), primary_key=True, autoincrement=True),
+        sa.Column('series_id', sa.Integer(), sa.ForeignKey('metric_series.id'), nullable=False),
+        sa.Column('metric', sa.String(length=64), nullable=False),
+        sa.Column('ts', sa.DateTime(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+    )
+    op.create_index('ix_metric_points_metric_ts', 'metric_points', ['metric', 'ts'])
+    op.create_index('ix_metric_points_series_ts', 'metric_points', ['series_id', 'ts'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_metric_points_series_ts', table_name='metric_points')
+    op.drop_index('ix_metric_points_metric_ts', table_name='metric_points')
+    op.drop_table('metric_points')
+    op.drop_table('metric_series')
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = '0003_hot_path_indexes'
+down_revision = '0002_metric_points'
+branch_labels = None
+depends_on = None
+
+
+# composite indexes follow the endpoint filters (equality columns first, then the
+# created_at range/sort); the plain created_at ones serve unfiltered listings and
+# retention deletes
+INDEXES = [
+    ('ix_events_type_created_at', 'events', ['type', 'created_at']),
+    ('ix_events_created_at', 'events', ['created_at']),
+    ('ix_anomalies_metric_severity_created_at', 'anomalies', ['metric', 'severity', 'created_at']),
+    ('ix_anomalies_created_at', 'anomalies', ['created_at']),
+    ('ix_actions_name_created_at', 'actions', ['name', 'created_at']),
+    ('ix_actions_created_at', 'actions', ['created_at']),
+    ('ix_incidents_status_created_at', 'incidents', ['status', 'created_at']),
+    ('ix_incidents_created_at', 'incidents', ['created_at']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
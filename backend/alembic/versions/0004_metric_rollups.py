@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004_metric_rollups'
+down_revision = '0003_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'metric_rollups',
+        sa.Column('metric', sa.String(length=64), primary_key=True),
+        sa.Column('tier', sa.Integer(), primary_key=True),
+        sa.Column('bucket', sa.DateTime(), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('sum_value', sa.Float(), nullable=False),
+        sa.Column('min_value', sa.Float(), nullable=False),
+        sa.Column('max_value', sa.Float(), nullable=False),
+        sa.Column('last_value', sa.Float(), nullable=False),
+        sa.Column('last_ts', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('metric_rollups')
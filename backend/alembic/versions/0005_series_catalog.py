@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005_series_catalog'
+down_revision = '0004_metric_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('metric_series', sa.Column('first_seen', sa.DateTime(), nullable=True))
+    op.add_column('metric_series', sa.Column('last_seen', sa.DateTime(), nullable=True))
+    op.add_column('metric_series', sa.Column('point_count', sa.Integer(), server_default='0', nullable=False))
+    # seed the catalog from points already stored
+    op.execute(
+        """
+        UPDATE metric_series SET
+            first_seen = (SELECT MIN(ts) FROM metric_points WHERE metric_points.series_id = metric_series.id),
+            last_seen = (SELECT MAX(ts) FROM metric_points WHERE metric_points.series_id = metric_series.id),
+            point_count = (SELECT COUNT(*) FROM metric_points WHERE metric_points.series_id = metric_series.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('metric_series') as batch:
+        batch.drop_column('point_count')
+        batch.drop_column('last_seen')
+        batch.drop_column('first_seen')
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006_metric_chunks'
+down_revision = '0005_series_catalog'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'metric_chunks',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), primary_key=True, autoincrement=True),
+        sa.Column('series_id', sa.Integer(), sa.ForeignKey('metric_series.id'), nullable=False),
+        sa.Column('metric', sa.String(length=64), nullable=False),
+        sa.Column('start_ts', sa.DateTime(), nullable=False),
+        sa.Column('end_ts', sa.DateTime(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+    )
+    op.create_index('ix_metric_chunks_metric_end_ts', 'metric_chunks', ['metric', 'end_ts'])
+    op.create_index('ix_metric_chunks_series_start_ts', 'metric_chunks', ['series_id', 'start_ts'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_metric_chunks_series_start_ts', table_name='metric_chunks')
+    op.drop_index('ix_metric_chunks_metric_end_ts', table_name='metric_chunks')
+    op.drop_table('metric_chunks')
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = '0007_keyset_indexes'
+down_revision = '0006_metric_chunks'
+branch_labels = None
+depends_on = None
+
+
+# (created_at, id) serves keyset pagination without a sort and still covers
+# created_at-only ranges (retention, unfiltered listings)
+TABLES = ['events', 'anomalies', 'actions', 'incidents']
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.create_index(f'ix_{table}_created_at_id', table, ['created_at', 'id'])
+        op.drop_index(f'ix_{table}_created_at', table_name=table)
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.create_index(f'ix_{table}_created_at', table, ['created_at'])
+        op.drop_index(f'ix_{table}_created_at_id', table_name=table)
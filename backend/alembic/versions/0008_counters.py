@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008_counters'
+down_revision = '0007_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # rows are seeded by the first reconciliation (startup); until then reads fall back to COUNT(*)
+    op.create_table(
+        'counters',
+        sa.Column('name', sa.String(length=64), primary_key=True),
+        sa.Column('value', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('counters')
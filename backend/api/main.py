@@ -2,20 +2,33 @@ from __future__ import annotations
 
 import asyncio
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 import asyncio
 import random
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, PlainTextResponse
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..common.db import Base, engine, get_db_session, SessionLocal
+from ..common.db import (
+    AsyncSessionLocal,
+    Base,
+    SessionLocal,
+    engine,
+    get_async_db_session,
+    get_db_session,
+    get_read_db_session,
+    sqlite_performance,
+)
 from ..common import models
 from ..common.schemas import (
     MetricIn,
     AnomalyOut,
+    AnomalyScoreIn,
     ExecuteActionIn,
     ExecuteActionOut,
     AgentQueryIn,
@@ -29,13 +42,42 @@ from ..common.schemas import (
 from ..common.config import settings
 from ..detector.detector import run_detection_cycle
 from ..detector.forecast import simple_forecast, prophet_forecast
+from ..detector.batch import MAX_SCORE_POINTS, score_batch
+from ..detector.model_registry import model_registry
 from ..remediator.executor import execute_runbook, list_runbooks, preview_runbook
+from ..remediator.registry import runbook_registry
 from ..agent.service import AgentService
 from ..policy.engine import evaluate_policies, load_rules
-from ..common.ops import mitigate_incidents_for_action
+from ..common.ops import clear_demo_data, mitigate_incidents_for_action, runbook_success_stats
+from ..common.partitions import event_partitions
+from ..common.retention import retention_worker
+from ..common.counters import counter_reconciler, read_counts
+from ..common.anomaly_stats import cached_severity_counts, cached_severity_histogram
+from ..common.catalog import series_catalog
+from ..common.compaction import compactor
+from ..common.writer import db_writer
+from ..common import columnar
+from ..common.aggregate import QueryError, parse_step, query_metrics
+from ..common.quantiles import metric_quantiles, window_sketch
+from ..slo.engine import slo_engine
+from ..common.exports import EXPORTS, FORMATS as EXPORT_FORMATS, stream_export
+from ..common.pagination import NEXT_CURSOR_HEADER, InvalidCursor, decode_cursor, keyset_page, page_size, split_page
 from .security import require_admin_token, rbac_allow
 from ..common.logging import configure_root_logger
-from ..common.metrics_store import write_metric_influx
+from ..common.metrics_store import influx
+from ..common.ingest import (
+    IngestBufferFull,
+    IngestReport,
+    ingest_buffer,
+    ingest_chunk_async,
+    iter_ndjson,
+    persist_metrics_async,
+    utc_naive,
+    write_metrics_async,
+)
+from ..common.series_cache import series_cache
+from ..common.rollups import window_totals
+from ..common.timeseries import downsampled_series, latest_values, metric_names
 
 
 app = FastAPI(title=settings.app_name)
@@ -46,6 +88,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
@@ -55,6 +98,18 @@ async def on_startup() -> None:
     configure_root_logger()
     Base.metadata.create_all(bind=engine)
 
+    influx.start()
+    if sqlite_performance:
+        db_writer.start()
+    if settings.series_cache_enabled:
+        db: Session = SessionLocal()
+        try:
+            series_cache.warm(db, settings.series_cache_warm_minutes)
+        finally:
+            db.close()
+    if settings.ingest_buffer_enabled:
+        ingest_buffer.start()
+
     async def detector_loop():
         while True:
             try:
@@ -67,59 +122,105 @@ async def on_startup() -> None:
     # Fire-and-forget background task
     asyncio.create_task(detector_loop())
 
-    async def cleanup_loop():
+    async def retention_loop():
+        while True:
+            try:
+                # blocking chunked deletes run in a worker thread, off the event loop
+                await asyncio.to_thread(retention_worker.run_once)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[retention] error: {exc}")
+            await asyncio.sleep(settings.retention_interval_seconds)
+
+    asyncio.create_task(retention_loop())
+
+    async def counters_loop():
+        while True:
+            try:
+                # the first run seeds the counters table; later runs only correct drift
+                await asyncio.to_thread(counter_reconciler.run_once)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[counters] error: {exc}")
+            await asyncio.sleep(settings.counters_reconcile_interval_seconds)
+
+    asyncio.create_task(counters_loop())
+
+    async def slo_loop():
         while True:
             try:
-                # prune records older than 7 days
-                db: Session = SessionLocal()
-                cutoff = datetime.utcnow() - timedelta(days=7)
-                db.query(models.Event).filter(models.Event.created_at < cutoff).delete()
-                db.query(models.Anomaly).filter(models.Anomaly.created_at < cutoff).delete()
-                db.query(models.Action).filter(models.Action.created_at < cutoff).delete()
-                db.query(models.Incident).filter(models.Incident.created_at < cutoff).delete()
-                db.commit()
-                db.close()
+                await asyncio.to_thread(slo_engine.run_once)
             except Exception as exc:  # noqa: BLE001
-                print(f"[cleanup] error: {exc}")
-            await asyncio.sleep(3600)
+                print(f"[slo] error: {exc}")
+            await asyncio.sleep(settings.slo_eval_interval_seconds)
 
-    asyncio.create_task(cleanup_loop())
+    asyncio.create_task(slo_loop())
+
+    if settings.compaction_enabled:
+        async def compaction_loop():
+            while True:
+                try:
+                    await asyncio.to_thread(compactor.run_once)
+                except Exception as exc:  # noqa: BLE001
+                    print(f"[compaction] error: {exc}")
+                await asyncio.sleep(settings.compaction_interval_seconds)
+
+        asyncio.create_task(compaction_loop())
 
     if settings.auto_apply_policies:
         async def policy_loop():
             while True:
                 try:
-                    db: Session = SessionLocal()
-                    suggestions = evaluate_policies(db)
-                    for s in suggestions:
-                        res = execute_runbook(s.get("action"), {"deployment": "myapp", "replicas": 2, "approved": True})
-                        db.add(models.Action(name=s.get("action"), input={}, result=res, success=bool(res.get("success"))))
-                    db.commit()
-                    db.close()
+                    await asyncio.to_thread(_apply_policy_suggestions)
                 except Exception as exc:  # noqa: BLE001
                     print(f"[policy] error: {exc}")
                 await asyncio.sleep(settings.policy_check_interval_seconds)
         asyncio.create_task(policy_loop())
 
 
+def _apply_policy_suggestions() -> None:
+    """Execute every suggested runbook and record the actions (blocking; run off the event loop)."""
+    db: Session = SessionLocal()
+    try:
+        suggestions = evaluate_policies(db)
+        for s in suggestions:
+            res = execute_runbook(s.get("action"), {"deployment": "myapp", "replicas": 2, "approved": True})
+            db.add(models.Action(name=s.get("action"), input={}, result=res, success=bool(res.get("success"))))
+        db.commit()
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    # flush whatever is still sitting in the write-behind buffer, then the Influx batches
+    await run_in_threadpool(ingest_buffer.stop)
+    await run_in_threadpool(db_writer.stop)
+    await run_in_threadpool(influx.close)
+    await run_in_threadpool(model_registry.close)
+
+
+def _buffer_full(report: IngestReport | None = None) -> HTTPException:
+    detail: dict = {"error": "ingest buffer full"}
+    if report is not None:
+        detail.update(report.as_dict())
+    return HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(settings.ingest_retry_after_seconds)})
+
+
 @app.get("/health")
 def health() -> dict:
     return {"status": "ok", "time": datetime.utcnow().isoformat()}
 
 
 @app.get("/health/ready")
-def health_ready(db: Session = Depends(get_db_session)) -> dict:
+async def health_ready(db: AsyncSession = Depends(get_async_db_session)) -> dict:
     # simple DB connectivity check
-    db.execute("SELECT 1")
+    await db.execute(text("SELECT 1"))
     return {"status": "ready"}
 
 
 @app.get("/summary")
-def summary(db: Session = Depends(get_db_session)) -> dict:
-    anomalies = db.query(models.Anomaly).count()
-    actions = db.query(models.Action).count()
-    incidents = db.query(models.Incident).count()
-    return {"anomalies": anomalies, "actions": actions, "incidents": incidents}
+def summary(db: Session = Depends(get_read_db_session)) -> dict:
+    counts = read_counts(db)
+    return {"anomalies": counts["anomalies"], "actions": counts["actions"], "incidents": counts["incidents"]}
 
 
 @app.get("/version")
@@ -131,8 +232,31 @@ def version() -> dict:
     }
 
 
+@app.get("/retention/stats")
+def retention_stats() -> dict:
+    run = retention_worker.last_run
+    return run.as_dict() if run else {"started_at": None, "tables": []}
+
+
+@app.get("/counters/stats")
+def counters_stats(db: Session = Depends(get_read_db_session)) -> dict:
+    run = counter_reconciler.last_run
+    return {"counts": read_counts(db), "last_reconcile": run.as_dict() if run else None}
+
+
+@app.get("/detector/models/stats")
+def detector_model_stats() -> dict:
+    return model_registry.stats()
+
+
+@app.get("/compaction/stats")
+def compaction_stats() -> dict:
+    run = compactor.last_run
+    return run.as_dict() if run else {"started_at": None, "enabled": settings.compaction_enabled}
+
+
 @app.get("/policies/suggest")
-def policy_suggestions(db: Session = Depends(get_db_session)) -> list[dict]:
+def policy_suggestions(db: Session = Depends(get_read_db_session)) -> list[dict]:
     return evaluate_policies(db)
 
 
@@ -165,46 +289,42 @@ def auto_apply_actions(db: Session = Depends(get_db_session)) -> dict:
 
 
 @app.get("/forecast")
-def forecast(metric: str = "cpu", horizon: int = 12, method: str = "naive", db: Session = Depends(get_db_session)) -> dict:
-    from ..detector.detector import _load_recent_metrics  # local import to avoid cycle in uvicorn
-
-    series = _load_recent_metrics(db)
-    values = [v for _, v in series.get(metric, [])]
+def forecast(metric: str = "cpu", horizon: int = 12, method: str = "naive", minutes: int = 15, max_points: int = 500, db: Session = Depends(get_read_db_session)) -> dict:
+    series = downsampled_series(db, metric, minutes, max(1, max_points))
+    values = [p["value"] for p in series["points"]]
     if method == "prophet":
         return prophet_forecast(values, horizon=horizon)
     return simple_forecast(values, horizon=horizon)
 
 
 @app.get("/business")
-def business_summary(db: Session = Depends(get_db_session)) -> dict:
-    actions = db.query(models.Action).count()
+def business_summary(db: Session = Depends(get_read_db_session)) -> dict:
+    actions = read_counts(db)["actions"]
     downtime_avoided_min = actions * 5
     cost_per_min = 1500  # illustrative
     return {"downtime_avoided_min": downtime_avoided_min, "cost_avoided": downtime_avoided_min * cost_per_min}
 
 
 async def _simulate_mode(mode: str, seconds: int = 15) -> None:
-    db: Session = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         iterations = max(1, seconds * 2)
+        pending: list[MetricIn] = []
         for i in range(iterations):
-            now = datetime.utcnow().isoformat()
             if mode == "cpu-spike":
                 value = (30 + random.random() * 5) if i < iterations // 3 else (92 + random.random() * 6)
-                payload = {"metric": "cpu", "value": value, "timestamp": now, "tags": {"sim": True}}
+                metric = "cpu"
             elif mode == "error-storm":
                 value = (1 + random.random() * 2) if i < iterations // 3 else (12 + random.random() * 4)
-                payload = {"metric": "error_rate", "value": value, "timestamp": now, "tags": {"sim": True}}
+                metric = "error_rate"
             else:
                 value = (2 + random.random() * 3) if i < iterations // 3 else (20 + random.random() * 5)
-                payload = {"metric": "failed_logins", "value": value, "timestamp": now, "tags": {"sim": True}}
-            db.add(models.Event(source="sim", type="metric", payload=payload))
+                metric = "failed_logins"
+            pending.append(MetricIn(source="sim", metric=metric, value=value, tags={"sim": True}))
             if (i + 1) % 10 == 0:
-                db.commit()
+                await write_metrics_async(db, pending)
+                pending = []
             await asyncio.sleep(0.5)
-        db.commit()
-    finally:
-        db.close()
+        await write_metrics_async(db, pending)
 
 
 @app.post("/simulate/{mode}", dependencies=[Depends(require_admin_token), Depends(rbac_allow("operator"))])
@@ -215,35 +335,26 @@ async def start_simulation(mode: str) -> dict:
     return {"status": "started", "mode": mode}
 
 
-async def _wow_demo_sequence(token_guarded: bool = False) -> None:
-    # Orchestrate: reset -> error-storm -> auto-apply -> cpu-spike -> auto-apply
-    # Uses direct DB access to avoid HTTP recursion
+def _reset_demo_data() -> None:
     db: Session = SessionLocal()
     try:
-        db.query(models.Action).delete()
-        db.query(models.Anomaly).delete()
-        db.query(models.Incident).delete()
-        db.query(models.Event).delete()
-        db.commit()
-
-        await _simulate_mode("error-storm", seconds=10)
-        # auto-apply policies
-        suggestions = evaluate_policies(db)
-        for s in suggestions:
-            res = execute_runbook(s.get("action"), {"deployment": "myapp", "replicas": 2, "approved": True})
-            db.add(models.Action(name=s.get("action"), input={}, result=res, success=bool(res.get("success"))))
-        db.commit()
-
-        await _simulate_mode("cpu-spike", seconds=10)
-        suggestions = evaluate_policies(db)
-        for s in suggestions:
-            res = execute_runbook(s.get("action"), {"deployment": "myapp", "replicas": 2, "approved": True})
-            db.add(models.Action(name=s.get("action"), input={}, result=res, success=bool(res.get("success"))))
+        clear_demo_data(db)
         db.commit()
+        series_cache.clear()
     finally:
         db.close()
 
 
+async def _wow_demo_sequence(token_guarded: bool = False) -> None:
+    # Orchestrate: reset -> error-storm -> auto-apply -> cpu-spike -> auto-apply
+    # Uses direct DB access to avoid HTTP recursion; blocking steps run in worker threads
+    await asyncio.to_thread(_reset_demo_data)
+    await _simulate_mode("error-storm", seconds=10)
+    await asyncio.to_thread(_apply_policy_suggestions)
+    await _simulate_mode("cpu-spike", seconds=10)
+    await asyncio.to_thread(_apply_policy_suggestions)
+
+
 @app.post("/demo/wow", dependencies=[Depends(require_admin_token), Depends(rbac_allow("operator"))])
 def demo_wow() -> dict:
     asyncio.create_task(_wow_demo_sequence())
@@ -251,18 +362,13 @@ def demo_wow() -> dict:
 
 
 @app.post("/demo/reset", dependencies=[Depends(require_admin_token), Depends(rbac_allow("admin"))])
-def demo_reset(db: Session = Depends(get_db_session)) -> dict:
-    # delete in order of dependencies
-    db.query(models.Action).delete()
-    db.query(models.Anomaly).delete()
-    db.query(models.Incident).delete()
-    db.query(models.Event).delete()
-    db.commit()
+def demo_reset() -> dict:
+    _reset_demo_data()
     return {"status": "ok"}
 
 
 @app.get("/report/pdf")
-def export_report_pdf(db: Session = Depends(get_db_session)):
+def export_report_pdf(db: Session = Depends(get_read_db_session)):
     from reportlab.lib.pagesizes import LETTER
     from reportlab.pdfgen import canvas
     import io
@@ -294,7 +400,7 @@ def export_report_pdf(db: Session = Depends(get_db_session)):
 
 
 @app.get("/report/json")
-def export_report_json(db: Session = Depends(get_db_session)) -> dict:
+def export_report_json(db: Session = Depends(get_read_db_session)) -> dict:
     s = summary(db)
     b = business_summary(db)
     recent_anomalies = [
@@ -335,62 +441,165 @@ def export_report_json(db: Session = Depends(get_db_session)) -> dict:
 
 
 @app.get("/metrics/keys")
-def metric_keys(db: Session = Depends(get_db_session)) -> list[str]:
-    q = (
-        db.query(models.Event)
-        .filter(models.Event.type == "metric")
-        .order_by(models.Event.created_at.desc())
-        .limit(2000)
-        .all()
-    )
-    keys: set[str] = set()
-    for e in q:
-        payload = e.payload or {}
-        m = payload.get("metric")
-        if isinstance(m, str):
-            keys.add(m)
-    return sorted(keys)
+async def metric_keys(
+    prefix: Optional[str] = None,
+    source: Optional[str] = None,
+    active_minutes: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> list[str]:
+    return await db.run_sync(metric_names, prefix=prefix, source=source, active_minutes=active_minutes)
+
+
+@app.get("/metrics/series")
+async def metric_series(
+    prefix: Optional[str] = None,
+    source: Optional[str] = None,
+    active_minutes: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> list[dict]:
+    entries = await db.run_sync(series_catalog.find, prefix=prefix, source=source, active_minutes=active_minutes)
+    return [e.as_dict() for e in entries]
 
 
 @app.get("/metrics/recent")
-def recent_metric(metric: str = "cpu", minutes: int = 15, db: Session = Depends(get_db_session)) -> dict:
-    from ..detector.detector import _load_recent_metrics  # local import to avoid cycle
-
-    series = _load_recent_metrics(db, minutes=minutes)
-    points = [{"ts": ts.isoformat(), "value": v} for ts, v in series.get(metric, [])]
-    return {"metric": metric, "minutes": minutes, "points": points}
+async def recent_metric(metric: str = "cpu", minutes: int = 15, max_points: int = 1500, db: AsyncSession = Depends(get_async_db_session)) -> dict:
+    series = await db.run_sync(downsampled_series, metric, minutes, max(1, max_points))
+    return {"metric": metric, "minutes": minutes, **series}
+
+
+@app.get("/metrics/query")
+async def query_metric_buckets(
+    metric: List[str] = Query(...),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    step: str = "60s",
+    agg: str = "avg",
+    group_by: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> dict:
+    """Bucketed aggregates of one or more metrics; ``metric`` may repeat. The response has
+    one value per non-empty ``step`` bucket per series group, whatever the raw point count."""
+    end = utc_naive(end) if end else datetime.utcnow()
+    start = utc_naive(start) if start else end - timedelta(hours=1)
+    try:
+        return await db.run_sync(query_metrics, metric, start, end, parse_step(step), agg, group_by)
+    except QueryError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@app.get("/metrics/quantiles")
+async def metric_quantiles_endpoint(
+    metric: List[str] = Query(...),
+    q: str = "0.5,0.95,0.99",
+    window: str = "1h",
+    db: AsyncSession = Depends(get_async_db_session),
+) -> dict:
+    """Quantiles over the last ``window`` (e.g. ``15m``, ``1h``, ``7d``) from the merged
+    per-bucket sketches; each estimate is within ``relative_accuracy`` of the exact value."""
+    try:
+        qs = [float(x) for x in q.split(",") if x.strip()]
+        seconds = parse_step(window)
+    except (ValueError, QueryError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not qs or any(not 0 <= x <= 1 for x in qs):
+        raise HTTPException(status_code=400, detail="q must be a comma-separated list of values in [0, 1]")
+    return await db.run_sync(metric_quantiles, metric, qs, seconds)
 
 
 @app.post("/metrics")
-def ingest_metric(metric: MetricIn, db: Session = Depends(get_db_session)) -> dict:
-    event = models.Event(
-        source=metric.source,
-        type="metric",
-        payload={
-            "metric": metric.metric,
-            "value": metric.value,
-            "timestamp": metric.timestamp.isoformat(),
-            "tags": metric.tags,
-        },
-    )
-    db.add(event)
-    db.commit()
-    # optionally write to InfluxDB
-    try:
-        write_metric_influx(metric.metric, float(metric.value), {k: str(v) for k, v in (metric.tags or {}).items()}, metric.timestamp)
-    except Exception:
-        pass
+async def ingest_metric(metric: MetricIn, db: AsyncSession = Depends(get_async_db_session)) -> dict:
+    if ingest_buffer.running:
+        try:
+            ingest_buffer.offer([metric])
+        except IngestBufferFull:
+            raise _buffer_full()
+        return {"status": "queued"}
+    # no flusher (e.g. tests without startup): write through, optionally to InfluxDB too
+    await persist_metrics_async(db, [metric])
     return {"status": "ok"}
 
 
+@app.get("/ingest/stats")
+def ingest_stats() -> dict:
+    return {
+        **ingest_buffer.stats(),
+        "influx": influx.stats(),
+        "series_cache": series_cache.stats(),
+        "writer": db_writer.stats(),
+    }
+
+
+@app.post("/metrics/batch")
+async def ingest_metrics_batch(request: Request, db: AsyncSession = Depends(get_async_db_session)) -> dict:
+    """Bulk ingest: a JSON array of metrics, or NDJSON (one metric per line) streamed in chunks."""
+    report = IngestReport()
+    chunk_size = max(1, settings.ingest_chunk_size)
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in content_type or "jsonl" in content_type:
+            pending: list = []
+            index = 0
+            async for record, error in iter_ndjson(request.stream()):
+                if error:
+                    report.reject(index, error)
+                else:
+                    pending.append((index, record))
+                index += 1
+                if len(pending) >= chunk_size:
+                    await ingest_chunk_async(db, pending, report)
+                    pending = []
+            if pending:
+                await ingest_chunk_async(db, pending, report)
+            return report.as_dict()
+
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        for start in range(0, len(body), chunk_size):
+            records = list(enumerate(body[start:start + chunk_size], start=start))
+            await ingest_chunk_async(db, records, report)
+        return report.as_dict()
+    except IngestBufferFull:
+        # chunks before the failing one are queued; the client retries the rest
+        raise _buffer_full(report)
+
+
+def _page_query(q, model, cursor: Optional[str], limit: int):
+    try:
+        return keyset_page(q, model.created_at, model.id, cursor, limit)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def _page_rows(response: Response, rows, limit: int) -> list:
+    rows, next_cursor = split_page(rows, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
+
+
 @app.get("/events")
-def list_events(db: Session = Depends(get_db_session)) -> list[dict]:
-    rows = (
-        db.query(models.Event)
-        .order_by(models.Event.created_at.desc())
-        .limit(100)
-        .all()
-    )
+async def list_events(
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> list[dict]:
+    """Newest events first; pass the ``X-Next-Cursor`` response header back as ``cursor`` for older pages."""
+    limit = page_size(limit)
+    if event_partitions.enabled:
+        try:
+            before = decode_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="invalid cursor")
+        rows = await run_in_threadpool(event_partitions.recent, limit + 1, None, before)
+    else:
+        q = _page_query(select(models.Event), models.Event, cursor, limit)
+        rows = (await db.execute(q)).scalars().all()
+    rows = _page_rows(response, rows, limit)
     return [
         {"id": str(r.id), "type": r.type, "source": r.source, "created_at": r.created_at.isoformat(), "payload": r.payload}
         for r in rows
@@ -398,12 +607,20 @@ def list_events(db: Session = Depends(get_db_session)) -> list[dict]:
 
 
 @app.get("/anomalies", response_model=List[AnomalyOut])
-def get_anomalies(limit: int = 100, since_mins: int | None = None, db: Session = Depends(get_db_session)) -> List[AnomalyOut]:
-    q = db.query(models.Anomaly)
+async def get_anomalies(
+    response: Response,
+    limit: int = 100,
+    since_mins: int | None = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> List[AnomalyOut]:
+    limit = page_size(limit)
+    q = select(models.Anomaly)
     if since_mins:
         cutoff = datetime.utcnow() - timedelta(minutes=since_mins)
-        q = q.filter(models.Anomaly.created_at >= cutoff)
-    rows = q.order_by(models.Anomaly.created_at.desc()).limit(max(1, min(limit, 1000))).all()
+        q = q.where(models.Anomaly.created_at >= cutoff)
+    q = _page_query(q, models.Anomaly, cursor, limit)
+    rows = _page_rows(response, (await db.execute(q)).scalars().all(), limit)
     return [
         AnomalyOut(
             id=str(r.id),
@@ -418,21 +635,32 @@ def get_anomalies(limit: int = 100, since_mins: int | None = None, db: Session =
 
 
 @app.get("/anomalies/stats")
-def anomaly_stats(db: Session = Depends(get_db_session)) -> dict:
-    rows = (
-        db.query(models.Anomaly)
-        .order_by(models.Anomaly.created_at.desc())
-        .limit(1000)
-        .all()
-    )
-    stats: dict = {}
-    for r in rows:
-        metric = r.metric
-        sev = r.severity
-        stats.setdefault(metric, {"low": 0, "medium": 0, "high": 0, "critical": 0})
-        if sev in stats[metric]:
-            stats[metric][sev] += 1
-    return stats
+def anomaly_stats(minutes: int = Query(default=1440, ge=1, le=525600), db: Session = Depends(get_read_db_session)) -> dict:
+    """{metric: {severity: count}} over the last ``minutes``, counted by the database."""
+    return cached_severity_counts(db, minutes)
+
+
+@app.get("/anomalies/stats/histogram")
+def anomaly_stats_histogram(
+    minutes: int = Query(default=1440, ge=1, le=525600),
+    bucket_minutes: int = Query(default=60, ge=1),
+    metric: Optional[str] = None,
+    db: Session = Depends(get_read_db_session),
+) -> dict:
+    """Per-severity counts in ``bucket_minutes`` buckets, for sparklines."""
+    if minutes // bucket_minutes > 1000:
+        raise HTTPException(status_code=400, detail="at most 1000 buckets; increase bucket_minutes")
+    return cached_severity_histogram(db, minutes, bucket_minutes, metric)
+
+
+@app.post("/anomalies/score")
+def score_anomalies(payload: AnomalyScoreIn) -> dict:
+    """Z-score / MAD scores and severities for client-supplied series, scored together."""
+    if sum(len(v) for v in payload.series.values()) > MAX_SCORE_POINTS:
+        raise HTTPException(status_code=400, detail=f"at most {MAX_SCORE_POINTS} values per request")
+    names = list(payload.series)
+    batch = score_batch([payload.series[m] for m in names])
+    return {"results": [{"metric": m, "n": len(payload.series[m]), **batch.row(i)} for i, m in enumerate(names)]}
 
 
 @app.post("/actions/execute", response_model=ExecuteActionOut, dependencies=[Depends(require_admin_token), Depends(rbac_allow("operator"))])
@@ -457,12 +685,20 @@ def execute_action(payload: ExecuteActionIn, db: Session = Depends(get_db_sessio
 
 
 @app.get("/actions")
-def list_actions(limit: int = 100, since_mins: int | None = None, db: Session = Depends(get_db_session)) -> list[dict]:
-    q = db.query(models.Action)
+def list_actions(
+    response: Response,
+    limit: int = 100,
+    since_mins: int | None = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db_session),
+) -> list[dict]:
+    limit = page_size(limit)
+    q = select(models.Action)
     if since_mins:
         cutoff = datetime.utcnow() - timedelta(minutes=since_mins)
-        q = q.filter(models.Action.created_at >= cutoff)
-    rows = q.order_by(models.Action.created_at.desc()).limit(max(1, min(limit, 1000))).all()
+        q = q.where(models.Action.created_at >= cutoff)
+    q = _page_query(q, models.Action, cursor, limit)
+    rows = _page_rows(response, db.execute(q).scalars().all(), limit)
     return [
         {
             "id": str(r.id),
@@ -476,7 +712,7 @@ def list_actions(limit: int = 100, since_mins: int | None = None, db: Session =
 
 
 @app.get("/actions/{action_id}")
-def get_action(action_id: str, db: Session = Depends(get_db_session)) -> dict:
+def get_action(action_id: str, db: Session = Depends(get_read_db_session)) -> dict:
     row = db.query(models.Action).filter(models.Action.id == action_id).first()
     if not row:
         return {"error": "not_found"}
@@ -489,54 +725,61 @@ def get_action(action_id: str, db: Session = Depends(get_db_session)) -> dict:
     }
 
 
-@app.get("/export/anomalies.csv")
-def export_anomalies_csv(limit: int = 1000, since_mins: int | None = None, db: Session = Depends(get_db_session)) -> PlainTextResponse:
-    q = db.query(models.Anomaly)
-    if since_mins:
-        cutoff = datetime.utcnow() - timedelta(minutes=since_mins)
-        q = q.filter(models.Anomaly.created_at >= cutoff)
-    rows = q.order_by(models.Anomaly.created_at.desc()).limit(max(1, min(limit, 10000))).all()
-    lines = ["id,metric,score,severity,created_at"]
-    for r in rows:
-        lines.append(f"{r.id},{r.metric},{r.score},{r.severity},{r.created_at.isoformat()}")
-    csv = "\n".join(lines)
-    return PlainTextResponse(content=csv, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=anomalies.csv"})
-
-
-@app.get("/export/actions.csv")
-def export_actions_csv(limit: int = 1000, since_mins: int | None = None, db: Session = Depends(get_db_session)) -> PlainTextResponse:
-    q = db.query(models.Action)
-    if since_mins:
-        cutoff = datetime.utcnow() - timedelta(minutes=since_mins)
-        q = q.filter(models.Action.created_at >= cutoff)
-    rows = q.order_by(models.Action.created_at.desc()).limit(max(1, min(limit, 10000))).all()
-    lines = ["id,name,success,created_at"]
-    for r in rows:
-        lines.append(f"{r.id},{r.name},{int(bool(r.success))},{r.created_at.isoformat()}")
-    csv = "\n".join(lines)
-    return PlainTextResponse(content=csv, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=actions.csv"})
+@app.get("/export/metrics")
+def export_metrics(
+    metric: Optional[List[str]] = Query(default=None),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    format: str = "arrow",
+) -> StreamingResponse:
+    """Metric history as an Arrow IPC stream or Parquet file of (metric, series_id, ts, value),
+    written one record batch at a time. ``metric`` may repeat; omit it for every metric."""
+    if format not in columnar.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {sorted(columnar.FORMATS)}")
+    if not columnar.available():
+        raise HTTPException(status_code=501, detail="pyarrow is not installed")
+    ext = "arrows" if format == "arrow" else "parquet"
+    return StreamingResponse(
+        columnar.stream_metrics(
+            format,
+            metric,
+            utc_naive(start) if start else None,
+            utc_naive(end) if end else None,
+            settings.export_fetch_size * 10,
+        ),
+        media_type=columnar.FORMATS[format],
+        headers={"Content-Disposition": f"attachment; filename=metrics.{ext}"},
+    )
+
+
+@app.get("/export/{kind}.{fmt}")
+def export_stream(
+    kind: str,
+    fmt: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    since_mins: Optional[int] = None,
+) -> StreamingResponse:
+    """Stream events/anomalies/actions/incidents as CSV or NDJSON, oldest first, for start <= created_at < end."""
+    if kind not in EXPORTS or fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=404, detail="unknown export")
+    if start is None and since_mins:
+        start = datetime.utcnow() - timedelta(minutes=since_mins)
+    return StreamingResponse(
+        stream_export(kind, fmt, utc_naive(start) if start else None, utc_naive(end) if end else None),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={kind}.{fmt}"},
+    )
 
 
 @app.get("/runbooks")
-def get_runbooks(db: Session = Depends(get_db_session)) -> list[dict]:
+def get_runbooks(db: Session = Depends(get_read_db_session)) -> list[dict]:
     items = list_runbooks()
-    # enrich with simple success-rate stats from recent actions
+    # success-rate stats over each runbook's recent actions, one query for all of them
+    stats = runbook_success_stats(db, [item["name"] for item in items if item.get("name")])
+    empty = {"recent_success_rate": None, "last_success_at": None}
     for item in items:
-        name = item.get("name")
-        if not name:
-            continue
-        q = (
-            db.query(models.Action)
-            .filter(models.Action.name == name)
-            .order_by(models.Action.created_at.desc())
-            .limit(50)
-            .all()
-        )
-        total = len(q)
-        ok = len([a for a in q if a.success])
-        last_success = next((a.created_at.isoformat() for a in q if a.success), None)
-        item["recent_success_rate"] = (ok / total) if total else None
-        item["last_success_at"] = last_success
+        item.update(stats.get(item.get("name"), empty))
     return items
 
 
@@ -549,48 +792,28 @@ def runbook_preview(payload: dict) -> dict:
 
 @app.get("/services")
 def services_catalog() -> list[dict]:
-    items = list_runbooks()
-    # Derive simple service catalog from runbook metadata
-    svc_map: dict[str, dict] = {}
-    for rb in items:
-        svc = (rb.get("service") or "default").lower()
-        owner = rb.get("owner")
-        svc_map.setdefault(svc, {"service": svc, "owner": owner, "runbooks": []})
-        if owner and not svc_map[svc].get("owner"):
-            svc_map[svc]["owner"] = owner
-        svc_map[svc]["runbooks"].append(rb.get("name"))
-    return sorted(svc_map.values(), key=lambda x: x["service"]) 
+    # simple service catalog derived from runbook metadata
+    return runbook_registry.services()
 
 
 @app.get("/slo")
-def slo(target: float = 99.9, db: Session = Depends(get_db_session)) -> dict:
-    from statistics import mean
-
-    # naive availability from recent error_rate (%), and p95 latency
-    cutoff_minutes = 60
-    events = (
-        db.query(models.Event)
-        .filter(models.Event.type == "metric")
-        .order_by(models.Event.created_at.desc())
-        .limit(2000)
-        .all()
-    )
-    error_rates = []
-    latencies = []
-    for e in events:
-        payload = e.payload or {}
-        m = payload.get("metric")
-        v = payload.get("value")
-        if m == "error_rate":
-            error_rates.append(float(v))
-        elif m == "latency":
-            latencies.append(float(v))
-    availability = max(0.0, 100.0 - (mean(error_rates) if error_rates else 0.0))
-    p95 = None
-    if latencies:
-        s = sorted(latencies)
-        idx = int(0.95 * (len(s) - 1))
-        p95 = s[idx]
+def slo(target: Optional[float] = None, db: Session = Depends(get_read_db_session)) -> dict:
+    # availability over the declared error_rate SLO window, from the windows slo_loop keeps up to date
+    availability_slo = next((e for e in slo_engine.evaluate() if e.slo.kind == "error_rate"), None)
+    if availability_slo is not None and availability_slo.compliance_pct is not None:
+        availability = availability_slo.compliance_pct
+    else:
+        err_count, err_sum = window_totals(db, "error_rate", 60)
+        availability = max(0.0, 100.0 - (err_sum / err_count if err_count else 0.0))
+    if target is None:
+        target = availability_slo.slo.objective if availability_slo is not None else 99.9
+    # p95 from the merged latency sketches; only history older than the sketches is sorted
+    p95 = window_sketch(db, "latency", 3600).quantile(0.95)
+    if p95 is None:
+        latencies = latest_values(db, "latency", limit=2000)
+        if latencies:
+            s = sorted(latencies)
+            p95 = s[int(0.95 * (len(s) - 1))]
     allowed_error = max(0.0, 100.0 - float(target))
     actual_error = max(0.0, 100.0 - availability)
     ebr = None
@@ -599,14 +822,22 @@ def slo(target: float = 99.9, db: Session = Depends(get_db_session)) -> dict:
     return {"availability_pct": availability, "latency_p95_ms": p95, "target_slo_pct": float(target), "error_budget_remaining_pct": ebr}
 
 
+@app.get("/slo/status")
+def slo_status() -> dict:
+    # evaluated from memory; refreshing the windows (and resyncing them) is left to slo_loop
+    return {"slos": [e.as_dict() for e in slo_engine.evaluate()], "resync_seconds": slo_engine.resync_seconds}
+
+
 @app.get("/incidents")
-def list_incidents(db: Session = Depends(get_db_session)) -> list[dict]:
-    rows = (
-        db.query(models.Incident)
-        .order_by(models.Incident.created_at.desc())
-        .limit(100)
-        .all()
-    )
+async def list_incidents(
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> list[dict]:
+    limit = page_size(limit)
+    q = _page_query(select(models.Incident), models.Incident, cursor, limit)
+    rows = _page_rows(response, (await db.execute(q)).scalars().all(), limit)
     return [
         {
             "id": str(r.id),
@@ -636,7 +867,7 @@ def agent_plan(payload: AgentPlanIn, db: Session = Depends(get_db_session)) -> A
 
 
 @app.get("/agent/narrative")
-def agent_narrative(db: Session = Depends(get_db_session)) -> dict:
+def agent_narrative(db: Session = Depends(get_read_db_session)) -> dict:
     agent = AgentService()
     return agent.narrative_summary(db)
 
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import String, cast, select
+from sqlalchemy.orm import Session
+
+from . import models
+from . import tsz
+from .catalog import series_catalog
+from .config import settings
+from .rollups import TIERS
+from .series_cache import from_epoch, to_epoch
+
+
+AGGREGATES = ("avg", "min", "max", "sum", "count", "p95", "rate")
+# aggregates the rollup tiers can answer exactly
+_ROLLUP_AGGS = {"avg", "min", "max", "sum", "count"}
+MAX_BUCKETS = 20000
+
+_STEP_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhd]?)$")
+_STEP_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+class QueryError(ValueError):
+    pass
+
+
+def parse_step(step: str) -> int:
+    """'60', '30s', '5m', '1h' or '1d' -> whole seconds."""
+    m = _STEP_RE.match(step.strip())
+    if not m:
+        raise QueryError(f"invalid step {step!r}")
+    seconds = int(float(m.group(1)) * _STEP_UNITS[m.group(2)])
+    if seconds < 1:
+        raise QueryError("step must be at least 1s")
+    return seconds
+
+
+@dataclass
+class Grid:
+    """Buckets aligned to multiples of ``step`` seconds since the epoch, covering [start, end)."""
+
+    t0: float  # first bucket start (epoch seconds)
+    step: int
+    n: int
+
+    @classmethod
+    def for_range(cls, start: datetime, end: datetime, step: int) -> "Grid":
+        s, e = to_epoch(start), to_epoch(end)
+        t0 = math.floor(s / step) * step
+        n = max(1, math.ceil((e - t0) / step))
+        if n > MAX_BUCKETS:
+            raise QueryError(f"{n} buckets requested; at most {MAX_BUCKETS} (increase step)")
+        return cls(t0=float(t0), step=step, n=n)
+
+    @property
+    def t_end(self) -> float:
+        return self.t0 + self.n * self.step
+
+    def index(self, ts: np.ndarray) -> np.ndarray:
+        return ((ts - self.t0) // self.step).astype(np.int64)
+
+
+def bucketize(grid: Grid, ts: np.ndarray, values: np.ndarray, agg: str, series: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Aggregate points into ``grid``: (per-bucket result, per-bucket point count).
+
+    Everything is a NumPy pass over the points (bincount, ufunc.at, or one sort for p95); the output
+    has ``grid.n`` entries whatever the input size. ``series`` ids are only needed for
+    ``rate``, which differences each series separately (counter resets count from zero).
+    """
+    keep = (ts >= grid.t0) & (ts < grid.t_end)
+    ts, values = ts[keep], values[keep]
+    idx = grid.index(ts)
+    counts = np.bincount(idx, minlength=grid.n)
+    out = np.full(grid.n, np.nan)
+    if agg == "count":
+        return counts.astype(np.float64), counts
+    if not len(values):
+        return out, counts
+    if agg in ("sum", "avg"):
+        sums = np.bincount(idx, weights=values, minlength=grid.n)
+        if agg == "sum":
+            out[counts > 0] = sums[counts > 0]
+        else:
+            out[counts > 0] = sums[counts > 0] / counts[counts > 0]
+        return out, counts
+    if agg == "rate":
+        sid = series[keep] if series is not None else np.zeros(len(ts), dtype=np.int64)
+        order = np.lexsort((ts, sid))
+        sid, v, b = sid[order], values[order], idx[order]
+        delta = np.diff(v, prepend=np.nan)
+        delta = np.where(delta < 0, v, delta)  # counter reset
+        first = np.ones(len(v), dtype=bool)
+        first[1:] = sid[1:] != sid[:-1]
+        delta[first] = 0.0
+        increase = np.bincount(b, weights=delta, minlength=grid.n)
+        out[counts > 0] = increase[counts > 0] / grid.step
+        return out, counts
+    if agg in ("min", "max"):
+        fill = np.full(grid.n, np.inf if agg == "min" else -np.inf)
+        (np.minimum if agg == "min" else np.maximum).at(fill, idx, values)
+        out[counts > 0] = fill[counts > 0]
+        return out, counts
+    if agg != "p95":
+        raise QueryError(f"unknown aggregate {agg!r}")
+    # sort by (bucket, value); the nearest-rank p95 is then an offset into each bucket's run,
+    # matching np.percentile(..., method="inverted_cdf")
+    order = np.lexsort((values, idx))
+    v, b = values[order], idx[order]
+    starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+    n = counts[b[starts]]
+    out[b[starts]] = v[starts + np.ceil(0.95 * n).astype(np.int64) - 1]
+    return out, counts
+
+
+def _load_points(db: Session, metric: str, start: datetime, end: datetime) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(series_id, epoch ts, value) for raw points and compressed chunks in [start, end)."""
+    parts_sid: List[np.ndarray] = []
+    parts_ts: List[np.ndarray] = []
+    parts_val: List[np.ndarray] = []
+    chunks = db.execute(
+        select(models.MetricChunk.series_id, models.MetricChunk.data)
+        .where(models.MetricChunk.metric == metric)
+        .where(models.MetricChunk.end_ts >= start)
+        .where(models.MetricChunk.start_ts < end)
+    )
+    for sid, data in chunks:
+        ts_ms, values = tsz.decode(data)
+        parts_sid.append(np.full(len(values), sid, dtype=np.int64))
+        parts_ts.append(ts_ms / 1000.0)
+        parts_val.append(values)
+    # timestamps come back as text and are parsed by NumPy in C, not one datetime at a time
+    rows = db.execute(
+        select(models.MetricPoint.series_id, cast(models.MetricPoint.ts, String), models.MetricPoint.value)
+        .where(models.MetricPoint.metric == metric)
+        .where(models.MetricPoint.ts >= start)
+        .where(models.MetricPoint.ts < end)
+    ).all()
+    if rows:
+        n = len(rows)
+        parts_sid.append(np.fromiter((r[0] for r in rows), dtype=np.int64, count=n))
+        parts_ts.append(np.array([r[1] for r in rows], dtype="datetime64[us]").astype(np.int64) / 1e6)
+        parts_val.append(np.fromiter((r[2] for r in rows), dtype=np.float64, count=n))
+    if not parts_val:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+    return np.concatenate(parts_sid), np.concatenate(parts_ts), np.concatenate(parts_val)
+
+
+def _rollup_tier(grid: Grid, now: datetime) -> Optional[int]:
+    """Coarsest rollup tier that nests in the step and is still retained for the whole range."""
+    retained = {60: settings.retention_rollups_1m_days, 300: settings.retention_rollups_5m_days, 3600: settings.retention_rollups_1h_days}
+    for tier in sorted(TIERS, reverse=True):
+        if grid.step % tier:
+            continue
+        days = retained[tier]
+        if days and from_epoch(grid.t0) < now - timedelta(days=days):
+            continue
+        return tier
+    return None
+
+
+def _from_rollups(db: Session, metric: str, grid: Grid, tier: int, agg: str) -> Tuple[np.ndarray, np.ndarray]:
+    rows = db.execute(
+        select(
+            models.MetricRollup.bucket,
+            models.MetricRollup.count,
+            models.MetricRollup.sum_value,
+            models.MetricRollup.min_value,
+            models.MetricRollup.max_value,
+        )
+        .where(models.MetricRollup.metric == metric)
+        .where(models.MetricRollup.tier == tier)
+        .where(models.MetricRollup.bucket >= from_epoch(grid.t0))
+        .where(models.MetricRollup.bucket < from_epoch(grid.t_end))
+    ).all()
+    out = np.full(grid.n, np.nan)
+    if not rows:
+        return (np.zeros(grid.n) if agg == "count" else out), np.zeros(grid.n, dtype=np.int64)
+    n = len(rows)
+    ts = np.array([r[0] for r in rows], dtype="datetime64[us]").astype(np.int64) / 1e6
+    cnt = np.fromiter((r[1] for r in rows), dtype=np.float64, count=n)
+    idx = grid.index(ts)
+    counts = np.bincount(idx, weights=cnt, minlength=grid.n).astype(np.int64)
+    has = counts > 0
+    if agg == "count":
+        return counts.astype(np.float64), counts
+    if agg in ("sum", "avg"):
+        sums = np.bincount(idx, weights=np.fromiter((r[2] for r in rows), dtype=np.float64, count=n), minlength=grid.n)
+        out[has] = sums[has] if agg == "sum" else sums[has] / counts[has]
+        return out, counts
+    col = 3 if agg == "min" else 4
+    vals = np.fromiter((r[col] for r in rows), dtype=np.float64, count=n)
+    fill = np.full(grid.n, np.inf if agg == "min" else -np.inf)
+    (np.minimum if agg == "min" else np.maximum).at(fill, idx, vals)
+    out[has] = fill[has]
+    return out, counts
+
+
+def query_metrics(
+    db: Session,
+    metrics: Sequence[str],
+    start: datetime,
+    end: datetime,
+    step: int,
+    agg: str = "avg",
+    group_by: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Server-side aggregation of one or more metrics into ``step``-second buckets.
+
+    Without ``group_by`` and for avg/min/max/sum/count, whole buckets are read from the
+    rollup tiers when one nests in the step; otherwise raw points (and compressed chunks)
+    are bucketed with NumPy. Empty buckets are omitted from the output.
+    """
+    if agg not in AGGREGATES:
+        raise QueryError(f"agg must be one of {', '.join(AGGREGATES)}")
+    if end <= start:
+        raise QueryError("end must be after start")
+    grid = Grid.for_range(start, end, step)
+    tags: Dict[int, Dict[str, Any]] = {}
+    if group_by:
+        tags = {e.id: e.tags for e in series_catalog.find(db)}
+    result: List[Dict[str, Any]] = []
+    for metric in metrics:
+        tier = _rollup_tier(grid, now or datetime.utcnow()) if not group_by and agg in _ROLLUP_AGGS else None
+        if tier:
+            groups = [(None, *_from_rollups(db, metric, grid, tier, agg))]
+        else:
+            sid, ts, values = _load_points(db, metric, from_epoch(grid.t0), from_epoch(grid.t_end))
+            if group_by:
+                # tag value per distinct series, then broadcast to the points by series id
+                unique_sid, inverse = np.unique(sid, return_inverse=True)
+                keys = [tags.get(int(s), {}).get(group_by) for s in unique_sid]
+                labels = sorted({str(k) for k in keys if k is not None})
+                pos = {label: i for i, label in enumerate(labels)}
+                code = np.array([pos[str(k)] if k is not None else len(labels) for k in keys], dtype=np.int64)
+                group_of = code[inverse] if len(sid) else code
+                groups = []
+                for i, label in enumerate(labels + [None]):
+                    mask = group_of == i
+                    if mask.any():
+                        groups.append(({group_by: label}, *bucketize(grid, ts[mask], values[mask], agg, sid[mask])))
+            else:
+                groups = [(None, *bucketize(grid, ts, values, agg, sid))]
+        for group, out, counts in groups:
+            has = counts > 0
+            bucket_ts = grid.t0 + np.flatnonzero(has) * grid.step
+            result.append({
+                "metric": metric,
+                "group": group,
+                "source": f"rollup_{tier}s" if tier else "raw",
+                "points": [[from_epoch(t).isoformat(), float(v)] for t, v in zip(bucket_ts.tolist(), out[has].tolist())],
+            })
+    return {
+        "start": from_epoch(grid.t0).isoformat(),
+        "end": from_epoch(grid.t_end).isoformat(),
+        "step": step,
+        "agg": agg,
+        "series": result,
+    }
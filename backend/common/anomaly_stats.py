@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+from .series_cache import from_epoch, to_epoch
+
+
+SEVERITIES = ("low", "medium", "high", "critical")
+
+
+def write_watermark(db: Session) -> Optional[Tuple[Any, Any]]:
+    """(row count, last change) of the anomalies counter; moves on every committed insert
+    or delete (see ``common.counters``). None until the counters are seeded."""
+    row = db.execute(
+        select(models.Counter.value, models.Counter.updated_at).where(models.Counter.name == "anomalies")
+    ).first()
+    return tuple(row) if row else None
+
+
+def _epoch_seconds(db: Session, col: Any) -> Any:
+    if db.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", col)
+    return cast(func.strftime("%s", col), Integer)
+
+
+def severity_counts(db: Session, minutes: int, now: Optional[datetime] = None) -> Dict[str, Dict[str, int]]:
+    """{metric: {severity: count}} for anomalies created in the last ``minutes``."""
+    cutoff = (now or datetime.utcnow()) - timedelta(minutes=minutes)
+    rows = db.execute(
+        select(models.Anomaly.metric, models.Anomaly.severity, func.count())
+        .where(models.Anomaly.created_at >= cutoff)
+        .group_by(models.Anomaly.metric, models.Anomaly.severity)
+    )
+    stats: Dict[str, Dict[str, int]] = {}
+    for metric, severity, n in rows:
+        counts = stats.setdefault(metric, {s: 0 for s in SEVERITIES})
+        if severity in counts:
+            counts[severity] = int(n)
+    return stats
+
+
+def severity_histogram(
+    db: Session,
+    minutes: int,
+    bucket_minutes: int,
+    metric: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Per-bucket counts for sparklines: {metric: {severity: [count per bucket]}}, with
+    buckets aligned to multiples of ``bucket_minutes`` and counted by the database."""
+    width = bucket_minutes * 60
+    end = to_epoch(now or datetime.utcnow())
+    t0 = (int(end - minutes * 60) // width) * width
+    n = int((end - t0) // width) + 1
+    bucket = (_epoch_seconds(db, models.Anomaly.created_at) - t0) / width
+    bucket = cast(func.floor(bucket), Integer) if db.get_bind().dialect.name == "postgresql" else bucket
+    q = (
+        select(models.Anomaly.metric, models.Anomaly.severity, bucket.label("bucket"), func.count())
+        .where(models.Anomaly.created_at >= from_epoch(t0))
+        .group_by(models.Anomaly.metric, models.Anomaly.severity, "bucket")
+    )
+    if metric:
+        q = q.where(models.Anomaly.metric == metric)
+    series: Dict[str, Dict[str, list]] = {}
+    for m, severity, b, count in db.execute(q):
+        if severity not in SEVERITIES or not 0 <= int(b) < n:
+            continue
+        counts = series.setdefault(m, {s: [0] * n for s in SEVERITIES})
+        counts[severity][int(b)] += int(count)
+    return {
+        "start": from_epoch(t0).isoformat(),
+        "bucket_minutes": bucket_minutes,
+        "buckets": [from_epoch(t0 + i * width).isoformat() for i in range(n)],
+        "series": series,
+    }
+
+
+class StatsCache:
+    """Short-TTL results keyed by query parameters, dropped early when the write watermark
+    moves. Concurrent misses on one key wait for a single computation."""
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl = ttl_seconds
+        self._entries: Dict[Hashable, Tuple[Any, float, Any]] = {}
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, watermark: Any, compute: Callable[[], Any]) -> Any:
+        entry = self._fresh(key, watermark)
+        if entry is not None:
+            return entry
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = self._fresh(key, watermark)
+            if entry is not None:
+                return entry
+            value = compute()
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = (watermark, time.monotonic() + self.ttl, value)
+            return value
+
+    def _fresh(self, key: Hashable, watermark: Any) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == watermark and entry[1] > time.monotonic():
+                self.hits += 1
+                return entry[2]
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl_seconds": self.ttl}
+
+
+stats_cache = StatsCache(settings.anomaly_stats_ttl_seconds)
+
+
+def cached_severity_counts(db: Session, minutes: int) -> Dict[str, Dict[str, int]]:
+    return stats_cache.get(("counts", minutes), write_watermark(db), lambda: severity_counts(db, minutes))
+
+
+def cached_severity_histogram(db: Session, minutes: int, bucket_minutes: int, metric: Optional[str] = None) -> Dict[str, Any]:
+    return stats_cache.get(
+        ("histogram", minutes, bucket_minutes, metric),
+        write_watermark(db),
+        lambda: severity_histogram(db, minutes, bucket_minutes, metric),
+    )
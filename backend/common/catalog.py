@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, case, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+
+
+# series id -> (first_seen, last_seen, points) for one ingest batch
+Deltas = Dict[int, Tuple[datetime, datetime, int]]
+
+
+@dataclass
+class SeriesEntry:
+    id: int
+    metric: str
+    source: str
+    tags: Dict[str, Any]
+    first_seen: Optional[datetime]
+    last_seen: Optional[datetime]
+    point_count: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "metric": self.metric,
+            "source": self.source,
+            "tags": self.tags,
+            "first_seen": self.first_seen.isoformat() if self.first_seen else None,
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+            "point_count": self.point_count,
+        }
+
+
+def catalog_deltas(series_ids: Sequence[int], timestamps: Sequence[datetime]) -> Deltas:
+    deltas: Deltas = {}
+    for sid, ts in zip(series_ids, timestamps):
+        d = deltas.get(sid)
+        if d is None:
+            deltas[sid] = (ts, ts, 1)
+        else:
+            deltas[sid] = (min(d[0], ts), max(d[1], ts), d[2] + 1)
+    return deltas
+
+
+def update_catalog(db: Session, deltas: Deltas) -> None:
+    """Fold one batch into metric_series with a single executemany UPDATE; the caller commits."""
+    if not deltas:
+        return
+    t = models.MetricSeries.__table__
+    first, last = bindparam("b_first"), bindparam("b_last")
+    stmt = (
+        update(t)
+        .where(t.c.id == bindparam("b_id"))
+        .values(
+            first_seen=case((t.c.first_seen.is_(None), first), (t.c.first_seen > first, first), else_=t.c.first_seen),
+            last_seen=case((t.c.last_seen.is_(None), last), (t.c.last_seen < last, last), else_=t.c.last_seen),
+            point_count=t.c.point_count + bindparam("b_count"),
+        )
+    )
+    db.execute(stmt, [{"b_id": sid, "b_first": f, "b_last": l, "b_count": n} for sid, (f, l, n) in deltas.items()])
+
+
+class SeriesCatalog:
+    """Read-through in-memory copy of ``metric_series``.
+
+    Loaded on first use and refreshed after ``ttl_seconds`` so series written by other
+    processes show up; local ingest keeps it current in between via ``observe``.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, SeriesEntry] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure(self, db: Session) -> None:
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return
+        rows = db.execute(select(models.MetricSeries)).scalars().all()
+        entries = {
+            r.id: SeriesEntry(r.id, r.metric, r.source, r.tags or {}, r.first_seen, r.last_seen, r.point_count or 0)
+            for r in rows
+        }
+        with self._lock:
+            self._entries = entries
+            self._loaded_at = time.monotonic()
+
+    def observe(self, deltas: Deltas) -> None:
+        """Apply a committed batch to the in-memory copy."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            for sid, (first, last, n) in deltas.items():
+                e = self._entries.get(sid)
+                if e is None:
+                    # a new series: reload on the next read
+                    self._loaded_at = None
+                    return
+                e.first_seen = first if e.first_seen is None else min(e.first_seen, first)
+                e.last_seen = last if e.last_seen is None else max(e.last_seen, last)
+                e.point_count += n
+
+    def find(
+        self,
+        db: Session,
+        prefix: Optional[str] = None,
+        source: Optional[str] = None,
+        active_minutes: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ) -> List[SeriesEntry]:
+        self._ensure(db)
+        cutoff = (now or datetime.utcnow()) - timedelta(minutes=active_minutes) if active_minutes else None
+        with self._lock:
+            entries = list(self._entries.values())
+        out = [
+            e for e in entries
+            if (not prefix or e.metric.startswith(prefix))
+            and (not source or e.source == source)
+            and (cutoff is None or (e.last_seen is not None and e.last_seen >= cutoff))
+        ]
+        out.sort(key=lambda e: (e.metric, e.source, e.id))
+        return out
+
+    def metric_names(self, db: Session, **filters: Any) -> List[str]:
+        return sorted({e.metric for e in self.find(db, **filters)})
+
+
+series_catalog = SeriesCatalog(ttl_seconds=settings.series_catalog_ttl_seconds)
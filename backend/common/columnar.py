@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import io
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+
+from . import models
+from .catalog import series_catalog
+from .db import ReadSessionLocal
+from . import tsz
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+    _PYARROW = True
+except Exception:  # noqa: BLE001
+    _PYARROW = False
+
+
+FORMATS = {"arrow": "application/vnd.apache.arrow.stream", "parquet": "application/vnd.apache.parquet"}
+
+
+def available() -> bool:
+    return _PYARROW
+
+
+def _schema() -> "pa.Schema":
+    return pa.schema([
+        ("metric", pa.string()),
+        ("series_id", pa.int64()),
+        ("ts", pa.timestamp("ms")),
+        ("value", pa.float64()),
+    ])
+
+
+def _batch(metric: str, series_id: np.ndarray, ts_ms: np.ndarray, values: np.ndarray) -> "pa.RecordBatch":
+    n = len(values)
+    return pa.RecordBatch.from_arrays(
+        [
+            # one-entry dictionary expanded in C++, no per-row Python strings
+            pa.DictionaryArray.from_arrays(np.zeros(n, dtype=np.int32), pa.array([metric])).cast(pa.string()),
+            pa.array(series_id, type=pa.int64()),
+            pa.array(ts_ms.astype("datetime64[ms]"), type=pa.timestamp("ms")),
+            pa.array(values, type=pa.float64()),
+        ],
+        schema=_schema(),
+    )
+
+
+def _in_range(ts_ms: np.ndarray, start: Optional[datetime], end: Optional[datetime]) -> np.ndarray:
+    keep = np.ones(len(ts_ms), dtype=bool)
+    if start is not None:
+        keep &= ts_ms >= np.datetime64(start, "ms").astype(np.int64)
+    if end is not None:
+        keep &= ts_ms < np.datetime64(end, "ms").astype(np.int64)
+    return keep
+
+
+def metric_batches(metrics: Optional[Sequence[str]], start: Optional[datetime], end: Optional[datetime], batch_rows: int) -> Iterator["pa.RecordBatch"]:
+    """Record batches of (metric, series_id, ts, value), per metric in time order: compressed
+    chunks first, then raw points. Columns are filled straight from the fetched tuples."""
+    db = ReadSessionLocal()
+    try:
+        names = list(metrics) if metrics else series_catalog.metric_names(db)
+        for metric in names:
+            q = select(models.MetricChunk.series_id, models.MetricChunk.data).where(models.MetricChunk.metric == metric)
+            if start is not None:
+                q = q.where(models.MetricChunk.end_ts >= start)
+            if end is not None:
+                q = q.where(models.MetricChunk.start_ts < end)
+            for series_id, data in db.execute(q.order_by(models.MetricChunk.start_ts)):
+                ts_ms, values = tsz.decode(data)
+                keep = _in_range(ts_ms, start, end)
+                if keep.any():
+                    yield _batch(metric, np.full(int(keep.sum()), series_id, dtype=np.int64), ts_ms[keep], values[keep])
+
+            q = (
+                select(models.MetricPoint.series_id, models.MetricPoint.ts, models.MetricPoint.value)
+                .where(models.MetricPoint.metric == metric)
+                .order_by(models.MetricPoint.ts)
+                .execution_options(yield_per=batch_rows, stream_results=True)
+            )
+            if start is not None:
+                q = q.where(models.MetricPoint.ts >= start)
+            if end is not None:
+                q = q.where(models.MetricPoint.ts < end)
+            for part in db.execute(q).partitions(batch_rows):
+                n = len(part)
+                series_id = np.fromiter((r[0] for r in part), dtype=np.int64, count=n)
+                ts_ms = np.array([r[1] for r in part], dtype="datetime64[ms]").astype(np.int64)
+                values = np.fromiter((r[2] for r in part), dtype=np.float64, count=n)
+                yield _batch(metric, series_id, ts_ms, values)
+    finally:
+        db.close()
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last ``take``; keeps the
+    absolute position so Parquet footers get correct offsets."""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b: Any) -> int:
+        data = bytes(b)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def take(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts = []
+        return out
+
+
+def stream_metrics(fmt: str, metrics: Optional[Sequence[str]], start: Optional[datetime], end: Optional[datetime], batch_rows: int) -> Iterator[bytes]:
+    """Arrow IPC stream or Parquet file bytes, flushed after every record batch."""
+    sink = _Sink()
+    out = pa.PythonFile(sink, mode="w")
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(out, _schema())
+    else:
+        writer = pa.ipc.new_stream(out, _schema())
+    try:
+        for batch in metric_batches(metrics, start, end, batch_rows):
+            writer.write_batch(batch)
+            chunk = sink.take()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.take()
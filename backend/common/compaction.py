@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from . import models
+from . import tsz
+from .config import settings
+from .db import SessionLocal
+from .logging import get_logger
+from .series_cache import Window, to_epoch
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CompactionRun:
+    started_at: datetime
+    series: int = 0
+    chunks: int = 0
+    points: int = 0
+    bytes: int = 0
+    elapsed_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "series": self.series,
+            "chunks": self.chunks,
+            "points": self.points,
+            "bytes": self.bytes,
+            "bytes_per_point": round(self.bytes / self.points, 3) if self.points else None,
+            "elapsed_ms": round(self.elapsed_seconds * 1000, 3),
+        }
+
+
+def encode_points(rows: List[Tuple[datetime, float]]) -> bytes:
+    ts_ms = np.fromiter((round(to_epoch(t) * 1000) for t, _ in rows), dtype=np.int64, count=len(rows))
+    values = np.fromiter((v for _, v in rows), dtype=np.float64, count=len(rows))
+    return tsz.encode(ts_ms, values)
+
+
+def _chunk_query(metric: str, since: Optional[datetime]):
+    q = select(models.MetricChunk.data).where(models.MetricChunk.metric == metric)
+    if since is not None:
+        q = q.where(models.MetricChunk.end_ts >= since)
+    return q
+
+
+def chunk_window(db: Session, metric: str, since: Optional[datetime] = None, limit: Optional[int] = None) -> Window:
+    """(epoch ts, value) arrays decoded from compressed chunks, oldest first.
+
+    With ``limit`` only the newest chunks needed to cover that many points are decoded.
+    """
+    q = _chunk_query(metric, since).add_columns(models.MetricChunk.count).order_by(models.MetricChunk.end_ts.desc())
+    parts: List[Window] = []
+    total = 0
+    for data, count in db.execute(q):
+        ts_ms, values = tsz.decode(data)
+        parts.append((ts_ms / 1000.0, values))
+        total += count
+        if limit is not None and total >= limit:
+            break
+    if not parts:
+        return np.empty(0), np.empty(0)
+    ts = np.concatenate([p[0] for p in parts])
+    values = np.concatenate([p[1] for p in parts])
+    order = np.argsort(ts, kind="stable")
+    ts, values = ts[order], values[order]
+    if since is not None:
+        keep = ts >= to_epoch(since)
+        ts, values = ts[keep], values[keep]
+    return ts, values
+
+
+def chunk_point_count(db: Session, metric: str, since: datetime) -> int:
+    """Upper bound on compressed points at or after ``since`` (whole overlapping chunks)."""
+    q = select(func.coalesce(func.sum(models.MetricChunk.count), 0)).where(models.MetricChunk.metric == metric)
+    return int(db.execute(q.where(models.MetricChunk.end_ts >= since)).scalar_one())
+
+
+class Compactor:
+    """Moves raw metric_points older than ``age_minutes`` into fixed-size compressed chunks.
+
+    Only full runs of ``chunk_points`` are compacted; the partial tail of a series is left
+    raw until it is older than ``tail_age_minutes``, so each pass does not seal off another
+    small chunk of whatever arrived since the last one.
+    Each chunk is written and its source points deleted in one short transaction, so a
+    crash never loses or duplicates points. Runs in a worker thread like retention.
+    """
+
+    def __init__(
+        self,
+        age_minutes: int | None = None,
+        chunk_points: int | None = None,
+        tail_age_minutes: int | None = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.age_minutes = settings.compaction_age_minutes if age_minutes is None else age_minutes
+        self.tail_age_minutes = settings.compaction_tail_age_minutes if tail_age_minutes is None else tail_age_minutes
+        self.chunk_points = max(2, chunk_points or settings.compaction_chunk_points)
+        self._session_factory = session_factory
+        self.last_run: CompactionRun | None = None
+
+    def run_once(self, now: datetime | None = None) -> CompactionRun:
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(minutes=self.age_minutes)
+        tail_cutoff = now - timedelta(minutes=max(self.tail_age_minutes, self.age_minutes))
+        run = CompactionRun(started_at=now)
+        start = time.perf_counter()
+        db = self._session_factory()
+        try:
+            series = db.execute(select(models.MetricSeries.id, models.MetricSeries.metric)).all()
+        finally:
+            db.close()
+        for series_id, metric in series:
+            before = run.chunks
+            try:
+                while self._compact_chunk(run, series_id, metric, cutoff, tail_cutoff) == self.chunk_points:
+                    pass
+            except Exception as exc:  # noqa: BLE001
+                logger.error("compaction of series %s failed: %s", series_id, exc)
+            if run.chunks > before:
+                run.series += 1
+        run.elapsed_seconds = time.perf_counter() - start
+        self.last_run = run
+        if run.points:
+            logger.info("compacted %d points into %d chunks (%.2f bytes/point)", run.points, run.chunks, run.bytes / run.points)
+        return run
+
+    def _compact_chunk(self, run: CompactionRun, series_id: int, metric: str, cutoff: datetime, tail_cutoff: datetime) -> int:
+        db = self._session_factory()
+        try:
+            rows = db.execute(
+                select(models.MetricPoint.id, models.MetricPoint.ts, models.MetricPoint.value)
+                .where(models.MetricPoint.series_id == series_id)
+                .where(models.MetricPoint.ts < cutoff)
+                .order_by(models.MetricPoint.ts, models.MetricPoint.id)
+                .limit(self.chunk_points)
+            ).all()
+            if not rows or (len(rows) < self.chunk_points and rows[-1].ts >= tail_cutoff):
+                return 0
+            data = encode_points([(r.ts, r.value) for r in rows])
+            db.execute(insert(models.MetricChunk).values(
+                series_id=series_id,
+                metric=metric,
+                start_ts=rows[0].ts,
+                end_ts=rows[-1].ts,
+                count=len(rows),
+                data=data,
+            ))
+            db.execute(delete(models.MetricPoint).where(models.MetricPoint.id.in_([r.id for r in rows])))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        run.chunks += 1
+        run.points += len(rows)
+        run.bytes += len(data)
+        return len(rows)
+
+
+compactor = Compactor()
@@ -14,17 +14,108 @@ class Settings(BaseSettings):
             "sqlite:///autoops.db",
         )
     )
+    # local state such as fitted detector models; relative directories below resolve against it
+    data_dir: str = Field(default=os.getenv("DATA_DIR", os.path.join(os.path.expanduser("~"), ".autoops")))
     influx_url: str | None = Field(default=os.getenv("INFLUX_URL"))
     influx_token: str | None = Field(default=os.getenv("INFLUX_TOKEN"))
     influx_org: str | None = Field(default=os.getenv("INFLUX_ORG"))
     influx_bucket: str | None = Field(default=os.getenv("INFLUX_BUCKET"))
+    influx_batch_size: int = Field(default=int(os.getenv("INFLUX_BATCH_SIZE", "5000")))
+    influx_flush_interval_ms: int = Field(default=int(os.getenv("INFLUX_FLUSH_INTERVAL_MS", "1000")))
+    influx_max_retries: int = Field(default=int(os.getenv("INFLUX_MAX_RETRIES", "3")))
+    influx_retry_queue_size: int = Field(default=int(os.getenv("INFLUX_RETRY_QUEUE_SIZE", "100")))
+    influx_buffer_size: int = Field(default=int(os.getenv("INFLUX_BUFFER_SIZE", "100000")))
+    influx_timeout_ms: int = Field(default=int(os.getenv("INFLUX_TIMEOUT_MS", "10000")))
 
     # Agent / LLM
     openai_api_key: str | None = Field(default=os.getenv("OPENAI_API_KEY"))
     model_name: str = Field(default=os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
 
+    # Ingest
+    ingest_chunk_size: int = Field(default=int(os.getenv("INGEST_CHUNK_SIZE", "1000")))
+    ingest_write_events: bool = Field(default=bool(int(os.getenv("INGEST_WRITE_EVENTS", "1"))))
+    ingest_buffer_enabled: bool = Field(default=bool(int(os.getenv("INGEST_BUFFER_ENABLED", "1"))))
+    ingest_buffer_capacity: int = Field(default=int(os.getenv("INGEST_BUFFER_CAPACITY", "100000")))
+    ingest_flush_size: int = Field(default=int(os.getenv("INGEST_FLUSH_SIZE", "5000")))
+    ingest_flush_interval_seconds: float = Field(default=float(os.getenv("INGEST_FLUSH_INTERVAL_SECONDS", "1.0")))
+    ingest_retry_after_seconds: int = Field(default=int(os.getenv("INGEST_RETRY_AFTER_SECONDS", "1")))
+
+    # Seconds before the in-memory series catalog re-reads metric_series
+    series_catalog_ttl_seconds: float = Field(default=float(os.getenv("SERIES_CATALOG_TTL_SECONDS", "60")))
+
+    # Retention (days per table; 0 keeps rows forever)
+    retention_events_days: float = Field(default=float(os.getenv("RETENTION_EVENTS_DAYS", "7")))
+    retention_metric_points_days: float = Field(default=float(os.getenv("RETENTION_METRIC_POINTS_DAYS", "7")))
+    retention_metric_chunks_days: float = Field(default=float(os.getenv("RETENTION_METRIC_CHUNKS_DAYS", "90")))
+    retention_rollups_1m_days: float = Field(default=float(os.getenv("RETENTION_ROLLUPS_1M_DAYS", "7")))
+    retention_rollups_5m_days: float = Field(default=float(os.getenv("RETENTION_ROLLUPS_5M_DAYS", "35")))
+    retention_rollups_1h_days: float = Field(default=float(os.getenv("RETENTION_ROLLUPS_1H_DAYS", "400")))
+    retention_sketches_1m_days: float = Field(default=float(os.getenv("RETENTION_SKETCHES_1M_DAYS", "7")))
+    retention_sketches_1h_days: float = Field(default=float(os.getenv("RETENTION_SKETCHES_1H_DAYS", "90")))
+    retention_anomalies_days: float = Field(default=float(os.getenv("RETENTION_ANOMALIES_DAYS", "7")))
+    retention_actions_days: float = Field(default=float(os.getenv("RETENTION_ACTIONS_DAYS", "7")))
+    retention_incidents_days: float = Field(default=float(os.getenv("RETENTION_INCIDENTS_DAYS", "7")))
+    retention_chunk_size: int = Field(default=int(os.getenv("RETENTION_CHUNK_SIZE", "2000")))
+    retention_pause_seconds: float = Field(default=float(os.getenv("RETENTION_PAUSE_SECONDS", "0.05")))
+    retention_interval_seconds: int = Field(default=int(os.getenv("RETENTION_INTERVAL_SECONDS", "3600")))
+
+    # materialized row counters behind /summary, /business and the narrative
+    counters_reconcile_interval_seconds: int = Field(default=int(os.getenv("COUNTERS_RECONCILE_INTERVAL_SECONDS", "900")))
+    anomaly_stats_ttl_seconds: float = Field(default=float(os.getenv("ANOMALY_STATS_TTL_SECONDS", "5")))
+
+    # Gorilla-compressed chunk storage for metric history
+    compaction_enabled: bool = Field(default=bool(int(os.getenv("COMPACTION_ENABLED", "0"))))
+    compaction_age_minutes: int = Field(default=int(os.getenv("COMPACTION_AGE_MINUTES", "60")))
+    compaction_chunk_points: int = Field(default=int(os.getenv("COMPACTION_CHUNK_POINTS", "1024")))
+    # a series' last, partial chunk waits until all its points are this old
+    compaction_tail_age_minutes: int = Field(default=int(os.getenv("COMPACTION_TAIL_AGE_MINUTES", "1440")))
+    compaction_interval_seconds: int = Field(default=int(os.getenv("COMPACTION_INTERVAL_SECONDS", "300")))
+
+    # DDSketch quantile sketches per metric and bucket, updated on ingest
+    sketches_enabled: bool = Field(default=bool(int(os.getenv("SKETCHES_ENABLED", "1"))))
+    sketch_relative_accuracy: float = Field(default=float(os.getenv("SKETCH_RELATIVE_ACCURACY", "0.01")))
+    sketch_max_bins: int = Field(default=int(os.getenv("SKETCH_MAX_BINS", "2048")))
+
+    # SLOs declared in YAML, evaluated from rollups/sketches with multi-window burn-rate alerts
+    slo_config_path: str = Field(default=os.getenv("SLO_CONFIG_PATH", "backend/slo/slos.yml"))
+    slo_eval_interval_seconds: int = Field(default=int(os.getenv("SLO_EVAL_INTERVAL_SECONDS", "30")))
+    slo_resync_seconds: int = Field(default=int(os.getenv("SLO_RESYNC_SECONDS", "3600")))
+
+    # SQLite performance mode: WAL + pragmas, read-only pool for GETs, one group-commit writer thread
+    sqlite_performance_mode: bool = Field(default=bool(int(os.getenv("SQLITE_PERFORMANCE_MODE", "0"))))
+    sqlite_synchronous: str = Field(default=os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"))
+    sqlite_cache_size_kb: int = Field(default=int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")))
+    sqlite_mmap_size_mb: int = Field(default=int(os.getenv("SQLITE_MMAP_SIZE_MB", "256")))
+    sqlite_busy_timeout_ms: int = Field(default=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")))
+    sqlite_read_pool_size: int = Field(default=int(os.getenv("SQLITE_READ_POOL_SIZE", "8")))
+    sqlite_writer_max_batch: int = Field(default=int(os.getenv("SQLITE_WRITER_MAX_BATCH", "64")))
+    sqlite_writer_max_wait_ms: float = Field(default=float(os.getenv("SQLITE_WRITER_MAX_WAIT_MS", "2")))
+
+    # Rows fetched (and encoded) per step when streaming /export/* responses
+    export_fetch_size: int = Field(default=int(os.getenv("EXPORT_FETCH_SIZE", "1000")))
+
+    # Per-day SQLite files for events (SQLite deployments only)
+    event_partitioning: bool = Field(default=bool(int(os.getenv("EVENT_PARTITIONING", "0"))))
+    event_partition_dir: str = Field(default=os.getenv("EVENT_PARTITION_DIR", "partitions"))  # relative to data_dir
+
+    # In-memory series cache (16 bytes per point per metric)
+    series_cache_enabled: bool = Field(default=bool(int(os.getenv("SERIES_CACHE_ENABLED", "1"))))
+    series_cache_points: int = Field(default=int(os.getenv("SERIES_CACHE_POINTS", "8192")))
+    series_cache_max_series: int = Field(default=int(os.getenv("SERIES_CACHE_MAX_SERIES", "1000")))
+    series_cache_warm_minutes: int = Field(default=int(os.getenv("SERIES_CACHE_WARM_MINUTES", "60")))
+
     # Detector
     detector_interval_seconds: int = Field(default=10)
+    # "batch" rescans the last 15 minutes each cycle; "streaming" scores every point on ingest
+    detector_mode: str = Field(default=os.getenv("DETECTOR_MODE", "batch"))
+    detector_stream_span: int = Field(default=int(os.getenv("DETECTOR_STREAM_SPAN", "120")))
+    # IsolationForest per series: reused between cycles, refitted in a worker pool, persisted with joblib
+    # (relative to data_dir)
+    detector_model_dir: str = Field(default=os.getenv("DETECTOR_MODEL_DIR", "models"))
+    detector_refit_workers: int = Field(default=int(os.getenv("DETECTOR_REFIT_WORKERS", "2")))
+    detector_refit_seconds: int = Field(default=int(os.getenv("DETECTOR_REFIT_SECONDS", "3600")))
+    detector_refit_samples: int = Field(default=int(os.getenv("DETECTOR_REFIT_SAMPLES", "500")))
+    detector_drift_sigma: float = Field(default=float(os.getenv("DETECTOR_DRIFT_SIGMA", "3")))
 
     # Security
     api_token: str | None = Field(default=os.getenv("API_TOKEN"))
@@ -43,6 +134,9 @@ class Settings(BaseSettings):
     auto_apply_policies: bool = Field(default=bool(int(os.getenv("AUTO_APPLY_POLICIES", "0"))))
     policy_check_interval_seconds: int = Field(default=int(os.getenv("POLICY_CHECK_INTERVAL_SECONDS", "15")))
 
+    # Runbook registry: how often runbooks/ is re-stat'ed for added, edited or removed files
+    runbook_rescan_seconds: float = Field(default=float(os.getenv("RUNBOOK_RESCAN_SECONDS", "2")))
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional
+
+from sqlalchemy import bindparam, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .db import SessionLocal
+from .logging import get_logger
+
+
+logger = get_logger(__name__)
+
+INCIDENT_STATUSES = ("open", "mitigated", "closed")
+# every key a reader needs; rows missing means the table has not been seeded yet
+REQUIRED = ("anomalies", "actions", "incidents") + tuple(f"incidents.{s}" for s in INCIDENT_STATUSES)
+
+_TOTALS = {models.Anomaly: "anomalies", models.Action: "actions", models.Incident: "incidents"}
+_table = models.Counter.__table__
+_increment = (
+    update(_table)
+    .where(_table.c.name == bindparam("key"))
+    .values(value=_table.c.value + bindparam("delta"), updated_at=bindparam("now"))
+)
+
+
+def _status(incident: Any) -> str:
+    return incident.status or "open"  # column default, not applied until INSERT
+
+
+def add_counts(db: Session, deltas: Mapping[str, int]) -> None:
+    """Apply ``{key: delta}`` in the caller's transaction; keys without a row are skipped
+    (the next reconciliation creates them with the true count)."""
+    params = [{"key": k, "delta": d, "now": datetime.utcnow()} for k, d in deltas.items() if d]
+    if params:
+        db.connection().execute(_increment, params)
+
+
+def incident_status_counts(db: Session, ids: Iterable[Any]) -> Dict[str, int]:
+    """``incidents.<status>`` -> rows among ``ids``; for decrementing before a bulk delete."""
+    rows = db.execute(
+        select(models.Incident.status, func.count())
+        .where(models.Incident.id.in_(list(ids)))
+        .group_by(models.Incident.status)
+    ).all()
+    return {f"incidents.{status}": n for status, n in rows}
+
+
+def _flush_deltas(session: Session) -> Dict[str, int]:
+    deltas: Dict[str, int] = {}
+
+    def bump(key: str, d: int) -> None:
+        deltas[key] = deltas.get(key, 0) + d
+
+    for objs, sign in ((session.new, 1), (session.deleted, -1)):
+        for obj in objs:
+            key = _TOTALS.get(type(obj))
+            if key is None:
+                continue
+            bump(key, sign)
+            if key == "incidents":
+                bump(f"incidents.{_status(obj)}", sign)
+    for obj in session.dirty:
+        if type(obj) is not models.Incident:
+            continue
+        history = inspect(obj).attrs.status.history
+        if history.added and history.deleted and history.added[0] != history.deleted[0]:
+            bump(f"incidents.{history.deleted[0]}", -1)
+            bump(f"incidents.{history.added[0] or 'open'}", 1)
+    return deltas
+
+
+@event.listens_for(models.Incident.status, "set", active_history=True)
+def _load_old_status(target: Any, value: Any, oldvalue: Any, initiator: Any) -> None:
+    # registered for active_history: the previous status of an expired incident is loaded
+    # on assignment, so the flush hook can see what it changed from
+    pass
+
+
+@event.listens_for(Session, "before_flush")
+def _count_on_flush(session: Session, flush_context: Any, instances: Any) -> None:
+    # ORM inserts, deletes and incident status changes; bulk DML must call add_counts itself
+    deltas = _flush_deltas(session)
+    if deltas:
+        add_counts(session, deltas)
+
+
+def read_counts(db: Session) -> Dict[str, int]:
+    """Every counter in one primary-key read; falls back to COUNT(*) until first reconciled."""
+    values = dict(db.execute(select(models.Counter.name, models.Counter.value)).all())
+    if all(k in values for k in REQUIRED):
+        return {k: int(v) for k, v in values.items()}
+    return true_counts(db)
+
+
+def true_counts(db: Session) -> Dict[str, int]:
+    counts = {key: 0 for key in REQUIRED}
+    for model, key in _TOTALS.items():
+        counts[key] = int(db.execute(select(func.count()).select_from(model)).scalar_one())
+    for status, n in db.execute(select(models.Incident.status, func.count()).group_by(models.Incident.status)):
+        counts[f"incidents.{status}"] = int(n)
+    return counts
+
+
+def zero_counts(db: Session) -> None:
+    """After deleting every counted row (demo reset); the caller commits."""
+    db.execute(update(models.Counter).values(value=0, updated_at=datetime.utcnow()))
+
+
+@dataclass
+class ReconcileRun:
+    started_at: datetime
+    drift: Dict[str, int] = field(default_factory=dict)  # true - stored, non-zero entries only
+    elapsed_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "drift": self.drift,
+            "elapsed_ms": round(self.elapsed_seconds * 1000, 3),
+        }
+
+
+class CounterReconciler:
+    """Recounts the counted tables and overwrites drifted counters (and seeds missing ones).
+
+    Drift only comes from writes that bypass both the flush hook and ``add_counts``
+    (raw SQL, manual edits), so this runs rarely; it is the only full scan left.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self._session_factory = session_factory
+        self.last_run: Optional[ReconcileRun] = None
+
+    def run_once(self) -> ReconcileRun:
+        run = ReconcileRun(started_at=datetime.utcnow())
+        start = time.perf_counter()
+        db = self._session_factory()
+        try:
+            stored = dict(db.execute(select(models.Counter.name, models.Counter.value)).all())
+            for key, value in true_counts(db).items():
+                if key not in stored:
+                    db.add(models.Counter(name=key, value=value))
+                    run.drift[key] = value
+                elif stored[key] != value:
+                    db.execute(update(models.Counter).where(models.Counter.name == key).values(value=value, updated_at=datetime.utcnow()))
+                    run.drift[key] = value - stored[key]
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        run.elapsed_seconds = time.perf_counter() - start
+        if run.drift:
+            logger.info("counters reconciled: %s", run.drift)
+        self.last_run = run
+        return run
+
+
+counter_reconciler = CounterReconciler()
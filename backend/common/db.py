@@ -1,14 +1,97 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import settings
 
 
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
+_is_sqlite = settings.database_url.startswith("sqlite")
+_in_memory = _is_sqlite and (":memory:" in settings.database_url or settings.database_url.rstrip("/") == "sqlite:")
+# WAL, tuned pragmas and a separate read-only pool; file-backed SQLite only
+sqlite_performance = _is_sqlite and settings.sqlite_performance_mode and not _in_memory
+
+
+def _sqlite_pragmas(dbapi_connection, query_only: bool = False) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_mb) * 1024 * 1024}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    if query_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+connect_args = {"check_same_thread": False} if _is_sqlite else {}
 engine = create_engine(settings.database_url, pool_pre_ping=True, future=True, connect_args=connect_args)
+if sqlite_performance:
+    event.listen(engine, "connect", lambda conn, record: _sqlite_pragmas(conn))
+    # WAL readers never block the writer (or each other), so GETs get their own pool
+    read_engine = create_engine(
+        settings.database_url,
+        pool_pre_ping=True,
+        future=True,
+        connect_args=connect_args,
+        pool_size=settings.sqlite_read_pool_size,
+        max_overflow=settings.sqlite_read_pool_size,
+    )
+    event.listen(read_engine, "connect", lambda conn, record: _sqlite_pragmas(conn, query_only=True))
+else:
+    read_engine = engine
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+
+
+def _explicit_transactions(sync_engine, begin: str = "BEGIN") -> None:
+    """SQLAlchemy's pysqlite SAVEPOINT recipe: the driver never BEGINs before a SAVEPOINT,
+    so each ``begin_nested()`` block would commit on its own. Turn its transaction handling
+    off and emit ``begin`` whenever SQLAlchemy starts a transaction."""
+
+    def _connect(dbapi_connection, record) -> None:
+        dbapi_connection.isolation_level = None
+
+    def _begin(conn) -> None:
+        conn.exec_driver_sql(begin)
+
+    event.listen(sync_engine, "connect", _connect)
+    event.listen(sync_engine, "begin", _begin)
+
+
+if _is_sqlite and not _in_memory:
+    # the group-commit writer runs each job in a SAVEPOINT inside one real transaction;
+    # BEGIN IMMEDIATE takes the write lock up front, so the batch never has to upgrade it
+    writer_engine = create_engine(settings.database_url, pool_pre_ping=True, future=True, connect_args=connect_args)
+    if sqlite_performance:
+        event.listen(writer_engine, "connect", lambda conn, record: _sqlite_pragmas(conn))
+    _explicit_transactions(writer_engine, "BEGIN IMMEDIATE")
+else:
+    writer_engine = engine
+WriterSessionLocal = sessionmaker(bind=writer_engine, autocommit=False, autoflush=False, future=True)
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False, future=True)
 Base = declarative_base()
 
 
+def async_database_url(url: str) -> str:
+    """Same database through an asyncio driver: aiosqlite for SQLite, asyncpg for Postgres."""
+    scheme, sep, rest = url.partition("://")
+    if scheme.split("+")[0] == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if scheme.split("+")[0] in {"postgresql", "postgres"}:
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+try:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(async_database_url(settings.database_url), pool_pre_ping=True)
+    if sqlite_performance:
+        event.listen(async_engine.sync_engine, "connect", lambda conn, record: _sqlite_pragmas(conn))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+except ImportError:  # aiosqlite / asyncpg not installed
+    async_engine = None
+    AsyncSessionLocal = None
+
+
 def get_db_session():
     db = SessionLocal()
     try:
@@ -17,3 +100,18 @@ def get_db_session():
         db.close()
 
 
+async def get_async_db_session():
+    """AsyncSession dependency: queries await the driver instead of holding a worker thread."""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("async database driver not installed (pip install aiosqlite / asyncpg)")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db_session():
+    """Session for read-only handlers; a query_only connection in SQLite performance mode."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,449 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, List, Sequence, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import models
+from .catalog import Deltas, catalog_deltas, series_catalog, update_catalog
+from .config import settings
+from .db import SessionLocal
+from .logging import get_logger
+from .metrics_store import write_metrics_influx
+from .partitions import event_partitions
+from .rollups import update_rollups
+from .quantiles import update_sketches
+from .schemas import MetricIn
+from .series_cache import series_cache
+from .writer import db_writer
+
+
+logger = get_logger(__name__)
+
+_metric_list = TypeAdapter(List[MetricIn])
+
+# cap on per-record error details echoed back to the client
+MAX_REPORTED_ERRORS = 20
+
+# (metric, source, tags_key) -> metric_series.id of committed series; ids seen inside a
+# transaction are only published here by _after_metrics_commit, once it committed
+SeriesIds = Dict[Tuple[str, str, str], int]
+_series_ids: SeriesIds = {}
+
+# called with the (metric, ts, value) points of every committed batch; the streaming
+# detector registers itself here, so ingest does not depend on the detector package
+MetricObserver = Callable[[Iterable[Tuple[str, datetime, float]]], None]
+_metric_observers: List[MetricObserver] = []
+
+
+def add_metric_observer(observer: MetricObserver) -> None:
+    if observer not in _metric_observers:
+        _metric_observers.append(observer)
+
+
+@dataclass
+class IngestReport:
+    accepted: int = 0
+    rejected: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def reject(self, index: int, error: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"index": index, "error": error})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"accepted": self.accepted, "rejected": self.rejected, "errors": self.errors}
+
+
+def event_row(source: str, event_type: str, payload: Dict[str, Any], created_at: datetime | None = None) -> Dict[str, Any]:
+    return {
+        "id": str(uuid.uuid4()),
+        "source": source,
+        "type": event_type,
+        "payload": payload,
+        "created_at": created_at or datetime.utcnow(),
+    }
+
+
+def metric_event_row(metric: MetricIn, created_at: datetime | None = None) -> Dict[str, Any]:
+    payload = {
+        "metric": metric.metric,
+        "value": metric.value,
+        "timestamp": metric.timestamp.isoformat(),
+        "tags": metric.tags,
+    }
+    return event_row(metric.source, "metric", payload, created_at)
+
+
+def write_events(db: Session, rows: Sequence[Dict[str, Any]]) -> None:
+    """Insert event rows into the day partitions if enabled (committed there), else into
+    ``events`` on ``db`` for the caller to commit."""
+    if not rows:
+        return
+    if event_partitions.enabled:
+        event_partitions.insert_rows(rows)
+        return
+    chunk_size = max(1, settings.ingest_chunk_size)
+    for start in range(0, len(rows), chunk_size):
+        db.execute(insert(models.Event), list(rows[start:start + chunk_size]))
+
+
+def validate_metrics(records: Sequence[Tuple[int, Any]], report: IngestReport) -> List[MetricIn]:
+    """Validate (index, raw record) pairs in one pydantic call; invalid ones are reported and skipped."""
+    raw = [r for _, r in records]
+    try:
+        return _metric_list.validate_python(raw)
+    except ValidationError as exc:
+        bad: Dict[int, str] = {}
+        for err in exc.errors():
+            pos = err["loc"][0]
+            if isinstance(pos, int) and pos not in bad:
+                bad[pos] = f"{'.'.join(str(p) for p in err['loc'][1:]) or 'record'}: {err['msg']}"
+        for pos in sorted(bad):
+            report.reject(records[pos][0], bad[pos])
+        good = [r for pos, r in enumerate(raw) if pos not in bad]
+        return _metric_list.validate_python(good) if good else []
+
+
+def utc_naive(ts: datetime) -> datetime:
+    if ts.tzinfo is not None:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def tags_key(tags: Dict[str, Any] | None) -> str:
+    return hashlib.sha1(json.dumps(tags or {}, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _get_or_create_series(db: Session, metric: str, source: str, key: str, tags: Dict[str, Any] | None) -> int:
+    q = (
+        select(models.MetricSeries.id)
+        .where(models.MetricSeries.metric == metric)
+        .where(models.MetricSeries.source == source)
+        .where(models.MetricSeries.tags_key == key)
+    )
+    series_id = db.execute(q).scalar()
+    if series_id is not None:
+        return series_id
+    try:
+        with db.begin_nested():
+            series = models.MetricSeries(metric=metric, source=source, tags_key=key, tags=tags or {})
+            db.add(series)
+            db.flush()
+            return series.id
+    except IntegrityError:
+        # another writer created it first
+        return db.execute(q).scalar_one()
+
+
+def resolve_series(db: Session, metrics: Sequence[MetricIn], new_series: SeriesIds) -> List[int]:
+    """Series id per metric. Ids not in the shared cache yet are looked up or created in
+    ``db``'s transaction and collected in ``new_series``; another writer must not see them
+    before that transaction commits."""
+    ids = []
+    for m in metrics:
+        key = (m.metric, m.source, tags_key(m.tags))
+        series_id = _series_ids.get(key)
+        if series_id is None:
+            series_id = new_series.get(key)
+            if series_id is None:
+                series_id = new_series[key] = _get_or_create_series(db, key[0], key[1], key[2], m.tags)
+        ids.append(series_id)
+    return ids
+
+
+def write_points(db: Session, metrics: Sequence[MetricIn], new_series: SeriesIds | None = None) -> Deltas:
+    """Insert typed (series, ts, value) rows, fold them into the rollup tiers and sketches and update the
+    series catalog; the caller commits. Returns the catalog deltas for ``series_catalog.observe``;
+    series ids resolved in this transaction are added to ``new_series``."""
+    series_ids = resolve_series(db, metrics, {} if new_series is None else new_series)
+    deltas = catalog_deltas(series_ids, [utc_naive(m.timestamp) for m in metrics])
+    update_catalog(db, deltas)
+    chunk_size = max(1, settings.ingest_chunk_size)
+    for start in range(0, len(metrics), chunk_size):
+        rows = [
+            {"series_id": sid, "metric": m.metric, "ts": utc_naive(m.timestamp), "value": float(m.value)}
+            for m, sid in zip(metrics[start:start + chunk_size], series_ids[start:start + chunk_size])
+        ]
+        db.execute(insert(models.MetricPoint), rows)
+        points = [(r["metric"], r["ts"], r["value"]) for r in rows]
+        update_rollups(db, points)
+        # after the INSERT, so on SQLite this transaction already holds the write lock
+        # and no other writer can slip in between the sketches' read and upsert
+        update_sketches(db, points)
+    return deltas
+
+
+def stage_metrics(db: Session, metrics: Sequence[MetricIn]) -> Tuple[Deltas, List[Dict[str, Any]], SeriesIds]:
+    """Write points, rollups, catalog and (unpartitioned) events into ``db`` without committing.
+
+    Returns what :func:`_after_metrics_commit` needs once the transaction is durable.
+    """
+    now = datetime.utcnow()
+    events = [metric_event_row(m, now) for m in metrics] if settings.ingest_write_events else []
+    if not event_partitions.enabled:
+        write_events(db, events)
+    new_series: SeriesIds = {}
+    deltas = write_points(db, metrics, new_series)
+    return deltas, events, new_series
+
+
+def _after_metrics_commit(metrics: Sequence[MetricIn], staged: Tuple[Deltas, List[Dict[str, Any]], SeriesIds]) -> None:
+    deltas, events, new_series = staged
+    _series_ids.update(new_series)
+    if event_partitions.enabled:
+        # partition files commit on their own, after the points are durable
+        write_events(None, events)
+    series_catalog.observe(deltas)
+    points = [(m.metric, utc_naive(m.timestamp), float(m.value)) for m in metrics]
+    series_cache.append_many(points)
+    for observer in _metric_observers:
+        try:
+            observer(points)
+        except Exception as exc:  # noqa: BLE001
+            # the points are committed; an observer failing must not fail the ingest
+            logger.error("metric observer %r failed: %s", observer, exc)
+
+
+def write_metrics(db: Session, metrics: Sequence[MetricIn]) -> int:
+    """Persist metrics as typed points (plus JSON events, if enabled) with executemany INSERTs and one commit.
+
+    When the SQLite writer thread is running the batch is handed to it instead (``db`` is
+    not used) and shares a group commit with other queued writes.
+    """
+    if not metrics:
+        return 0
+    if db_writer.running:
+        db_writer.run(lambda s: stage_metrics(s, metrics), on_commit=lambda staged: _after_metrics_commit(metrics, staged))
+        return len(metrics)
+    try:
+        staged = stage_metrics(db, metrics)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    _after_metrics_commit(metrics, staged)
+    return len(metrics)
+
+
+async def write_metrics_async(db: AsyncSession, metrics: Sequence[MetricIn]) -> int:
+    """:func:`write_metrics` on an AsyncSession, so the database round trips await instead of blocking."""
+    if not metrics:
+        return 0
+    try:
+        if db_writer.running:
+            future = db_writer.submit(lambda s: stage_metrics(s, metrics), on_commit=lambda staged: _after_metrics_commit(metrics, staged))
+            await asyncio.wrap_future(future)
+            return len(metrics)
+        staged = await db.run_sync(stage_metrics, metrics)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    _after_metrics_commit(metrics, staged)
+    return len(metrics)
+
+
+def forward_metrics_influx(metrics: Sequence[MetricIn]) -> None:
+    # optional sink; never fail ingest because InfluxDB is unavailable
+    try:
+        write_metrics_influx([
+            (m.metric, float(m.value), {k: str(v) for k, v in (m.tags or {}).items()}, m.timestamp)
+            for m in metrics
+        ])
+    except Exception:  # noqa: BLE001
+        pass
+
+
+def persist_metrics(db: Session, metrics: Sequence[MetricIn]) -> int:
+    count = write_metrics(db, metrics)
+    forward_metrics_influx(metrics)
+    return count
+
+
+async def persist_metrics_async(db: AsyncSession, metrics: Sequence[MetricIn]) -> int:
+    count = await write_metrics_async(db, metrics)
+    forward_metrics_influx(metrics)
+    return count
+
+
+class IngestBufferFull(Exception):
+    pass
+
+
+class IngestBuffer:
+    """Bounded write-behind queue; a background thread drains it into bulk inserts.
+
+    Handlers ``offer`` validated metrics and return immediately. The flusher writes
+    whenever ``flush_size`` points are queued or ``flush_interval`` seconds have
+    passed, and ``stop`` drains whatever is still buffered.
+    """
+
+    def __init__(self, capacity: int, flush_size: int, flush_interval: float) -> None:
+        self.capacity = max(1, capacity)
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = max(0.01, flush_interval)
+        self._items: Deque[MetricIn] = deque()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self.accepted = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.dropped = 0
+        self.flush_errors = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self._total_flush_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="ingest-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        # anything offered after the flusher exited still gets written
+        while self._items:
+            self._flush(self._drain())
+
+    def offer(self, metrics: Sequence[MetricIn]) -> None:
+        """Queue all of ``metrics`` or none of them; raises IngestBufferFull when out of room."""
+        with self._cond:
+            if len(self._items) + len(metrics) > self.capacity:
+                self.dropped += len(metrics)
+                raise IngestBufferFull()
+            self._items.extend(metrics)
+            self.accepted += len(metrics)
+            if len(self._items) >= self.flush_size:
+                self._cond.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            depth = len(self._items)
+        return {
+            "running": self.running,
+            "depth": depth,
+            "capacity": self.capacity,
+            "accepted": self.accepted,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "last_flush_ms": round(self.last_flush_seconds * 1000, 3),
+            "max_flush_ms": round(self.max_flush_seconds * 1000, 3),
+            "avg_flush_ms": round(self._total_flush_seconds / self.flushes * 1000, 3) if self.flushes else 0.0,
+        }
+
+    def _drain(self) -> List[MetricIn]:
+        with self._cond:
+            n = min(self.flush_size, len(self._items))
+            return [self._items.popleft() for _ in range(n)]
+
+    def _run(self) -> None:
+        while True:
+            deadline = time.monotonic() + self.flush_interval
+            with self._cond:
+                while not self._stopping and len(self._items) < self.flush_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                stopping = self._stopping
+            batch = self._drain()
+            if batch:
+                self._flush(batch)
+            if stopping and not self._items:
+                return
+
+    def _flush(self, batch: List[MetricIn]) -> None:
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            persist_metrics(db, batch)
+            self.flushed += len(batch)
+        except Exception as exc:  # noqa: BLE001
+            db.rollback()
+            self.flush_errors += 1
+            self.dropped += len(batch)
+            logger.error("ingest flush of %d points failed: %s", len(batch), exc)
+        finally:
+            db.close()
+        elapsed = time.perf_counter() - start
+        self.flushes += 1
+        self.last_flush_seconds = elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        self._total_flush_seconds += elapsed
+
+
+ingest_buffer = IngestBuffer(
+    capacity=settings.ingest_buffer_capacity,
+    flush_size=settings.ingest_flush_size,
+    flush_interval=settings.ingest_flush_interval_seconds,
+)
+
+
+def ingest_chunk(db: Session, records: Sequence[Tuple[int, Any]], report: IngestReport) -> None:
+    """Validate and store one chunk; goes through the write-behind buffer when it is running."""
+    metrics = validate_metrics(records, report)
+    if ingest_buffer.running:
+        ingest_buffer.offer(metrics)
+        report.accepted += len(metrics)
+        return
+    report.accepted += persist_metrics(db, metrics)
+
+
+async def ingest_chunk_async(db: AsyncSession, records: Sequence[Tuple[int, Any]], report: IngestReport) -> None:
+    """:func:`ingest_chunk` for async handlers; validation runs in a worker thread."""
+    metrics = await asyncio.to_thread(validate_metrics, records, report)
+    if ingest_buffer.running:
+        ingest_buffer.offer(metrics)
+        report.accepted += len(metrics)
+        return
+    report.accepted += await persist_metrics_async(db, metrics)
+
+
+async def iter_ndjson(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[Any, str | None]]:
+    """Yield (record, error) per non-empty NDJSON line without buffering the whole body."""
+    pending = b""
+    async for chunk in stream:
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if pending.strip():
+        yield _parse_line(pending)
+
+
+def _parse_line(line: bytes) -> Tuple[Any, str | None]:
+    try:
+        return json.loads(line), None
+    except ValueError as exc:
+        return None, f"invalid json: {exc}"
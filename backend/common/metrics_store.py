@@ -1,45 +1,227 @@
 from __future__ import annotations
 
+import atexit
+import threading
+import time
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Any, Deque, Dict, List, Sequence, Tuple
 
 from .config import settings
+from .logging import get_logger
 
 try:
     from influxdb_client import InfluxDBClient, Point
+    from influxdb_client.client.write_api import SYNCHRONOUS
+    from urllib3 import Retry
     _INFLUX = True
 except Exception:  # noqa: BLE001
     _INFLUX = False
 
 
+logger = get_logger(__name__)
+
+
+def _influx_configured() -> bool:
+    return bool(_INFLUX and settings.influx_url and settings.influx_token and settings.influx_org and settings.influx_bucket)
+
+
+class InfluxManager:
+    """One long-lived InfluxDB client with a batching writer, shared by writers and readers.
+
+    ``write`` only appends to an in-memory buffer; a background thread sends it every
+    ``batch_size`` points or ``flush_interval_ms`` through the client's synchronous write
+    API. (The client library's own batching mode can drop points when its time and count
+    windows close at the same moment.) Batches that fail are kept in a bounded retry queue
+    and re-sent on later flushes; when the queue is full the oldest batch is dropped and
+    counted. The buffer itself holds at most ``buffer_size`` points (the oldest are dropped
+    and counted while InfluxDB is unreachable). ``close`` flushes everything still
+    buffered, including queued retries, but waits at most one flush interval plus one
+    HTTP timeout for the writer thread.
+    """
+
+    def __init__(
+        self,
+        batch_size: int | None = None,
+        flush_interval_ms: int | None = None,
+        max_retries: int | None = None,
+        retry_queue_size: int | None = None,
+        buffer_size: int | None = None,
+    ) -> None:
+        self.batch_size = batch_size or settings.influx_batch_size
+        self.flush_interval_ms = flush_interval_ms or settings.influx_flush_interval_ms
+        self.max_retries = settings.influx_max_retries if max_retries is None else max_retries
+        self.retry_queue_size = retry_queue_size or settings.influx_retry_queue_size
+        self.buffer_size = max(1, buffer_size or settings.influx_buffer_size)
+        self.timeout_ms = settings.influx_timeout_ms
+        self._client: Any = None
+        self._write_api: Any = None
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._buffer: List[Any] = []
+        self._closing = False
+        self._thread: threading.Thread | None = None
+        self._retry: Deque[List[Any]] = deque()
+        self._last_retry = 0.0
+        self._atexit = False
+        self.written_batches = 0
+        self.failed_batches = 0
+        self.retried_batches = 0
+        self.dropped_batches = 0
+        self.dropped_points = 0
+
+    @property
+    def started(self) -> bool:
+        return self._client is not None
+
+    def start(self) -> bool:
+        if not _influx_configured():
+            return False
+        with self._lock:
+            if self._client is not None:
+                return True
+            self._client = InfluxDBClient(
+                url=settings.influx_url,
+                token=settings.influx_token,
+                org=settings.influx_org,
+                timeout=self.timeout_ms,
+                retries=Retry(total=self.max_retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=None),
+            )
+            self._write_api = self._client.write_api(write_options=SYNCHRONOUS)
+            self._closing = False
+            self._thread = threading.Thread(target=self._run, name="influx-writer", daemon=True)
+            self._thread.start()
+            if not self._atexit:
+                atexit.register(self.close)
+                self._atexit = True
+        return True
+
+    def close(self) -> None:
+        """Flush pending batches (including queued retries) and release the connection pool."""
+        with self._lock:
+            if self._client is None:
+                return
+            self._closing = True
+            self._wake.notify()
+            thread = self._thread
+        # the writer thread drains the buffer and the retry queue before it exits
+        thread.join((self.flush_interval_ms + self.timeout_ms) / 1000.0)
+        if thread.is_alive():
+            logger.warning("influx writer did not finish flushing; %d points left unsent", len(self._buffer))
+        with self._lock:
+            client = self._client
+            self._client = self._write_api = self._thread = None
+        client.close()
+
+    def write(self, records: Sequence[Any]) -> None:
+        if not records or not self.start():
+            return
+        with self._lock:
+            self._buffer.extend(records)
+            overflow = len(self._buffer) - self.buffer_size
+            if overflow > 0:
+                del self._buffer[:overflow]
+                self.dropped_points += overflow
+            if len(self._buffer) >= self.batch_size:
+                self._wake.notify()
+
+    def _run(self) -> None:
+        interval = self.flush_interval_ms / 1000.0
+        while True:
+            with self._lock:
+                self._wake.wait_for(lambda: self._closing or len(self._buffer) >= self.batch_size, timeout=interval)
+                records, self._buffer = self._buffer, []
+                closing = self._closing
+                write_api = self._write_api
+            if self._retry and (closing or time.monotonic() - self._last_retry >= interval):
+                self._resubmit(write_api)
+            for i in range(0, len(records), self.batch_size):
+                self._send(write_api, records[i:i + self.batch_size])
+            if closing:
+                with self._lock:
+                    if not self._buffer:
+                        return
+
+    def query_api(self) -> Any:
+        if not self.start():
+            return None
+        return self._client.query_api()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "buffered": len(self._buffer),
+            "written_batches": self.written_batches,
+            "failed_batches": self.failed_batches,
+            "retried_batches": self.retried_batches,
+            "dropped_batches": self.dropped_batches,
+            "dropped_points": self.dropped_points,
+            "retry_queue": len(self._retry),
+        }
+
+    def _resubmit(self, write_api: Any) -> None:
+        self._last_retry = time.monotonic()
+        for _ in range(len(self._retry)):
+            try:
+                batch = self._retry.popleft()
+            except IndexError:
+                break
+            self.retried_batches += 1
+            self._send(write_api, batch)
+
+    def _send(self, write_api: Any, batch: List[Any]) -> None:
+        try:
+            write_api.write(bucket=settings.influx_bucket, record=batch)
+        except Exception as exc:  # noqa: BLE001
+            self.failed_batches += 1
+            if len(self._retry) >= self.retry_queue_size:
+                self._retry.popleft()
+                self.dropped_batches += 1
+            self._retry.append(batch)
+            logger.warning("influx batch failed, queued for retry (%d queued): %s", len(self._retry), exc)
+            return
+        self.written_batches += 1
+
+
+influx = InfluxManager()
+
+
+def _point(metric: str, value: float, tags: Dict[str, str] | None, timestamp: datetime | None) -> Any:
+    p = Point("metrics").tag("metric", metric).field("value", float(value))
+    for k, v in (tags or {}).items():
+        p = p.tag(k, str(v))
+    if timestamp:
+        p = p.time(timestamp)
+    return p
+
+
 def write_metric_influx(metric: str, value: float, tags: Dict[str, str] | None = None, timestamp: datetime | None = None) -> None:
-    if not _INFLUX or not settings.influx_url or not settings.influx_token or not settings.influx_org or not settings.influx_bucket:
+    if not _influx_configured():
         return
-    with InfluxDBClient(url=settings.influx_url, token=settings.influx_token, org=settings.influx_org) as client:
-        write_api = client.write_api()
-        p = Point("metrics").tag("metric", metric).field("value", float(value))
-        for k, v in (tags or {}).items():
-            p = p.tag(k, str(v))
-        if timestamp:
-            p = p.time(timestamp)
-        write_api.write(bucket=settings.influx_bucket, record=p)
+    influx.write([_point(metric, value, tags, timestamp)])
+
+
+def write_metrics_influx(points: Sequence[Tuple[str, float, Dict[str, str] | None, datetime | None]]) -> None:
+    """Queue many (metric, value, tags, timestamp) points on the shared batching writer."""
+    if not points or not _influx_configured():
+        return
+    influx.write([_point(*p) for p in points])
 
 
 def query_recent_metrics_influx(minutes: int = 15) -> Dict[str, List[Tuple[datetime, float]]]:
     series: Dict[str, List[Tuple[datetime, float]]] = {}
-    if not _INFLUX or not settings.influx_url or not settings.influx_token or not settings.influx_org or not settings.influx_bucket:
+    if not _influx_configured():
         return series
-    with InfluxDBClient(url=settings.influx_url, token=settings.influx_token, org=settings.influx_org) as client:
-        query_api = client.query_api()
-        start = f"-{minutes}m"
-        q = f'from(bucket:"{settings.influx_bucket}") |> range(start: {start}) |> filter(fn: (r) => r._measurement == "metrics")'
-        tables = query_api.query(q)
-        for table in tables:
-            for record in table.records:
-                metric = str(record.values.get("metric"))
-                value = float(record.get_value())
-                ts = record.get_time()
-                series.setdefault(metric, []).append((ts, value))
+    query_api = influx.query_api()
+    if query_api is None:
+        return series
+    start = f"-{minutes}m"
+    q = f'from(bucket:"{settings.influx_bucket}") |> range(start: {start}) |> filter(fn: (r) => r._measurement == "metrics")'
+    tables = query_api.query(q)
+    for table in tables:
+        for record in table.records:
+            metric = str(record.values.get("metric"))
+            value = float(record.get_value())
+            ts = record.get_time()
+            series.setdefault(metric, []).append((ts, value))
     return series
-
-
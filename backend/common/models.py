@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, JSON, String, Text, Boolean
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Index, Integer, JSON, LargeBinary, String, Text, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from .db import Base
@@ -19,6 +19,11 @@ class Event(Base):
     payload = Column(JSON, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_events_type_created_at", "type", "created_at"),
+        Index("ix_events_created_at_id", "created_at", "id"),  # keyset pagination order
+    )
+
 
 class Anomaly(Base):
     __tablename__ = "anomalies"
@@ -31,6 +36,11 @@ class Anomaly(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     incident_id = Column(String(36), ForeignKey("incidents.id"), nullable=True)
 
+    __table_args__ = (
+        Index("ix_anomalies_metric_severity_created_at", "metric", "severity", "created_at"),
+        Index("ix_anomalies_created_at_id", "created_at", "id"),  # keyset pagination order
+    )
+
 
 class Runbook(Base):
     __tablename__ = "runbooks"
@@ -56,6 +66,11 @@ class Action(Base):
 
     runbook = relationship("Runbook")
 
+    __table_args__ = (
+        Index("ix_actions_name_created_at", "name", "created_at"),
+        Index("ix_actions_created_at_id", "created_at", "id"),  # keyset pagination order
+    )
+
 
 class Incident(Base):
     __tablename__ = "incidents"
@@ -69,4 +84,93 @@ class Incident(Base):
 
     anomalies = relationship("Anomaly", backref="incident")
 
+    __table_args__ = (
+        Index("ix_incidents_status_created_at", "status", "created_at"),
+        Index("ix_incidents_created_at_id", "created_at", "id"),  # keyset pagination order
+    )
+
+
+class MetricSeries(Base):
+    __tablename__ = "metric_series"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    metric = Column(String(64), nullable=False)
+    source = Column(String(128), nullable=False)
+    tags_key = Column(String(40), nullable=False)  # sha1 of canonical tags JSON
+    tags = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    first_seen = Column(DateTime, nullable=True)
+    last_seen = Column(DateTime, nullable=True)
+    point_count = Column(Integer, default=0, server_default="0", nullable=False)  # points ingested, not retained
+
+    __table_args__ = (UniqueConstraint("metric", "source", "tags_key", name="uq_metric_series_key"),)
+
+
+class MetricPoint(Base):
+    __tablename__ = "metric_points"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    series_id = Column(Integer, ForeignKey("metric_series.id"), nullable=False)
+    metric = Column(String(64), nullable=False)
+    ts = Column(DateTime, nullable=False)
+    value = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_metric_points_metric_ts", "metric", "ts"),
+        Index("ix_metric_points_series_ts", "series_id", "ts"),
+    )
+
+
+class MetricChunk(Base):
+    """Gorilla-compressed run of points for one series (see ``common.tsz``)."""
+
+    __tablename__ = "metric_chunks"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    series_id = Column(Integer, ForeignKey("metric_series.id"), nullable=False)
+    metric = Column(String(64), nullable=False)
+    start_ts = Column(DateTime, nullable=False)
+    end_ts = Column(DateTime, nullable=False)
+    count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+    __table_args__ = (
+        Index("ix_metric_chunks_metric_end_ts", "metric", "end_ts"),
+        Index("ix_metric_chunks_series_start_ts", "series_id", "start_ts"),
+    )
+
+
+class MetricRollup(Base):
+    __tablename__ = "metric_rollups"
+
+    metric = Column(String(64), primary_key=True)
+    tier = Column(Integer, primary_key=True)  # bucket width in seconds: 60 | 300 | 3600
+    bucket = Column(DateTime, primary_key=True)  # bucket start (UTC)
+    count = Column(Integer, nullable=False)
+    sum_value = Column(Float, nullable=False)
+    min_value = Column(Float, nullable=False)
+    max_value = Column(Float, nullable=False)
+    last_value = Column(Float, nullable=False)
+    last_ts = Column(DateTime, nullable=False)
+
+
+class MetricSketch(Base):
+    """DDSketch of one metric's values in one bucket (see ``common.sketch``)."""
+
+    __tablename__ = "metric_sketches"
+
+    metric = Column(String(64), primary_key=True)
+    tier = Column(Integer, primary_key=True)  # bucket width in seconds: 60 | 3600
+    bucket = Column(DateTime, primary_key=True)  # bucket start (UTC)
+    count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+
+class Counter(Base):
+    """Row counts kept in step with their tables (see ``common.counters``)."""
+
+    __tablename__ = "counters"
 
+    name = Column(String(64), primary_key=True)  # anomalies | actions | incidents | incidents.<status>
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional, Sequence
 
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 
 from . import models
+from .catalog import series_catalog
+from .counters import zero_counts
+from .partitions import event_partitions
 
 
 def create_incident_if_needed(db: Session, metric: str, severity: str) -> Optional[models.Incident]:
@@ -49,3 +53,50 @@ def mitigate_incidents_for_action(db: Session, action_name: str) -> int:
     return count
 
 
+def runbook_success_stats(db: Session, names: Sequence[str], window: int = 50) -> Dict[str, Dict[str, Any]]:
+    """Success rate and last success over each runbook's latest ``window`` actions, for
+    every name in one windowed query (ROW_NUMBER per name on the name/created_at index)."""
+    if not names:
+        return {}
+    ranked = (
+        select(
+            models.Action.name,
+            models.Action.success,
+            models.Action.created_at,
+            func.row_number().over(partition_by=models.Action.name, order_by=models.Action.created_at.desc()).label("rn"),
+        )
+        .where(models.Action.name.in_(list(names)))
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            ranked.c.name,
+            func.count(),
+            func.sum(case((ranked.c.success, 1), else_=0)),
+            func.max(case((ranked.c.success, ranked.c.created_at))),
+        )
+        .where(ranked.c.rn <= window)
+        .group_by(ranked.c.name)
+    )
+    return {
+        name: {"recent_success_rate": (ok or 0) / total, "last_success_at": last.isoformat() if last else None}
+        for name, total, ok, last in rows
+    }
+
+
+def clear_demo_data(db: Session) -> None:
+    """Delete all operational and metric data (demo resets); the caller commits."""
+    # delete in order of dependencies
+    db.query(models.Action).delete()
+    db.query(models.Anomaly).delete()
+    db.query(models.Incident).delete()
+    db.query(models.Event).delete()
+    db.query(models.MetricPoint).delete()
+    db.query(models.MetricChunk).delete()
+    db.query(models.MetricRollup).delete()
+    db.query(models.MetricSketch).delete()
+    db.query(models.MetricSeries).update({"first_seen": None, "last_seen": None, "point_count": 0})
+    zero_counts(db)
+    series_catalog.invalidate()
+    if event_partitions.enabled:
+        event_partitions.clear()
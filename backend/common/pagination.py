@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, tuple_
+
+
+# response header carrying the cursor for the next (older) page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    raw = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("invalid cursor") from exc
+
+
+def keyset_page(q: Select, created_col: Any, id_col: Any, cursor: Optional[str], limit: int) -> Select:
+    """Newest-first page of ``q`` strictly after ``cursor`` on (created_at, id).
+
+    The row-value comparison is a range on the (created_at, id) index, so page N costs
+    the same as page 1. Fetches one extra row so :func:`split_page` knows whether more exist.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        q = q.where(tuple_(created_col, id_col) < tuple_(created_at, row_id))
+    return q.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """(page rows, cursor for the next page or None) from a :func:`keyset_page` result."""
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
+
+
+def page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
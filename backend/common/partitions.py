@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import create_engine, insert, select, tuple_
+from sqlalchemy.engine import Engine
+
+from . import models
+from .config import settings
+from .logging import get_logger
+
+
+logger = get_logger(__name__)
+
+_FILE_RE = re.compile(r"^events_(\d{8})\.db$")
+
+
+class EventPartitions:
+    """Events stored in one SQLite file per UTC day (``events_YYYYMMDD.db``).
+
+    Retention drops whole files instead of running row DELETEs, and range reads
+    only open the days they cover. Each partition has the regular ``events``
+    schema (including its indexes), so queries are the same as on the main DB.
+    """
+
+    def __init__(self, directory: str | os.PathLike, enabled: bool = True) -> None:
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self._engines: Dict[date, Engine] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, day: date) -> Path:
+        return self.directory / f"events_{day:%Y%m%d}.db"
+
+    def days(self) -> List[date]:
+        if not self.directory.exists():
+            return []
+        out = []
+        for p in self.directory.iterdir():
+            m = _FILE_RE.match(p.name)
+            if m:
+                out.append(datetime.strptime(m.group(1), "%Y%m%d").date())
+        return sorted(out)
+
+    def _engine(self, day: date, create: bool = False) -> Engine | None:
+        with self._lock:
+            eng = self._engines.get(day)
+            if eng is not None:
+                return eng
+            path = self._path(day)
+            if not path.exists() and not create:
+                return None
+            self.directory.mkdir(parents=True, exist_ok=True)
+            eng = create_engine(f"sqlite:///{path}", future=True, connect_args={"check_same_thread": False})
+            models.Event.__table__.create(eng, checkfirst=True)
+            self._engines[day] = eng
+            return eng
+
+    def insert_rows(self, rows: Sequence[Dict[str, Any]]) -> int:
+        """Insert event rows (with ``created_at`` set) into their day's partition."""
+        by_day: Dict[date, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_day.setdefault(row["created_at"].date(), []).append(row)
+        for day, day_rows in by_day.items():
+            eng = self._engine(day, create=True)
+            with eng.begin() as conn:
+                conn.execute(insert(models.Event.__table__), day_rows)
+        return len(rows)
+
+    def recent(self, limit: int, types: Sequence[str] | None = None, before: Tuple[datetime, str] | None = None) -> List[Any]:
+        """Newest events first, opening partitions from today backwards until ``limit`` is met.
+
+        ``before`` is a (created_at, id) keyset position; only older events are returned.
+        """
+        table = models.Event.__table__
+        out: List[Any] = []
+        for day in reversed(self.days()):
+            if before is not None and day > before[0].date():
+                continue
+            eng = self._engine(day)
+            if eng is None:
+                continue
+            q = select(table).order_by(table.c.created_at.desc(), table.c.id.desc()).limit(limit - len(out))
+            if types:
+                q = q.where(table.c.type.in_(list(types)))
+            if before is not None:
+                q = q.where(tuple_(table.c.created_at, table.c.id) < tuple_(*before))
+            with eng.connect() as conn:
+                out.extend(conn.execute(q).all())
+            if len(out) >= limit:
+                break
+        return out
+
+    def range(self, start: datetime, end: datetime | None = None, types: Sequence[str] | None = None) -> Iterator[Any]:
+        """Events with start <= created_at < end, oldest first; only partitions in the range are opened."""
+        table = models.Event.__table__
+        end = end or datetime.utcnow() + timedelta(seconds=1)
+        for day in self.days():
+            if day < start.date() or day > end.date():
+                continue
+            eng = self._engine(day)
+            if eng is None:
+                continue
+            q = (
+                select(table)
+                .where(table.c.created_at >= start)
+                .where(table.c.created_at < end)
+                .order_by(table.c.created_at)
+            )
+            if types:
+                q = q.where(table.c.type.in_(list(types)))
+            with eng.connect() as conn:
+                yield from conn.execute(q)
+
+    def drop_before(self, cutoff: datetime) -> int:
+        """Drop every partition whose whole day is older than ``cutoff``; returns partitions dropped."""
+        dropped = 0
+        for day in self.days():
+            if day >= cutoff.date():
+                break
+            self._drop(day)
+            dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        for day in self.days():
+            self._drop(day)
+
+    def _drop(self, day: date) -> None:
+        with self._lock:
+            eng = self._engines.pop(day, None)
+        if eng is not None:
+            eng.dispose()
+        path = self._path(day)
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            try:
+                os.remove(f"{path}{suffix}")
+            except FileNotFoundError:
+                pass
+        logger.info("dropped event partition %s", path.name)
+
+
+def _partitioning_enabled() -> bool:
+    if not settings.event_partitioning:
+        return False
+    if not settings.database_url.startswith("sqlite"):
+        logger.warning("EVENT_PARTITIONING only applies to SQLite deployments; events stay in the main table")
+        return False
+    return True
+
+
+event_partitions = EventPartitions(os.path.join(settings.data_dir, settings.event_partition_dir), enabled=_partitioning_enabled())
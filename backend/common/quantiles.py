@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import math
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+from .rollups import _insert_for, bucket_start
+from .series_cache import from_epoch, to_epoch
+from .sketch import DDSketch
+
+
+# bucket widths in seconds: minutes for short windows and edges, hours for the bulk of long ones
+SKETCH_TIERS: Tuple[int, ...] = (60, 3600)
+
+
+def new_sketch() -> DDSketch:
+    return DDSketch(settings.sketch_relative_accuracy, settings.sketch_max_bins)
+
+
+def sketch_lock_keys(keys: Iterable[Tuple[str, int, datetime]]) -> List[Tuple[int, int]]:
+    """Postgres advisory lock ids, one pair of int4 per (metric, tier, bucket), sorted so
+    that concurrent writers always take overlapping locks in the same order."""
+    out = set()
+    for metric, tier, bucket in keys:
+        k1 = zlib.crc32(f"{metric}:{tier}".encode("utf-8"))
+        out.add((k1 - (1 << 32) if k1 >= 1 << 31 else k1, int(to_epoch(bucket) // tier)))
+    return sorted(out)
+
+
+def update_sketches(db: Session, points: Sequence[Tuple[str, datetime, float]]) -> int:
+    """Fold (metric, ts, value) points into the per-bucket sketches of every tier.
+
+    Read-merge-write per touched (metric, tier, bucket): one SELECT and one upsert per
+    batch, so it must not interleave with another writer's between its read and commit.
+    SQLite has a single writer: call this after the transaction's first write (like
+    ``write_points`` does), so the database write lock is already held while reading.
+    Postgres takes a transaction-scoped advisory lock per touched sketch, which unlike row
+    locks also covers buckets that do not exist yet, so only writers of the same sketch
+    wait for each other. The caller commits.
+    """
+    if not settings.sketches_enabled:
+        return 0
+    groups: Dict[Tuple[str, int, datetime], List[float]] = {}
+    for metric, ts, value in points:
+        for tier in SKETCH_TIERS:
+            groups.setdefault((metric, tier, bucket_start(ts, tier)), []).append(value)
+    if not groups:
+        return 0
+    table = models.MetricSketch.__table__
+    q = select(table.c.metric, table.c.tier, table.c.bucket, table.c.data).where(
+        tuple_(table.c.metric, table.c.tier, table.c.bucket).in_(list(groups))
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        for k1, k2 in sketch_lock_keys(groups):
+            db.execute(text("SELECT pg_advisory_xact_lock(:k1, :k2)"), {"k1": k1, "k2": k2})
+    existing = {(m, t, b): data for m, t, b, data in db.execute(q)}
+    rows = []
+    for key, values in groups.items():
+        data = existing.get(key)
+        sketch = DDSketch.from_bytes(data, settings.sketch_max_bins) if data else new_sketch()
+        sketch.add(np.asarray(values, dtype=np.float64))
+        rows.append({"metric": key[0], "tier": key[1], "bucket": key[2], "count": sketch.count, "data": sketch.to_bytes()})
+    insert = _insert_for(db)[0]
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.metric, table.c.tier, table.c.bucket],
+        set_={"count": stmt.excluded.count, "data": stmt.excluded.data},
+    )
+    db.execute(stmt, rows)
+    return len(rows)
+
+
+def _ranges(start: datetime, end: datetime) -> List[Tuple[int, datetime, datetime]]:
+    """(tier, from, to) ranges of bucket starts covering [start, end): whole hours from
+    the hourly tier, the edges from the minute tier."""
+    s, e = to_epoch(start), to_epoch(end)
+    lo, hi = math.ceil(s / 3600) * 3600, math.floor(e / 3600) * 3600
+    minute = math.floor(s / 60) * 60
+    if hi - lo < 3600:
+        return [(60, from_epoch(minute), end)]
+    return [(60, from_epoch(minute), from_epoch(lo)), (3600, from_epoch(lo), from_epoch(hi)), (60, from_epoch(hi), end)]
+
+
+def window_sketch(db: Session, metric: str, seconds: int, now: datetime | None = None) -> DDSketch:
+    """One sketch for the last ``seconds``, merged from the per-bucket sketches (the bucket
+    holding the window start counts in full)."""
+    end = now or datetime.utcnow()
+    blobs: List[bytes] = []
+    for tier, lo, hi in _ranges(end - timedelta(seconds=seconds), end):
+        blobs.extend(db.execute(
+            select(models.MetricSketch.data)
+            .where(models.MetricSketch.metric == metric)
+            .where(models.MetricSketch.tier == tier)
+            .where(models.MetricSketch.bucket >= lo)
+            .where(models.MetricSketch.bucket < hi)
+        ).scalars())
+    return new_sketch().merge_many([DDSketch.from_bytes(b, settings.sketch_max_bins) for b in blobs])
+
+
+def metric_quantiles(db: Session, metrics: Sequence[str], qs: Sequence[float], seconds: int, now: datetime | None = None) -> Dict[str, Any]:
+    series = []
+    for metric in metrics:
+        sketch = window_sketch(db, metric, seconds, now)
+        series.append({
+            "metric": metric,
+            "count": sketch.count,
+            "min": sketch.min if sketch.count else None,
+            "max": sketch.max if sketch.count else None,
+            "quantiles": {str(q): v for q, v in zip(qs, sketch.quantiles(qs))},
+        })
+    return {"window_seconds": seconds, "relative_accuracy": settings.sketch_relative_accuracy, "series": series}
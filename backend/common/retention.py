@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+from .counters import add_counts, incident_status_counts
+from .db import SessionLocal
+from .logging import get_logger
+from .partitions import event_partitions
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class TableReport:
+    table: str
+    retention_days: float
+    deleted: int = 0
+    chunks: int = 0
+    partitions_dropped: int = 0
+    elapsed_seconds: float = 0.0
+    blocked_seconds: float = 0.0  # time spent inside write transactions
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "table": self.table,
+            "retention_days": self.retention_days,
+            "deleted": self.deleted,
+            "chunks": self.chunks,
+            "partitions_dropped": self.partitions_dropped,
+            "elapsed_ms": round(self.elapsed_seconds * 1000, 3),
+            "blocked_ms": round(self.blocked_seconds * 1000, 3),
+        }
+
+
+@dataclass
+class RetentionRun:
+    started_at: datetime
+    tables: List[TableReport] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "deleted": sum(t.deleted for t in self.tables),
+            "elapsed_ms": round(sum(t.elapsed_seconds for t in self.tables) * 1000, 3),
+            "blocked_ms": round(sum(t.blocked_seconds for t in self.tables) * 1000, 3),
+            "tables": [t.as_dict() for t in self.tables],
+        }
+
+
+def retention_policies() -> Dict[str, float]:
+    """Retention window in days per table (0 disables pruning for that table)."""
+    return {
+        "events": settings.retention_events_days,
+        "metric_points": settings.retention_metric_points_days,
+        "metric_chunks": settings.retention_metric_chunks_days,
+        "metric_rollups_1m": settings.retention_rollups_1m_days,
+        "metric_rollups_5m": settings.retention_rollups_5m_days,
+        "metric_rollups_1h": settings.retention_rollups_1h_days,
+        "metric_sketches_1m": settings.retention_sketches_1m_days,
+        "metric_sketches_1h": settings.retention_sketches_1h_days,
+        "anomalies": settings.retention_anomalies_days,
+        "actions": settings.retention_actions_days,
+        "incidents": settings.retention_incidents_days,
+    }
+
+
+class RetentionWorker:
+    """Prunes old rows in bounded primary-key chunks, one short transaction per chunk.
+
+    Meant to run in a worker thread (``asyncio.to_thread``): it sleeps between
+    chunks so request handlers and ingest get the database in between.
+    """
+
+    def __init__(self, chunk_size: int | None = None, pause_seconds: float | None = None, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self.chunk_size = max(1, chunk_size or settings.retention_chunk_size)
+        self.pause_seconds = settings.retention_pause_seconds if pause_seconds is None else pause_seconds
+        self._session_factory = session_factory
+        self.last_run: RetentionRun | None = None
+
+    def run_once(self, now: datetime | None = None) -> RetentionRun:
+        now = now or datetime.utcnow()
+        run = RetentionRun(started_at=now)
+        handlers = {
+            "events": self._prune_events,
+            "metric_points": self._prune_points,
+            "metric_chunks": self._prune_chunks,
+            "metric_rollups_1m": lambda r, c: self._prune_rollups(r, c, 60),
+            "metric_rollups_5m": lambda r, c: self._prune_rollups(r, c, 300),
+            "metric_rollups_1h": lambda r, c: self._prune_rollups(r, c, 3600),
+            "metric_sketches_1m": lambda r, c: self._prune_rollups(r, c, 60, models.MetricSketch),
+            "metric_sketches_1h": lambda r, c: self._prune_rollups(r, c, 3600, models.MetricSketch),
+            "anomalies": lambda r, c: self._prune_by_id(r, models.Anomaly, c, "anomalies"),
+            "actions": lambda r, c: self._prune_by_id(r, models.Action, c, "actions"),
+            "incidents": self._prune_incidents,
+        }
+        for table, days in retention_policies().items():
+            if not days or days <= 0:
+                continue
+            report = TableReport(table=table, retention_days=days)
+            start = time.perf_counter()
+            try:
+                handlers[table](report, now - timedelta(days=days))
+            except Exception as exc:  # noqa: BLE001
+                logger.error("retention for %s failed: %s", table, exc)
+            report.elapsed_seconds = time.perf_counter() - start
+            run.tables.append(report)
+        self.last_run = run
+        summary = run.as_dict()
+        logger.info("retention deleted %d rows in %.0f ms (db blocked %.0f ms)", summary["deleted"], summary["elapsed_ms"], summary["blocked_ms"])
+        return run
+
+    def _chunk(self, report: TableReport, fn: Callable[[Session], int]) -> int:
+        """Run one delete chunk in its own transaction; returns rows deleted."""
+        db = self._session_factory()
+        try:
+            start = time.perf_counter()
+            n = fn(db)
+            db.commit()
+            report.blocked_seconds += time.perf_counter() - start
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        report.deleted += n
+        report.chunks += 1
+        if n and self.pause_seconds:
+            time.sleep(self.pause_seconds)
+        return n
+
+    def _delete_ids(self, db: Session, model: Any, ids: List[Any]) -> int:
+        if not ids:
+            return 0
+        db.execute(delete(model).where(model.id.in_(ids)))
+        return len(ids)
+
+    def _prune_by_id(self, report: TableReport, model: Any, cutoff: datetime, counter: str | None = None) -> None:
+        def step(db: Session) -> int:
+            ids = db.execute(select(model.id).where(model.created_at < cutoff).limit(self.chunk_size)).scalars().all()
+            if counter:
+                add_counts(db, {counter: -len(ids)})
+            return self._delete_ids(db, model, ids)
+
+        while self._chunk(report, step) >= self.chunk_size:
+            pass
+
+    def _prune_events(self, report: TableReport, cutoff: datetime) -> None:
+        if event_partitions.enabled:
+            start = time.perf_counter()
+            report.partitions_dropped = event_partitions.drop_before(cutoff)
+            report.blocked_seconds += time.perf_counter() - start
+            return
+        self._prune_by_id(report, models.Event, cutoff)
+
+    def _prune_incidents(self, report: TableReport, cutoff: datetime) -> None:
+        def step(db: Session) -> int:
+            ids = db.execute(select(models.Incident.id).where(models.Incident.created_at < cutoff).limit(self.chunk_size)).scalars().all()
+            if ids:
+                # keep surviving anomalies valid under enforced foreign keys
+                db.execute(update(models.Anomaly).where(models.Anomaly.incident_id.in_(ids)).values(incident_id=None))
+                add_counts(db, {"incidents": -len(ids), **{k: -n for k, n in incident_status_counts(db, ids).items()}})
+            return self._delete_ids(db, models.Incident, ids)
+
+        while self._chunk(report, step) >= self.chunk_size:
+            pass
+
+    def _metrics(self) -> List[str]:
+        db = self._session_factory()
+        try:
+            return list(db.execute(select(models.MetricSeries.metric).distinct()).scalars())
+        finally:
+            db.close()
+
+    def _prune_points(self, report: TableReport, cutoff: datetime) -> None:
+        # per metric, so every chunk is a range on the (metric, ts) index
+        for metric in self._metrics():
+            def step(db: Session, metric: str = metric) -> int:
+                ids = db.execute(
+                    select(models.MetricPoint.id)
+                    .where(models.MetricPoint.metric == metric)
+                    .where(models.MetricPoint.ts < cutoff)
+                    .limit(self.chunk_size)
+                ).scalars().all()
+                return self._delete_ids(db, models.MetricPoint, ids)
+
+            while self._chunk(report, step) >= self.chunk_size:
+                pass
+
+    def _prune_chunks(self, report: TableReport, cutoff: datetime) -> None:
+        for metric in self._metrics():
+            def step(db: Session, metric: str = metric) -> int:
+                ids = db.execute(
+                    select(models.MetricChunk.id)
+                    .where(models.MetricChunk.metric == metric)
+                    .where(models.MetricChunk.end_ts < cutoff)
+                    .limit(self.chunk_size)
+                ).scalars().all()
+                return self._delete_ids(db, models.MetricChunk, ids)
+
+            while self._chunk(report, step) >= self.chunk_size:
+                pass
+
+    def _prune_rollups(self, report: TableReport, cutoff: datetime, tier: int, model: Any = models.MetricRollup) -> None:
+        # per metric, oldest buckets first, in chunks that are ranges of the (metric, tier, bucket) primary key
+        for metric in self._metrics():
+            def step(db: Session, metric: str = metric) -> int:
+                buckets = db.execute(
+                    select(model.bucket)
+                    .where(model.metric == metric)
+                    .where(model.tier == tier)
+                    .where(model.bucket < cutoff)
+                    .order_by(model.bucket)
+                    .limit(self.chunk_size)
+                ).scalars().all()
+                if buckets:
+                    db.execute(
+                        delete(model)
+                        .where(model.metric == metric)
+                        .where(model.tier == tier)
+                        .where(model.bucket <= buckets[-1])
+                    )
+                return len(buckets)
+
+            while self._chunk(report, step) >= self.chunk_size:
+                pass
+
+
+retention_worker = RetentionWorker()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .series_cache import from_epoch, to_epoch
+
+
+# bucket widths in seconds, finest first
+TIERS: Tuple[int, ...] = (60, 300, 3600)
+TIER_LABELS = {0: "raw", 60: "1m", 300: "5m", 3600: "1h"}
+
+
+def bucket_start(ts: datetime, tier: int) -> datetime:
+    t = to_epoch(ts)
+    return from_epoch(t - (t % tier))
+
+
+def _insert_for(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+
+        return insert, func.least, func.greatest
+    from sqlalchemy.dialects.sqlite import insert
+
+    # SQLite's multi-argument min()/max() are scalar functions
+    return insert, func.min, func.max
+
+
+def update_rollups(db: Session, points: Sequence[Tuple[str, datetime, float]]) -> int:
+    """Fold (metric, ts, value) points into every tier with one upsert per touched bucket.
+
+    Points are pre-aggregated per (metric, tier, bucket) in Python first, so a batch of
+    thousands of points usually costs a handful of row updates. The caller commits.
+    """
+    deltas: Dict[Tuple[str, int, datetime], List[Any]] = {}
+    for metric, ts, value in points:
+        for tier in TIERS:
+            key = (metric, tier, bucket_start(ts, tier))
+            d = deltas.get(key)
+            if d is None:
+                deltas[key] = [1, value, value, value, value, ts]
+                continue
+            d[0] += 1
+            d[1] += value
+            d[2] = min(d[2], value)
+            d[3] = max(d[3], value)
+            if ts >= d[5]:
+                d[4], d[5] = value, ts
+    if not deltas:
+        return 0
+    insert, least, greatest = _insert_for(db)
+    table = models.MetricRollup.__table__
+    stmt = insert(table)
+    ex = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.metric, table.c.tier, table.c.bucket],
+        set_={
+            "count": table.c.count + ex.count,
+            "sum_value": table.c.sum_value + ex.sum_value,
+            "min_value": least(table.c.min_value, ex.min_value),
+            "max_value": greatest(table.c.max_value, ex.max_value),
+            "last_value": case((ex.last_ts >= table.c.last_ts, ex.last_value), else_=table.c.last_value),
+            "last_ts": greatest(table.c.last_ts, ex.last_ts),
+        },
+    )
+    rows = [
+        {
+            "metric": metric, "tier": tier, "bucket": bucket,
+            "count": d[0], "sum_value": d[1], "min_value": d[2], "max_value": d[3],
+            "last_value": d[4], "last_ts": d[5],
+        }
+        for (metric, tier, bucket), d in deltas.items()
+    ]
+    db.execute(stmt, rows)
+    return len(rows)
+
+
+def choose_tier(minutes: int, max_points: int, raw_points: int) -> int:
+    """Finest resolution whose point count fits the budget: 0 (raw) or a tier width.
+
+    Falls back to the coarsest tier when even that exceeds the budget.
+    """
+    if raw_points <= max_points:
+        return 0
+    for tier in TIERS:
+        if math.ceil(minutes * 60 / tier) <= max_points:
+            return tier
+    return TIERS[-1]
+
+
+def rollup_rows(db: Session, metric: str, tier: int, since: datetime) -> List[models.MetricRollup]:
+    q = (
+        select(models.MetricRollup)
+        .where(models.MetricRollup.metric == metric)
+        .where(models.MetricRollup.tier == tier)
+        .where(models.MetricRollup.bucket >= bucket_start(since, tier))
+        .order_by(models.MetricRollup.bucket)
+    )
+    return list(db.execute(q).scalars())
+
+
+def window_totals(db: Session, metric: str, minutes: int, tier: int = 60) -> Tuple[int, float]:
+    """(count, sum) of a metric over the last ``minutes`` from one tier."""
+    since = datetime.utcnow() - timedelta(minutes=minutes)
+    q = (
+        select(func.coalesce(func.sum(models.MetricRollup.count), 0), func.coalesce(func.sum(models.MetricRollup.sum_value), 0.0))
+        .where(models.MetricRollup.metric == metric)
+        .where(models.MetricRollup.tier == tier)
+        .where(models.MetricRollup.bucket >= bucket_start(since, tier))
+    )
+    count, total = db.execute(q).one()
+    return int(count), float(total)
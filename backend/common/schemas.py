@@ -22,6 +22,11 @@ class AnomalyOut(BaseModel):
     created_at: datetime
 
 
+class AnomalyScoreIn(BaseModel):
+    # values oldest first; the last value of each series is scored against the others
+    series: Dict[str, List[float]] = Field(default_factory=dict)
+
+
 class ExecuteActionIn(BaseModel):
     name: str
     params: Dict[str, Any] = Field(default_factory=dict)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import settings
+
+
+Window = Tuple[np.ndarray, np.ndarray]
+
+
+def to_epoch(ts: datetime) -> float:
+    """Naive-UTC (or aware) datetime -> epoch seconds."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def from_epoch(t: float) -> datetime:
+    return datetime.fromtimestamp(t, tz=timezone.utc).replace(tzinfo=None)
+
+
+class RingBuffer:
+    """Fixed-capacity ring of (epoch ts, value) float64 pairs for one metric.
+
+    Points are expected roughly in time order; late points are accepted and the
+    ring is re-sorted lazily on the next read. ``complete_since`` is the epoch
+    from which the ring is known to hold every point (it moves forward as old
+    points are overwritten).
+    """
+
+    __slots__ = ("ts", "values", "start", "size", "complete_since", "_ordered")
+
+    def __init__(self, capacity: int, complete_since: float) -> None:
+        self.ts = np.empty(capacity, dtype=np.float64)
+        self.values = np.empty(capacity, dtype=np.float64)
+        self.start = 0
+        self.size = 0
+        self.complete_since = complete_since
+        self._ordered = True
+
+    @property
+    def capacity(self) -> int:
+        return self.ts.shape[0]
+
+    def append(self, ts: float, value: float) -> None:
+        cap = self.capacity
+        if self.size:
+            last = self.ts[(self.start + self.size - 1) % cap]
+            if ts < last:
+                self._ordered = False
+        if self.size < cap:
+            idx = (self.start + self.size) % cap
+            self.size += 1
+        else:
+            idx = self.start
+            self.complete_since = max(self.complete_since, float(self.ts[idx]))
+            self.start = (self.start + 1) % cap
+        self.ts[idx] = ts
+        self.values[idx] = value
+
+    def _ordered_view(self) -> Window:
+        end = self.start + self.size
+        if end <= self.capacity:
+            ts, values = self.ts[self.start:end], self.values[self.start:end]
+        else:
+            wrap = end - self.capacity
+            ts = np.concatenate((self.ts[self.start:], self.ts[:wrap]))
+            values = np.concatenate((self.values[self.start:], self.values[:wrap]))
+        if not self._ordered:
+            order = np.argsort(ts, kind="stable")
+            ts, values = ts[order], values[order]
+            # store back in order so the next read is a plain slice
+            self.ts[:self.size], self.values[:self.size] = ts, values
+            self.start = 0
+            self._ordered = True
+        return ts, values
+
+    def since(self, t0: float) -> Window:
+        ts, values = self._ordered_view()
+        i = int(np.searchsorted(ts, t0, side="left"))
+        return ts[i:].copy(), values[i:].copy()
+
+    def tail(self, n: int) -> Window:
+        ts, values = self._ordered_view()
+        return ts[-n:].copy(), values[-n:].copy()
+
+
+class SeriesCache:
+    """Process-wide per-metric ring buffers, warmed from the DB and appended to on ingest.
+
+    Memory is bounded by ``capacity`` points (16 bytes each) per metric and
+    ``max_series`` metrics; metrics beyond that are simply not cached. Reads
+    return None when the cache cannot answer the range, and callers fall back
+    to the database.
+    """
+
+    def __init__(self, capacity: int, max_series: int) -> None:
+        self.capacity = max(1, capacity)
+        self.max_series = max(1, max_series)
+        self._series: Dict[str, RingBuffer] = {}
+        self._lock = threading.Lock()
+        self._warmed_since: float | None = None
+        self._overflow = False
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def active(self) -> bool:
+        return self._warmed_since is not None
+
+    def warm(self, db: Session, minutes: int) -> int:
+        since = datetime.utcnow() - timedelta(minutes=minutes)
+        q = (
+            select(models.MetricPoint.metric, models.MetricPoint.ts, models.MetricPoint.value)
+            .where(models.MetricPoint.ts >= since)
+            .order_by(models.MetricPoint.ts)
+        )
+        with self._lock:
+            self._series.clear()
+            self._overflow = False
+            self._warmed_since = to_epoch(since)
+            count = 0
+            for metric, ts, value in db.execute(q):
+                self._append(metric, to_epoch(ts), float(value))
+                count += 1
+        return count
+
+    def clear(self) -> None:
+        """Drop cached points (e.g. after a demo reset); an active cache stays active from now on."""
+        with self._lock:
+            self._series.clear()
+            self._overflow = False
+            if self._warmed_since is not None:
+                self._warmed_since = to_epoch(datetime.utcnow())
+
+    def append_many(self, points: Iterable[Tuple[str, datetime, float]]) -> None:
+        if not self.active:
+            return
+        with self._lock:
+            for metric, ts, value in points:
+                self._append(metric, to_epoch(ts), float(value))
+
+    def _append(self, metric: str, ts: float, value: float) -> None:
+        buf = self._series.get(metric)
+        if buf is None:
+            if len(self._series) >= self.max_series:
+                self._overflow = True
+                return
+            buf = self._series[metric] = RingBuffer(self.capacity, self._warmed_since or ts)
+        buf.append(ts, value)
+
+    def window(self, metric: str, since: datetime) -> Optional[Window]:
+        """(ts, values) arrays for points at or after ``since``, or None if not fully cached."""
+        if not self.active:
+            return None
+        t0 = to_epoch(since)
+        with self._lock:
+            buf = self._series.get(metric)
+            if buf is None:
+                # never seen since warm-up: empty, unless we stopped tracking new metrics
+                if self._overflow or t0 < (self._warmed_since or t0):
+                    self.misses += 1
+                    return None
+                self.hits += 1
+                return np.empty(0), np.empty(0)
+            if t0 < buf.complete_since:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return buf.since(t0)
+
+    def latest(self, metric: str, n: int) -> Optional[Window]:
+        """The newest ``n`` points, or None when fewer are cached."""
+        if not self.active:
+            return None
+        with self._lock:
+            buf = self._series.get(metric)
+            if buf is None or buf.size < n:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return buf.tail(n)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "active": self.active,
+                "series": len(self._series),
+                "capacity_points": self.capacity,
+                "max_series": self.max_series,
+                "bytes": sum(b.ts.nbytes + b.values.nbytes for b in self._series.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "overflow": self._overflow,
+            }
+
+
+series_cache = SeriesCache(capacity=settings.series_cache_points, max_series=settings.series_cache_max_series)
@@ -0,0 +1,176 @@
+"""DDSketch: mergeable quantile sketch with a relative-accuracy guarantee.
+
+Every value x > 0 goes into bin ``ceil(log_gamma(x))`` with ``gamma = (1 + a) / (1 - a)``;
+a bin's representative value is within a relative error ``a`` of everything in it, so
+any quantile estimate is within ``a`` of the exact value at that rank (Masson et al.,
+VLDB 2019). Negative values use a mirrored store; |x| below ``MIN_INDEXABLE`` counts as
+zero. Merging two sketches with the same ``a`` is adding bin counts, which makes
+per-bucket sketches combinable over any window.
+
+Stores are sorted NumPy arrays of (int32 key, int64 count). Size depends on the
+*range* of values, not on how many there are: about ``ln(max/min) / ln(gamma)`` bins,
+i.e. ~115 bins per decade at a = 1%, 12 bytes each serialized. When a store exceeds
+``max_bins`` its lowest keys are collapsed into one, which keeps the upper quantiles
+accurate (the ones latency SLOs care about).
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+MIN_INDEXABLE = 1e-9
+_HEADER = struct.Struct("<4sdqqddii")
+_MAGIC = b"DDS1"
+
+Store = Tuple[np.ndarray, np.ndarray]  # (sorted int32 keys, int64 counts)
+
+
+def _empty() -> Store:
+    return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+
+
+def _merge_stores(stores: Sequence[Store], max_bins: int) -> Store:
+    stores = [s for s in stores if len(s[0])]
+    if not stores:
+        return _empty()
+    if len(stores) == 1:
+        keys, counts = stores[0]
+    else:
+        keys, inverse = np.unique(np.concatenate([s[0] for s in stores]), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate([s[1] for s in stores])).astype(np.int64)
+    if len(keys) > max_bins:
+        # collapse the lowest keys into the lowest one kept
+        drop = len(keys) - max_bins
+        collapsed = counts[:drop + 1].sum()
+        keys, counts = keys[drop:], counts[drop:].copy()
+        counts[0] = collapsed
+    return keys.astype(np.int32), counts
+
+
+class DDSketch:
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_bins = max(1, max_bins)
+        self.pos: Store = _empty()
+        self.neg: Store = _empty()
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _keys(self, magnitudes: np.ndarray) -> Store:
+        keys, counts = np.unique(np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int32), return_counts=True)
+        return keys, counts.astype(np.int64)
+
+    def _values(self, keys: np.ndarray) -> np.ndarray:
+        return 2.0 * np.power(self.gamma, keys.astype(np.float64)) / (self.gamma + 1.0)
+
+    def add(self, values: Iterable[float] | np.ndarray) -> "DDSketch":
+        x = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=np.float64).ravel()
+        x = x[np.isfinite(x)]
+        if not len(x):
+            return self
+        pos = x[x > MIN_INDEXABLE]
+        neg = -x[x < -MIN_INDEXABLE]
+        if len(pos):
+            self.pos = _merge_stores([self.pos, self._keys(pos)], self.max_bins)
+        if len(neg):
+            self.neg = _merge_stores([self.neg, self._keys(neg)], self.max_bins)
+        self.zero_count += len(x) - len(pos) - len(neg)
+        self.count += len(x)
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        return self
+
+    def merge(self, other: "DDSketch") -> "DDSketch":
+        return self.merge_many([other])
+
+    def merge_many(self, others: Sequence["DDSketch"]) -> "DDSketch":
+        """Fold ``others`` into this sketch with one sort per store, however many there are."""
+        others = [o for o in others if o.count]
+        for o in others:
+            if not math.isclose(o.relative_accuracy, self.relative_accuracy):
+                raise ValueError("cannot merge sketches with different relative accuracy")
+        if not others:
+            return self
+        self.pos = _merge_stores([self.pos] + [o.pos for o in others], self.max_bins)
+        self.neg = _merge_stores([self.neg] + [o.neg for o in others], self.max_bins)
+        self.zero_count += sum(o.zero_count for o in others)
+        self.count += sum(o.count for o in others)
+        self.min = min([self.min] + [o.min for o in others])
+        self.max = max([self.max] + [o.max for o in others])
+        return self
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """Estimates for each q in [0, 1]; the value of rank ``floor(q * (count - 1))``
+        within the relative accuracy, clamped to the exact min/max."""
+        if not self.count:
+            return [None for _ in qs]
+        neg_keys, neg_counts = self.neg
+        values = np.concatenate([-self._values(neg_keys[::-1]), [0.0], self._values(self.pos[0])])
+        counts = np.concatenate([neg_counts[::-1], [self.zero_count], self.pos[1]])
+        cum = np.cumsum(counts)
+        out: List[Optional[float]] = []
+        for q in qs:
+            if q <= 0:
+                out.append(self.min)
+            elif q >= 1:
+                out.append(self.max)
+            else:
+                rank = math.floor(q * (self.count - 1))
+                v = float(values[int(np.searchsorted(cum, rank, side="right"))])
+                out.append(min(max(v, self.min), self.max))
+        return out
+
+    def count_above(self, x: float) -> float:
+        """Estimated number of values greater than ``x`` (by bin representative)."""
+        if not self.count or x < self.min:
+            return float(self.count)
+        if x >= self.max:
+            return 0.0
+        above = float(self.pos[1][self._values(self.pos[0]) > x].sum())
+        if x < 0:
+            above += self.zero_count + float(self.neg[1][-self._values(self.neg[0]) > x].sum())
+        return above
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    @property
+    def bins(self) -> int:
+        return len(self.pos[0]) + len(self.neg[0]) + (1 if self.zero_count else 0)
+
+    def to_bytes(self) -> bytes:
+        header = _HEADER.pack(_MAGIC, self.relative_accuracy, self.zero_count, self.count, self.min, self.max, len(self.pos[0]), len(self.neg[0]))
+        return b"".join([
+            header,
+            self.pos[0].astype("<i4").tobytes(), self.pos[1].astype("<i8").tobytes(),
+            self.neg[0].astype("<i4").tobytes(), self.neg[1].astype("<i8").tobytes(),
+        ])
+
+    @classmethod
+    def from_bytes(cls, data: bytes, max_bins: int = 2048) -> "DDSketch":
+        magic, alpha, zero_count, count, lo, hi, n_pos, n_neg = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError("not a DDSketch payload")
+        sketch = cls(alpha, max_bins)
+        offset = _HEADER.size
+        stores = []
+        for n in (n_pos, n_neg):
+            keys = np.frombuffer(data, dtype="<i4", count=n, offset=offset).astype(np.int32)
+            offset += 4 * n
+            counts = np.frombuffer(data, dtype="<i8", count=n, offset=offset).astype(np.int64)
+            offset += 8 * n
+            stores.append((keys, counts))
+        sketch.pos, sketch.neg = stores
+        sketch.zero_count, sketch.count, sketch.min, sketch.max = zero_count, count, lo, hi
+        return sketch
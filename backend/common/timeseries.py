@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .catalog import series_catalog
+from .compaction import chunk_point_count, chunk_window
+from .rollups import TIER_LABELS, choose_tier, rollup_rows
+from .series_cache import Window, from_epoch, series_cache, to_epoch
+
+
+Series = Dict[str, List[Tuple[datetime, float]]]
+
+
+def metric_names(db: Session, prefix: str | None = None, source: str | None = None, active_minutes: int | None = None) -> List[str]:
+    return series_catalog.metric_names(db, prefix=prefix, source=source, active_minutes=active_minutes)
+
+
+def _db_window(db: Session, metric: str, since: datetime) -> Window:
+    q = (
+        select(models.MetricPoint.ts, models.MetricPoint.value)
+        .where(models.MetricPoint.metric == metric)
+        .where(models.MetricPoint.ts >= since)
+        .order_by(models.MetricPoint.ts)
+    )
+    rows = db.execute(q).all()
+    ts = np.fromiter((to_epoch(t) for t, _ in rows), dtype=np.float64, count=len(rows))
+    values = np.fromiter((v for _, v in rows), dtype=np.float64, count=len(rows))
+    # older history may already be compacted into chunks
+    chunk_ts, chunk_values = chunk_window(db, metric, since)
+    if len(chunk_ts):
+        ts, values = np.concatenate([chunk_ts, ts]), np.concatenate([chunk_values, values])
+        order = np.argsort(ts, kind="stable")
+        ts, values = ts[order], values[order]
+    return ts, values
+
+
+def recent_window(db: Session, metric: str, minutes: int = 15) -> Window:
+    """(epoch ts, value) arrays for one metric over the last ``minutes``, oldest first.
+
+    Served from the in-memory series cache when it covers the range, else from the
+    (metric, ts) index.
+    """
+    since = datetime.utcnow() - timedelta(minutes=minutes)
+    cached = series_cache.window(metric, since)
+    if cached is not None:
+        return cached
+    return _db_window(db, metric, since)
+
+
+def load_recent_series(db: Session, minutes: int = 15, metrics: Sequence[str] | None = None) -> Series:
+    """(ts, value) per metric for the last ``minutes``, oldest first."""
+    names = list(metrics) if metrics is not None else metric_names(db)
+    series: Series = defaultdict(list)
+    for metric in names:
+        ts, values = recent_window(db, metric, minutes)
+        if len(ts):
+            series[metric] = [(from_epoch(t), v) for t, v in zip(ts.tolist(), values.tolist())]
+    return series
+
+
+def latest_values(db: Session, metric: str, limit: int, minutes: int | None = None) -> List[float]:
+    """Most recent values of one metric, newest first."""
+    if minutes:
+        cached = series_cache.window(metric, datetime.utcnow() - timedelta(minutes=minutes))
+        if cached is not None:
+            return cached[1][-limit:][::-1].tolist()
+    else:
+        cached = series_cache.latest(metric, limit)
+        if cached is not None:
+            return cached[1][::-1].tolist()
+    q = select(models.MetricPoint.value).where(models.MetricPoint.metric == metric)
+    if minutes:
+        q = q.where(models.MetricPoint.ts >= datetime.utcnow() - timedelta(minutes=minutes))
+    q = q.order_by(models.MetricPoint.ts.desc()).limit(limit)
+    values = list(db.execute(q).scalars())
+    if len(values) < limit:
+        since = datetime.utcnow() - timedelta(minutes=minutes) if minutes else None
+        older = chunk_window(db, metric, since, limit=limit - len(values))[1]
+        values.extend(older[::-1][: limit - len(values)].tolist())
+    return values
+
+
+def downsampled_series(db: Session, metric: str, minutes: int, max_points: int) -> Dict[str, Any]:
+    """Raw points when they fit ``max_points``, else the finest rollup tier that does.
+
+    Rollup points carry the bucket average as ``value`` plus min/max/count.
+    """
+    since = datetime.utcnow() - timedelta(minutes=minutes)
+    raw = series_cache.window(metric, since)
+    if raw is None:
+        raw_count = db.execute(
+            select(func.count()).select_from(models.MetricPoint)
+            .where(models.MetricPoint.metric == metric)
+            .where(models.MetricPoint.ts >= since)
+        ).scalar_one() + chunk_point_count(db, metric, since)
+    else:
+        raw_count = len(raw[0])
+    tier = choose_tier(minutes, max_points, raw_count)
+    if tier == 0:
+        ts, values = raw if raw is not None else _db_window(db, metric, since)
+        points = [{"ts": from_epoch(t).isoformat(), "value": v} for t, v in zip(ts.tolist(), values.tolist())]
+    else:
+        points = [
+            {
+                "ts": r.bucket.isoformat(),
+                "value": r.sum_value / r.count,
+                "min": r.min_value,
+                "max": r.max_value,
+                "count": r.count,
+            }
+            for r in rollup_rows(db, metric, tier, since)
+        ]
+    return {"resolution": TIER_LABELS[tier], "points": points}
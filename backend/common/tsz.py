@@ -0,0 +1,158 @@
+"""Gorilla-style compression for (timestamp, float) series.
+
+Timestamps are stored as integer epoch milliseconds, delta-of-delta encoded with
+variable-width buckets; values are XOR-ed with their predecessor and only the
+meaningful bits are written, reusing the previous leading/trailing-zero window
+when the new XOR fits in it. Regular scrape intervals cost ~1 bit per timestamp
+and slowly changing values a few bits each.
+
+Layout: ``count:u32 | t0:i64 | v0:f64 | (dod, xor)*``, big-endian bits.
+"""
+from __future__ import annotations
+
+import struct
+from typing import Tuple
+
+import numpy as np
+
+
+_MASK64 = (1 << 64) - 1
+
+# (prefix value, prefix bits, payload bits) for delta-of-delta, smallest first
+_DOD_BUCKETS = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12))
+_DOD_WIDE = (0b1111, 4, 64)
+
+
+def _f2i(v: float) -> int:
+    return struct.unpack(">Q", struct.pack(">d", v))[0]
+
+
+def _i2f(b: int) -> float:
+    return struct.unpack(">d", struct.pack(">Q", b))[0]
+
+
+class BitWriter:
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._acc = 0
+        self._n = 0  # bits held in _acc
+
+    def write(self, value: int, nbits: int) -> None:
+        self._acc = (self._acc << nbits) | (value & ((1 << nbits) - 1))
+        self._n += nbits
+        while self._n >= 8:
+            self._n -= 8
+            self._buf.append((self._acc >> self._n) & 0xFF)
+        self._acc &= (1 << self._n) - 1
+
+    def getvalue(self) -> bytes:
+        if self._n:
+            return bytes(self._buf) + bytes([(self._acc << (8 - self._n)) & 0xFF])
+        return bytes(self._buf)
+
+
+class BitReader:
+    def __init__(self, data: bytes) -> None:
+        # pad so a 9-byte window is always available
+        self._data = bytes(data) + b"\x00" * 9
+        self._pos = 0
+
+    def read(self, nbits: int) -> int:
+        if nbits > 56:
+            hi = self.read(nbits - 32)
+            return (hi << 32) | self.read(32)
+        byte, bit = divmod(self._pos, 8)
+        window = int.from_bytes(self._data[byte:byte + 8], "big")
+        self._pos += nbits
+        return (window >> (64 - bit - nbits)) & ((1 << nbits) - 1)
+
+
+def encode(ts_ms: np.ndarray, values: np.ndarray) -> bytes:
+    """Compress int64 epoch-millisecond timestamps (ascending) and float64 values."""
+    ts_list = np.asarray(ts_ms, dtype=np.int64).tolist()
+    val_list = np.asarray(values, dtype=np.float64).tolist()
+    if len(ts_list) != len(val_list):
+        raise ValueError("timestamps and values differ in length")
+    w = BitWriter()
+    w.write(len(ts_list), 32)
+    if not ts_list:
+        return w.getvalue()
+    w.write(ts_list[0], 64)
+    prev_bits = _f2i(val_list[0])
+    w.write(prev_bits, 64)
+    prev_t, prev_delta = ts_list[0], 0
+    lead, trail = 65, 0  # no window yet
+    for t, v in zip(ts_list[1:], val_list[1:]):
+        delta = t - prev_t
+        dod = delta - prev_delta
+        prev_t, prev_delta = t, delta
+        if dod == 0:
+            w.write(0, 1)
+        else:
+            for prefix, plen, bits in _DOD_BUCKETS:
+                if -(1 << (bits - 1)) <= dod < (1 << (bits - 1)):
+                    w.write(prefix, plen)
+                    w.write(dod, bits)
+                    break
+            else:
+                w.write(_DOD_WIDE[0], _DOD_WIDE[1])
+                w.write(dod, 64)
+
+        bits = _f2i(v)
+        xor = bits ^ prev_bits
+        prev_bits = bits
+        if xor == 0:
+            w.write(0, 1)
+            continue
+        w.write(1, 1)
+        new_lead = min(64 - xor.bit_length(), 31)
+        new_trail = (xor & -xor).bit_length() - 1
+        if lead <= new_lead and trail <= new_trail:
+            w.write(0, 1)
+            w.write(xor >> trail, 64 - lead - trail)
+        else:
+            lead, trail = new_lead, new_trail
+            length = 64 - lead - trail
+            w.write(1, 1)
+            w.write(lead, 5)
+            w.write(length - 1, 6)
+            w.write(xor >> trail, length)
+    return w.getvalue()
+
+
+def decode(data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverse of :func:`encode`: (int64 epoch ms, float64 values) arrays."""
+    r = BitReader(data)
+    count = r.read(32)
+    ts = np.empty(count, dtype=np.int64)
+    values = np.empty(count, dtype=np.float64)
+    if not count:
+        return ts, values
+    t = r.read(64)
+    if t >= 1 << 63:
+        t -= 1 << 64
+    bits = r.read(64)
+    ts[0], values[0] = t, _i2f(bits)
+    delta = 0
+    lead = trail = 0
+    read = r.read
+    for i in range(1, count):
+        if read(1):
+            plen = 1
+            while plen < 4 and read(1):
+                plen += 1
+            nbits = (7, 9, 12, 64)[plen - 1]
+            dod = read(nbits)
+            if dod >= 1 << (nbits - 1):
+                dod -= 1 << nbits
+            delta += dod
+        t += delta
+        ts[i] = t
+        if read(1):
+            if read(1):
+                lead = read(5)
+                length = read(6) + 1
+                trail = 64 - lead - length
+            bits ^= (read(64 - lead - trail) << trail) & _MASK64
+        values[i] = _i2f(bits)
+    return ts, values
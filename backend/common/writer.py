@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .db import WriterSessionLocal
+from .logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class WriteJob:
+    fn: Callable[[Session], Any]
+    on_commit: Optional[Callable[[Any], None]] = None
+    future: Future = field(default_factory=Future)
+
+
+class DbWriter:
+    """Single writer thread that group-commits queued write jobs.
+
+    Each job runs inside its own SAVEPOINT of the batch's transaction (the writer's
+    sessions come from ``WriterSessionLocal``, which really BEGINs on SQLite), so a
+    failing job is rolled back alone and reported through its future while the rest of
+    the batch still commits. Up to ``max_batch`` jobs share one COMMIT (one fsync in WAL mode);
+    after the first job arrives the writer waits ``max_wait_ms`` for more.
+    """
+
+    def __init__(self, max_batch: int, max_wait_ms: float, session_factory: Callable[[], Session] = WriterSessionLocal) -> None:
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._session_factory = session_factory
+        self._queue: "queue.Queue[Optional[WriteJob]]" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._current: Session | None = None
+        self._deferred: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.failed_jobs = 0
+        self.commits = 0
+        self.commit_seconds = 0.0
+        self.max_batch_seen = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Commit everything already queued, then stop the thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+        self._thread = None
+
+    def submit(self, fn: Callable[[Session], Any], on_commit: Optional[Callable[[Any], None]] = None) -> Future:
+        """Queue ``fn(session)``; the future resolves to its return value once committed.
+
+        ``fn`` must not commit. ``on_commit(result)`` runs on the writer thread after the
+        batch's COMMIT, for cache updates that must only see durable data.
+        """
+        job = WriteJob(fn, on_commit)
+        if threading.current_thread() is self._thread:
+            # re-entrant use from inside a job: run it in the current transaction
+            result = fn(self._current)
+            if on_commit:
+                self._deferred.append(lambda: on_commit(result))
+            job.future.set_result(result)
+            return job.future
+        self._queue.put(job)
+        return job.future
+
+    def run(self, fn: Callable[[Session], Any], on_commit: Optional[Callable[[Any], None]] = None, timeout: float | None = None) -> Any:
+        return self.submit(fn, on_commit).result(timeout)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is None:
+                break
+            batch = [job]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    nxt = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stopping = True
+                    break
+                batch.append(nxt)
+            self._commit_batch(batch)
+        # drain whatever was queued behind the stop marker
+        rest: List[WriteJob] = []
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                rest.append(job)
+        for start in range(0, len(rest), self.max_batch):
+            self._commit_batch(rest[start:start + self.max_batch])
+
+    def _commit_batch(self, batch: List[WriteJob]) -> None:
+        db = self._session_factory()
+        self._current = db
+        self._deferred = []
+        done: List[tuple[WriteJob, Any]] = []
+        try:
+            for job in batch:
+                try:
+                    with db.begin_nested():
+                        result = job.fn(db)
+                    done.append((job, result))
+                except Exception as exc:  # noqa: BLE001
+                    job.future.set_exception(exc)
+            start = time.perf_counter()
+            db.commit()
+            elapsed = time.perf_counter() - start
+        except Exception as exc:  # noqa: BLE001
+            db.rollback()
+            logger.error("group commit of %d jobs failed: %s", len(done), exc)
+            for job, _ in done:
+                job.future.set_exception(exc)
+            with self._lock:
+                self.failed_jobs += len(batch)
+            return
+        finally:
+            self._current = None
+            db.close()
+        with self._lock:
+            self.jobs += len(batch)
+            self.failed_jobs += len(batch) - len(done)
+            self.commits += 1
+            self.commit_seconds += elapsed
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        hooks = [partial(job.on_commit, result) for job, result in done if job.on_commit] + self._deferred
+        for hook in hooks:
+            try:
+                hook()
+            except Exception as exc:  # noqa: BLE001
+                logger.error("post-commit hook failed: %s", exc)
+        for job, result in done:
+            job.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "queued": self._queue.qsize(),
+                "jobs": self.jobs,
+                "failed_jobs": self.failed_jobs,
+                "commits": self.commits,
+                "avg_batch": round(self.jobs / self.commits, 2) if self.commits else 0.0,
+                "max_batch": self.max_batch_seen,
+                "avg_commit_ms": round(self.commit_seconds / self.commits * 1000, 3) if self.commits else 0.0,
+            }
+
+
+db_writer = DbWriter(settings.sqlite_writer_max_batch, settings.sqlite_writer_max_wait_ms)
@@ -22,19 +22,31 @@ def rolling_zscore(values: List[float], last_k: int = 1, threshold: float = 3.0)
     return z if abs(z) >= threshold else None
 
 
-def isolation_forest_score(values: List[float]) -> Optional[float]:
-    if not _SKLEARN or len(values) < 10:
-        return None
+def lag_features(values: List[float]) -> List[List[float]]:
     # shape as 2D features with lag to make it slightly multivariate
-    series = [[values[i], values[i - 1] if i > 0 else values[i]] for i in range(len(values))]
+    return [[values[i], values[i - 1] if i > 0 else values[i]] for i in range(len(values))]
+
+
+def fit_isolation_forest(values: List[float]):
     model = IsolationForest(n_estimators=50, contamination="auto", random_state=42)
-    model.fit(series)
+    model.fit(lag_features(values))
+    return model
+
+
+def isolation_forest_last(model, values: List[float]) -> Optional[float]:
     # higher negative score = more anomalous; return last point score
-    s = -float(model.score_samples([series[-1]])[0])
+    last = [values[-1], values[-2] if len(values) > 1 else values[-1]]
+    s = -float(model.score_samples([last])[0])
     # normalize to a simple threshold notion
     return s if s >= 0.5 else None
 
 
+def isolation_forest_score(values: List[float]) -> Optional[float]:
+    if not _SKLEARN or len(values) < 10:
+        return None
+    return isolation_forest_last(fit_isolation_forest(values), values)
+
+
 def mad_anomaly_score(values: List[float], last_k: int = 1, threshold: float = 3.5) -> Optional[float]:
     if len(values) < 7:
         return None
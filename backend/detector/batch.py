@@ -0,0 +1,133 @@
+"""Vectorized z-score / MAD scoring of many series at once.
+
+Series are packed ragged: every value in one flat float64 array plus per-series
+``lengths`` (segment ``i`` starts at ``offsets[i]``), so memory is the number of values,
+not ``series x longest series``. The last value of each segment is scored against the
+rest, with the same rules and thresholds as ``rolling_zscore`` and ``mad_anomaly_score``.
+Per-segment sums come from ``np.add.reduceat`` and medians from dense blocks of
+equal-length segments, so scoring 10k series is a handful of C loops instead of 10k Python ones.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .streaming import MAD_THRESHOLD, Z_THRESHOLD
+
+
+MAX_SCORE_POINTS = 5_000_000  # cap on one /anomalies/score request
+SEVERITIES = np.array(["low", "medium", "high", "critical"])
+
+
+def pack(series: Sequence[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Ragged series -> (flat float64 array of all values, lengths)."""
+    lengths = np.fromiter((len(s) for s in series), dtype=np.int64, count=len(series))
+    if not lengths.sum():
+        return np.empty(0), lengths
+    return np.concatenate([np.asarray(s, dtype=np.float64) for s in series if len(s)]), lengths
+
+
+def offsets(lengths: np.ndarray) -> np.ndarray:
+    """Start of each segment in the flat array."""
+    return np.cumsum(lengths) - lengths
+
+
+def segment_sum(values: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Sum of each segment; 0 for empty ones (which ``reduceat`` alone gets wrong)."""
+    out = np.zeros(len(lengths))
+    nonempty = lengths > 0
+    if nonempty.any():
+        out[nonempty] = np.add.reduceat(values, offsets(lengths)[nonempty])
+    return out
+
+
+def segment_median(values: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Median of each segment (NaN for empty ones). Segments of equal length are gathered
+    into one dense block each, so no row is padded and NumPy does the medians in C."""
+    out = np.full(len(lengths), np.nan)
+    starts = offsets(lengths)
+    for length in np.unique(lengths[lengths > 0]):
+        rows = np.flatnonzero(lengths == length)
+        out[rows] = np.median(values[starts[rows, None] + np.arange(length)], axis=1)
+    return out
+
+
+def severities(scores: np.ndarray) -> np.ndarray:
+    """``_severity_from_score`` for an array of scores."""
+    a = np.abs(scores)
+    return SEVERITIES[(a >= 3).astype(int) + (a >= 4) + (a >= 6)]
+
+
+@dataclass
+class BatchScores:
+    latest: np.ndarray
+    mean: np.ndarray  # of the baseline (every value but the last)
+    zscore: np.ndarray  # NaN where the series is too short
+    modified_zscore: np.ndarray
+    score: np.ndarray  # z-score if past its threshold, else MAD if past its, else NaN
+    method: List[Optional[str]]
+    severity: np.ndarray
+
+    def row(self, i: int) -> Dict[str, object]:
+        def num(x: float) -> Optional[float]:
+            return None if np.isnan(x) else float(x)
+
+        score = num(self.score[i])
+        return {
+            "latest": num(self.latest[i]),
+            "mean": num(self.mean[i]),
+            "zscore": num(self.zscore[i]),
+            "modified_zscore": num(self.modified_zscore[i]),
+            "score": score,
+            "method": self.method[i],
+            "severity": str(self.severity[i]) if score is not None else None,
+        }
+
+
+def score_batch(series: Sequence[Sequence[float]]) -> BatchScores:
+    flat, lengths = pack(series)
+    n = len(lengths)
+    has = lengths > 0
+    last = np.cumsum(lengths)[has] - 1
+    latest = np.full(n, np.nan)
+    latest[has] = flat[last]
+    # the baseline is every value but the last
+    keep = np.ones(len(flat), dtype=bool)
+    keep[last] = False
+    baseline = flat[keep]
+    counts = np.maximum(lengths - 1, 0)
+    seg = np.repeat(np.arange(n), counts)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # empty baselines (series too short) just come out as NaN
+        mu = segment_sum(baseline, counts) / counts
+        sigma = np.sqrt(segment_sum((baseline - mu[seg]) ** 2, counts) / counts)
+    z = (latest - mu) / np.where(sigma > 0, sigma, 1e-6)
+    z[lengths < 5] = np.nan
+
+    mad_rows = lengths >= 7
+    mz = np.full(n, np.nan)
+    if mad_rows.any():
+        in_mad = mad_rows[seg]
+        b, b_counts = baseline[in_mad], counts[mad_rows]
+        med = segment_median(b, b_counts)
+        mad = segment_median(np.abs(b - np.repeat(med, b_counts)), b_counts)
+        mz[mad_rows] = 0.6745 * (latest[mad_rows] - med) / np.where(mad > 0, mad, 1e-6)
+
+    use_z = np.abs(z) >= Z_THRESHOLD
+    use_mad = ~use_z & (np.abs(mz) >= MAD_THRESHOLD)
+    score = np.where(use_z, z, np.where(use_mad, mz, np.nan))
+    method: List[Optional[str]] = np.where(use_z, "rolling_zscore", np.where(use_mad, "mad", "")).tolist()
+    mean = np.where(counts > 0, mu, latest)
+    return BatchScores(
+        latest=latest,
+        mean=mean,
+        zscore=z,
+        modified_zscore=mz,
+        score=score,
+        method=[m or None for m in method],
+        severity=severities(np.nan_to_num(score)),
+    )
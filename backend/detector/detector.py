@@ -1,9 +1,7 @@
 from __future__ import annotations
 
 import asyncio
-from collections import defaultdict
 from datetime import datetime, timedelta
-from statistics import mean, pstdev
 from typing import Dict, List, Tuple
 
 from sqlalchemy.orm import Session
@@ -12,39 +10,21 @@ from ..common.db import SessionLocal
 from ..common import models
 from ..common.ops import create_incident_if_needed
 from ..common.notify import send_webhook
-from .algorithms import rolling_zscore, isolation_forest_score, mad_anomaly_score
+from .batch import score_batch
+from .model_registry import model_registry
+from .streaming import streaming_detector
+from ..common.config import settings
+from ..common.ingest import add_metric_observer
 from ..common.metrics_store import query_recent_metrics_influx
+from ..common.timeseries import load_recent_series
+
+
+# committed points reach the streaming state straight from ingest (a no-op in batch mode)
+add_metric_observer(streaming_detector.observe_ingested)
 
 
 def _load_recent_metrics(db: Session, minutes: int = 15) -> Dict[str, List[Tuple[datetime, float]]]:
-    cutoff = datetime.utcnow() - timedelta(minutes=minutes)
-    q = (
-        db.query(models.Event)
-        .filter(models.Event.type == "metric")
-        .filter(models.Event.created_at >= cutoff)
-        .order_by(models.Event.created_at.asc())
-        .all()
-    )
-    series: Dict[str, List[Tuple[datetime, float]]] = defaultdict(list)
-    for e in q:
-        payload = e.payload or {}
-        metric = str(payload.get("metric"))
-        value = float(payload.get("value", 0))
-        ts = datetime.fromisoformat(payload.get("timestamp")) if payload.get("timestamp") else e.created_at
-        series[metric].append((ts, value))
-    return series
-
-
-def _detect_score(values: List[float]) -> float | None:
-    # Try IsolationForest first
-    iso = isolation_forest_score(values)
-    if iso is not None:
-        return iso * 3.5  # scale to roughly align with z-score thresholds
-    z = rolling_zscore(values)
-    if z is not None:
-        return z
-    mad = mad_anomaly_score(values)
-    return mad
+    return load_recent_series(db, minutes=minutes)
 
 
 def _severity_from_score(score: float) -> str:
@@ -59,15 +39,49 @@ def _severity_from_score(score: float) -> str:
 
 
 async def run_detection_cycle() -> None:
-    # run sync detection in a thread if needed; it's quick enough inline for demo
+    # scoring and the DB work are blocking; keep them off the event loop
+    await asyncio.to_thread(detect_once)
+
+
+def _scored_batch(db: Session) -> List[Dict[str, object]]:
+    scored = []
+    series = query_recent_metrics_influx() or _load_recent_metrics(db)
+    names = list(series)
+    # z-score / MAD for every series in one vectorized pass; the forest still goes first
+    batch = score_batch([[v for _, v in series[m]] for m in names])
+    for i, metric in enumerate(names):
+        iso = model_registry.score(metric, series[metric])
+        row = batch.row(i)
+        if iso is not None:
+            score, method = iso * 3.5, "iforest"  # scale to roughly align with z-score thresholds
+        else:
+            score, method = row["score"], row["method"]
+        if score is None:
+            continue
+        scored.append({
+            "metric": metric,
+            "score": score,
+            "latest": row["latest"],
+            "mean": row["mean"],
+            "n": len(series[metric]),
+            "method": method,
+        })
+    return scored
+
+
+def _scored_streaming(db: Session) -> List[Dict[str, object]]:
+    # points were scored as they were ingested; after a restart seed state from history once
+    if not streaming_detector.warmed:
+        streaming_detector.warm(_load_recent_metrics(db))
+    return streaming_detector.take_pending()
+
+
+def detect_once() -> None:
     db: Session = SessionLocal()
     try:
-        series = query_recent_metrics_influx() or _load_recent_metrics(db)
-        for metric, points in series.items():
-            values = [v for _, v in points]
-            score = _detect_score(values)
-            if score is None:
-                continue
+        scored = _scored_streaming(db) if settings.detector_mode == "streaming" else _scored_batch(db)
+        for item in scored:
+            metric, score = item["metric"], item["score"]
             # Deduplicate: avoid spamming anomalies for same metric/severity within 60s
             dedup_cutoff = datetime.utcnow() - timedelta(seconds=60)
             severity = _severity_from_score(float(score))
@@ -85,15 +99,7 @@ async def run_detection_cycle() -> None:
                 metric=metric,
                 score=float(score),
                 severity=severity,
-                details={
-                    "latest": values[-1],
-                    "mean": mean(values[:-1]) if len(values) > 1 else values[-1],
-                    "n": len(values),
-                    "method": (
-                        "iforest" if isolation_forest_score(values) is not None
-                        else ("rolling_zscore" if rolling_zscore(values) is not None else "mad")
-                    ),
-                },
+                details={k: item[k] for k in ("latest", "mean", "n", "method")},
                 incident_id=incident.id if incident else None,
             )
             db.add(anomaly)
@@ -105,5 +111,3 @@ async def run_detection_cycle() -> None:
         db.commit()
     finally:
         db.close()
-
-
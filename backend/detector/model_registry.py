@@ -0,0 +1,220 @@
+"""Fitted IsolationForest per series, reused across detector cycles.
+
+A series is fitted once (inline, the first time it has enough points) and after that
+each cycle only scores its newest point with the existing model. A refit is queued on
+a worker pool when the model is older than ``refit_seconds``, has scored
+``refit_samples`` new points, or the window mean has drifted more than
+``drift_sigma`` training standard deviations; the old model keeps serving until the new
+one is swapped in. Fitted models are written to ``model_dir`` with joblib and loaded
+back lazily, so a restart does not retrain every series.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from statistics import mean, pstdev
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..common.config import settings
+from ..common.logging import get_logger
+from .algorithms import _SKLEARN, fit_isolation_forest, isolation_forest_last
+
+try:
+    import joblib  # type: ignore
+    _JOBLIB = True
+except Exception:  # noqa: BLE001
+    _JOBLIB = False
+
+
+logger = get_logger(__name__)
+
+MIN_FIT_POINTS = 10
+
+
+@dataclass
+class SeriesModel:
+    model: Any
+    fitted_at: datetime
+    n_fit: int
+    mean: float
+    std: float
+    last_ts: Optional[datetime] = None
+    samples_since: int = 0
+    score: Optional[float] = None
+
+
+def _naive(ts: datetime) -> datetime:
+    # Influx returns aware UTC timestamps, the database naive ones
+    return ts.replace(tzinfo=None) if ts.tzinfo is not None else ts
+
+
+def _fit(values: List[float], last_ts: Optional[datetime]) -> SeriesModel:
+    return SeriesModel(
+        model=fit_isolation_forest(values),
+        fitted_at=datetime.utcnow(),
+        n_fit=len(values),
+        mean=mean(values),
+        std=pstdev(values),
+        last_ts=last_ts,
+    )
+
+
+class ModelRegistry:
+    def __init__(
+        self,
+        model_dir: str | None = None,
+        workers: int | None = None,
+        refit_seconds: float | None = None,
+        refit_samples: int | None = None,
+        drift_sigma: float | None = None,
+    ) -> None:
+        self.model_dir = model_dir or os.path.join(settings.data_dir, settings.detector_model_dir)
+        self.workers = workers or settings.detector_refit_workers
+        self.refit_seconds = settings.detector_refit_seconds if refit_seconds is None else refit_seconds
+        self.refit_samples = refit_samples or settings.detector_refit_samples
+        self.drift_sigma = drift_sigma or settings.detector_drift_sigma
+        self._models: Dict[str, SeriesModel] = {}
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.fits = 0
+        self.loads = 0
+        self.refits: Dict[str, int] = {"age": 0, "samples": 0, "drift": 0}
+
+    def _path(self, metric: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", metric)[:64]
+        digest = hashlib.sha1(metric.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.model_dir, f"{safe}-{digest}.joblib")
+
+    def _save(self, metric: str, entry: SeriesModel) -> None:
+        if not _JOBLIB:
+            return
+        path = self._path(metric)
+        try:
+            os.makedirs(self.model_dir, exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            joblib.dump(asdict(entry), tmp)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning("could not persist model for %s: %s", metric, exc)
+
+    def _load(self, metric: str) -> Optional[SeriesModel]:
+        path = self._path(metric)
+        if not _JOBLIB or not os.path.exists(path):
+            return None
+        try:
+            entry = SeriesModel(**joblib.load(path))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("ignoring unreadable model %s: %s", path, exc)
+            return None
+        self.loads += 1
+        return entry
+
+    def get(self, metric: str) -> Optional[SeriesModel]:
+        with self._lock:
+            entry = self._models.get(metric)
+        if entry is None:
+            entry = self._load(metric)
+            if entry is not None:
+                with self._lock:
+                    entry = self._models.setdefault(metric, entry)
+        return entry
+
+    def score(self, metric: str, points: Sequence[Tuple[datetime, float]]) -> Optional[float]:
+        """IsolationForest score of the newest point (None below the threshold), like
+        ``isolation_forest_score`` but without fitting a forest per call."""
+        if not _SKLEARN or len(points) < MIN_FIT_POINTS:
+            return None
+        values = [v for _, v in points]
+        last_ts = _naive(points[-1][0])
+        entry = self.get(metric)
+        if entry is None:
+            # nothing to score with yet: the first fit is inline
+            entry = _fit(values, last_ts)
+            entry.score = isolation_forest_last(entry.model, values)
+            self._save(metric, entry)
+            with self._lock:
+                self._models[metric] = entry
+                self.fits += 1
+            return entry.score
+        new = sum(1 for ts, _ in points if entry.last_ts is None or _naive(ts) > entry.last_ts)
+        if not new:
+            return entry.score
+        entry.samples_since += new
+        entry.last_ts = last_ts
+        entry.score = isolation_forest_last(entry.model, values)
+        reason = self._refit_reason(entry, values)
+        if reason:
+            self._submit(metric, values, reason)
+        return entry.score
+
+    def _refit_reason(self, entry: SeriesModel, values: List[float]) -> Optional[str]:
+        if (datetime.utcnow() - entry.fitted_at).total_seconds() >= self.refit_seconds:
+            return "age"
+        if entry.samples_since >= self.refit_samples:
+            return "samples"
+        scale = max(entry.std, 1e-3 * abs(entry.mean), 1e-6)
+        if abs(mean(values) - entry.mean) > self.drift_sigma * scale:
+            return "drift"
+        return None
+
+    def _submit(self, metric: str, values: List[float], reason: str) -> None:
+        with self._lock:
+            if metric in self._pending:
+                return
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="iforest-refit")
+            future = self._pool.submit(self._refit, metric, list(values))
+            self._pending[metric] = future
+            self.refits[reason] += 1
+
+    def _refit(self, metric: str, values: List[float]) -> None:
+        try:
+            entry = _fit(values, None)
+            with self._lock:
+                # carry over what the old model has already scored
+                old = self._models.get(metric)
+                if old is not None:
+                    entry.last_ts, entry.score = old.last_ts, old.score
+                self._models[metric] = entry
+                self.fits += 1
+            self._save(metric, entry)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("refit of %s failed: %s", metric, exc)
+        finally:
+            with self._lock:
+                self._pending.pop(metric, None)
+
+    def wait(self) -> None:
+        """Block until queued refits are done."""
+        with self._lock:
+            futures = list(self._pending.values())
+        for f in futures:
+            f.result()
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "models": len(self._models),
+                "pending_refits": len(self._pending),
+                "fits": self.fits,
+                "loaded_from_disk": self.loads,
+                "refits": dict(self.refits),
+                "model_dir": self.model_dir,
+                "persisted": _JOBLIB,
+            }
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,248 @@
+"""Streaming counterparts of the batch detectors in ``algorithms.py``.
+
+Each series keeps O(1) state that is updated once per ingested point:
+
+* an exponentially weighted mean/variance (Welford-style update, Finch 2009). For the
+  first ``span`` points the weight is ``1/n``, which makes it the exact running
+  mean/population variance; after that older points decay with ``alpha = 2 / (span + 1)``;
+* an approximate median and MAD from P-square estimators (Jain & Chlamtac 1985), five
+  markers each. To forget old regimes every estimator is restarted: a second one starts
+  half-way through and replaces the first after ``span`` points.
+
+A point is scored against the state *before* it is folded in, like the batch detectors
+score the last value against the baseline before it, and with the same thresholds.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..common.config import settings
+
+
+Z_THRESHOLD = 3.0
+MAD_THRESHOLD = 3.5
+MIN_Z_BASELINE = 4  # rolling_zscore needs 5 values, the last one being scored
+MIN_MAD_BASELINE = 6  # mad_anomaly_score needs 7
+
+
+class P2Quantile:
+    """P-square estimate of one quantile in constant memory."""
+
+    __slots__ = ("p", "count", "_q", "_n", "_np", "_dn")
+
+    def __init__(self, p: float = 0.5) -> None:
+        self.p = p
+        self.count = 0
+        self._q: List[float] = []
+        self._n = [0, 1, 2, 3, 4]
+        self._np = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._dn = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.count >= 5:
+            return self._q[2]
+        if not self.count:
+            return None
+        s = sorted(self._q)
+        # the batch detectors' median for small counts
+        mid = len(s) // 2
+        return s[mid] if len(s) % 2 else (s[mid - 1] + s[mid]) / 2
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        q = self._q
+        if self.count <= 5:
+            q.append(x)
+            if self.count == 5:
+                q.sort()
+            return
+        n = self._n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        np_ = self._np
+        for i in range(5):
+            np_[i] += self._dn[i]
+        for i in (1, 2, 3):
+            d = np_[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                qp = q[i] + s / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                q[i] = qp
+                n[i] += s
+
+
+class WindowedMedian:
+    """P-square median over roughly the last ``span`` points (between span/2 and span)."""
+
+    __slots__ = ("span", "_cur", "_next")
+
+    def __init__(self, span: int) -> None:
+        self.span = max(10, span)
+        self._cur = P2Quantile()
+        self._next: Optional[P2Quantile] = None
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._cur.value
+
+    def add(self, x: float) -> None:
+        self._cur.add(x)
+        if self._next is not None:
+            self._next.add(x)
+        elif self._cur.count >= self.span // 2:
+            self._next = P2Quantile()
+        if self._cur.count >= self.span:
+            self._cur, self._next = self._next, None
+
+
+class StreamingSeries:
+    """Detector state of one series."""
+
+    __slots__ = ("span", "alpha", "n", "mean", "var", "median", "mad", "last_ts", "last_value", "score", "method", "peak")
+
+    def __init__(self, span: int) -> None:
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.n = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.median = WindowedMedian(span)
+        self.mad = WindowedMedian(span)
+        self.last_ts: Optional[datetime] = None
+        self.last_value: Optional[float] = None
+        self.score: Optional[float] = None
+        self.method: Optional[str] = None
+        # strongest crossing since the last take_pending: (score, method, value, baseline mean)
+        self.peak: Optional[Tuple[float, str, float, float]] = None
+
+    def zscore(self, x: float) -> Optional[float]:
+        if self.n < MIN_Z_BASELINE:
+            return None
+        return (x - self.mean) / (math.sqrt(self.var) or 1e-6)
+
+    def modified_zscore(self, x: float) -> Optional[float]:
+        if self.n < MIN_MAD_BASELINE:
+            return None
+        return 0.6745 * (x - self.median.value) / (self.mad.value or 1e-6)
+
+    def observe(self, ts: Optional[datetime], x: float) -> Optional[float]:
+        """Score ``x`` against the baseline, then fold it in. Returns the score if it crosses
+        a threshold (z-score first, then MAD, like the batch cycle without the forest)."""
+        z = self.zscore(x)
+        mz = self.modified_zscore(x)
+        if z is not None and abs(z) >= Z_THRESHOLD:
+            self.score, self.method = z, "streaming_zscore"
+        elif mz is not None and abs(mz) >= MAD_THRESHOLD:
+            self.score, self.method = mz, "streaming_mad"
+        else:
+            self.score, self.method = None, None
+        if self.score is not None and (self.peak is None or abs(self.score) > abs(self.peak[0])):
+            self.peak = (self.score, self.method, x, self.mean)
+
+        self.n += 1
+        a = 1.0 / self.n if self.n <= self.span else self.alpha
+        diff = x - self.mean
+        incr = a * diff
+        self.mean += incr
+        self.var = (1.0 - a) * (self.var + diff * incr)
+        self.median.add(x)
+        self.mad.add(abs(x - self.median.value))
+
+        self.last_ts, self.last_value = ts, x
+        return self.score
+
+
+class StreamingDetector:
+    """Per-series streaming state for every metric, fed from ingest."""
+
+    def __init__(self, span: int | None = None) -> None:
+        self.span = span or settings.detector_stream_span
+        self._series: Dict[str, StreamingSeries] = {}
+        self._lock = threading.Lock()
+        self.warmed = False
+        self.points = 0
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def get(self, metric: str) -> Optional[StreamingSeries]:
+        return self._series.get(metric)
+
+    def observe_many(self, points: Iterable[Tuple[str, Optional[datetime], float]]) -> None:
+        with self._lock:
+            for metric, ts, value in points:
+                state = self._series.get(metric)
+                if state is None:
+                    state = self._series[metric] = StreamingSeries(self.span)
+                state.observe(ts, value)
+                self.points += 1
+
+    def observe(self, metric: str, ts: Optional[datetime], value: float) -> Optional[float]:
+        self.observe_many([(metric, ts, value)])
+        return self._series[metric].score
+
+    def observe_ingested(self, points: Iterable[Tuple[str, Optional[datetime], float]]) -> None:
+        """Ingest observer: only feeds the state while the detector runs in streaming mode."""
+        if settings.detector_mode == "streaming":
+            self.observe_many(points)
+
+    def warm(self, series: Dict[str, Sequence[Tuple[datetime, float]]]) -> None:
+        """Seed series that have no state yet from stored history (after a restart).
+        Series that already received live points keep their state."""
+        with self._lock:
+            for metric, points in series.items():
+                if metric in self._series or not points:
+                    continue
+                state = self._series[metric] = StreamingSeries(self.span)
+                for ts, value in points:
+                    state.observe(ts, value)
+                # history only seeds the baseline; its crossings are not new anomalies
+                state.peak = None
+            self.warmed = True
+
+    def take_pending(self) -> List[Dict[str, object]]:
+        """Series with a point crossing a threshold since the previous call, each with its
+        strongest crossing (not just the latest point, which may be back to normal)."""
+        out = []
+        with self._lock:
+            for metric, state in self._series.items():
+                if state.peak is not None:
+                    score, method, value, mean = state.peak
+                    out.append({
+                        "metric": metric,
+                        "score": score,
+                        "method": method,
+                        "latest": value,
+                        "mean": mean,
+                        "n": state.n,
+                    })
+                    state.peak = None
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self.warmed = False
+
+
+streaming_detector = StreamingDetector()
@@ -2,13 +2,12 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
 from ruamel.yaml import YAML
 from sqlalchemy.orm import Session
 
-from ..common import models
+from ..common.timeseries import latest_values
 
 
 yaml = YAML(typ="safe")
@@ -36,17 +35,7 @@ _COND_RE = re.compile(r"^(?P<metric>\w+)\s*>\s*(?P<threshold>\d+)(?P<pct>%?)\s*(
 
 
 def _metric_value(db: Session, metric: str, minutes: int | None) -> Optional[float]:
-    q = db.query(models.Event).filter(models.Event.type == "metric")
-    if minutes:
-        cutoff = datetime.utcnow() - timedelta(minutes=minutes)
-        q = q.filter(models.Event.created_at >= cutoff)
-    q = q.order_by(models.Event.created_at.desc()).limit(20)
-    values: List[float] = []
-    for e in q:
-        payload = e.payload or {}
-        if str(payload.get("metric")) != metric:
-            continue
-        values.append(float(payload.get("value", 0)))
+    values = latest_values(db, metric, limit=20, minutes=minutes)
     if not values:
         return None
     # use average for windowed conditions; else latest
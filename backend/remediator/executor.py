@@ -2,46 +2,20 @@ from __future__ import annotations
 
 import subprocess
 import time
-from pathlib import Path
 from typing import Any, Dict, List
 
-from ruamel.yaml import YAML
-
-
-yaml = YAML(typ="safe")
+from .registry import runbook_registry
 
 
 def list_runbooks() -> List[Dict[str, Any]]:
-    base = Path("runbooks")
-    items: List[Dict[str, Any]] = []
-    if not base.exists():
-        return items
-    for p in sorted(base.glob("*.y*ml")):
-        try:
-            with p.open("r", encoding="utf-8") as f:
-                data = yaml.load(f) or {}
-            items.append({
-                "name": data.get("name") or p.stem,
-                "path": str(p),
-                "steps": data.get("steps", []),
-                "requires_approval": bool(data.get("requires_approval", False)),
-                "owner": data.get("owner"),
-                "service": data.get("service"),
-            })
-        except Exception:  # noqa: BLE001
-            items.append({"name": p.stem, "path": str(p), "steps": [], "requires_approval": False, "owner": None, "service": None})
-    return items
+    return runbook_registry.items()
 
 
 def _load_runbook(name: str) -> Dict[str, Any]:
-    # map name to file in runbooks directory
-    base = Path("runbooks")
-    candidates = [base / f"{name}.yml", base / f"{name}.yaml"]
-    for c in candidates:
-        if c.exists():
-            with c.open("r", encoding="utf-8") as f:
-                return yaml.load(f) or {}
-    raise FileNotFoundError(f"Runbook not found: {name}")
+    runbook = runbook_registry.document(name)
+    if runbook is None:
+        raise FileNotFoundError(f"Runbook not found: {name}")
+    return runbook
 
 
 def _safe_shell(cmd: str) -> tuple[int, str]:
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ruamel.yaml import YAML
+
+from ..common.config import settings
+
+
+yaml = YAML(typ="safe")
+
+# (mtime_ns, size) of a file when it was parsed
+Stamp = Tuple[int, int]
+
+
+def _summary(path: Path, data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": data.get("name") or path.stem,
+        "path": str(path),
+        "steps": data.get("steps", []),
+        "requires_approval": bool(data.get("requires_approval", False)),
+        "owner": data.get("owner"),
+        "service": data.get("service"),
+    }
+
+
+class RunbookRegistry:
+    """Parsed runbook YAML, re-read only for files whose mtime or size changed.
+
+    The directory is re-stat'ed at most every ``rescan_seconds``; added, edited and
+    removed files are picked up on the next scan without re-parsing the others.
+    """
+
+    def __init__(self, base: Path | str = "runbooks", rescan_seconds: float | None = None) -> None:
+        self.base = Path(base)
+        self.rescan_seconds = settings.runbook_rescan_seconds if rescan_seconds is None else rescan_seconds
+        # path -> (stamp, document, summary); the document is the parse error for broken files
+        self._files: Dict[Path, Tuple[Stamp, Dict[str, Any] | Exception, Dict[str, Any]]] = {}
+        self._items: List[Dict[str, Any]] = []
+        self._services: List[Dict[str, Any]] = []
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.parses = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._files = {}
+            self._checked = 0.0
+
+    def _stat(self) -> Dict[Path, Stamp]:
+        if not self.base.exists():
+            return {}
+        stamps: Dict[Path, Stamp] = {}
+        for entry in os.scandir(self.base):
+            if entry.is_file() and entry.name.endswith((".yml", ".yaml")):
+                st = entry.stat()
+                stamps[self.base / entry.name] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def _parse(self, path: Path) -> Tuple[Dict[str, Any] | Exception, Dict[str, Any]]:
+        self.parses += 1
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                data = yaml.load(f) or {}
+            return data, _summary(path, data)
+        except Exception as exc:  # noqa: BLE001
+            # still listed, but never executable as an empty runbook
+            return exc, {"name": path.stem, "path": str(path), "steps": [], "requires_approval": False, "owner": None, "service": None}
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._checked and now - self._checked < self.rescan_seconds:
+                return
+            stamps = self._stat()
+            changed = False
+            for path in list(self._files):
+                if path not in stamps:
+                    del self._files[path]
+                    changed = True
+            for path, stamp in stamps.items():
+                cached = self._files.get(path)
+                if cached is None or cached[0] != stamp:
+                    self._files[path] = (stamp, *self._parse(path))
+                    changed = True
+            if changed or not self._checked:
+                self._rebuild()
+            self._checked = now
+
+    def _rebuild(self) -> None:
+        self._items = [self._files[p][2] for p in sorted(self._files)]
+        services: Dict[str, Dict[str, Any]] = {}
+        for rb in self._items:
+            svc = (rb.get("service") or "default").lower()
+            entry = services.setdefault(svc, {"service": svc, "owner": rb.get("owner"), "runbooks": []})
+            if rb.get("owner") and not entry.get("owner"):
+                entry["owner"] = rb.get("owner")
+            entry["runbooks"].append(rb.get("name"))
+        self._services = sorted(services.values(), key=lambda x: x["service"])
+
+    def items(self) -> List[Dict[str, Any]]:
+        """Runbook summaries sorted by path; copies, so callers may add fields."""
+        self._refresh()
+        return [dict(item) for item in self._items]
+
+    def services(self) -> List[Dict[str, Any]]:
+        """Service catalog derived from runbook ``service``/``owner`` metadata."""
+        self._refresh()
+        return [{**svc, "runbooks": list(svc["runbooks"])} for svc in self._services]
+
+    def document(self, name: str) -> Optional[Dict[str, Any]]:
+        """Full YAML document of ``<name>.yml`` / ``<name>.yaml``, or None. Re-raises the
+        parse error of a file that is not valid YAML."""
+        self._refresh()
+        for suffix in (".yml", ".yaml"):
+            cached = self._files.get(self.base / f"{name}{suffix}")
+            if cached is not None:
+                if isinstance(cached[1], Exception):
+                    raise cached[1]
+                return cached[1]
+        return None
+
+
+runbook_registry = RunbookRegistry()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..common import models
+from ..common.db import Base, SessionLocal, engine
+from ..common.ingest import write_points
+from ..common.rollups import update_rollups
+from ..common.schemas import MetricIn
+
+
+def backfill(db: Session, before: datetime | None = None, chunk: int = 5000) -> int:
+    """Copy metric events into metric_points, keyset-paging on (created_at, id).
+
+    Only events created before ``before`` are copied; by default that is the oldest
+    existing point, i.e. the moment ingest started writing points itself.
+    """
+    if before is None:
+        before = db.execute(select(func.min(models.MetricPoint.ts))).scalar() or datetime.utcnow()
+    copied = 0
+    last: tuple[datetime, str] | None = None
+    while True:
+        q = (
+            select(models.Event.created_at, models.Event.id, models.Event.source, models.Event.payload)
+            .where(models.Event.type == "metric")
+            .where(models.Event.created_at < before)
+        )
+        if last is not None:
+            q = q.where(
+                (models.Event.created_at > last[0])
+                | ((models.Event.created_at == last[0]) & (models.Event.id > last[1]))
+            )
+        rows = db.execute(q.order_by(models.Event.created_at, models.Event.id).limit(chunk)).all()
+        if not rows:
+            break
+        metrics = []
+        for created_at, _, source, payload in rows:
+            payload = payload or {}
+            try:
+                metrics.append(MetricIn(
+                    source=source,
+                    metric=str(payload.get("metric")),
+                    value=float(payload.get("value", 0)),
+                    timestamp=payload.get("timestamp") or created_at,
+                    tags=payload.get("tags") or {},
+                ))
+            except (TypeError, ValueError, ValidationError):
+                continue
+        if metrics:
+            write_points(db, metrics)
+        db.commit()
+        copied += len(metrics)
+        last = (rows[-1][0], rows[-1][1])
+        print(f"backfilled {copied} points (up to {last[0].isoformat()})")
+    return copied
+
+
+def rebuild_rollups(db: Session, chunk: int = 20000) -> int:
+    """Recompute metric_rollups from metric_points (e.g. after upgrading to rollups)."""
+    db.query(models.MetricRollup).delete()
+    db.commit()
+    folded = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(models.MetricPoint.id, models.MetricPoint.metric, models.MetricPoint.ts, models.MetricPoint.value)
+            .where(models.MetricPoint.id > last_id)
+            .order_by(models.MetricPoint.id)
+            .limit(chunk)
+        ).all()
+        if not rows:
+            break
+        update_rollups(db, [(metric, ts, value) for _, metric, ts, value in rows])
+        db.commit()
+        folded += len(rows)
+        last_id = rows[-1][0]
+        print(f"folded {folded} points into rollups")
+    return folded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill metric_points from JSON metric events")
+    parser.add_argument("--before", type=datetime.fromisoformat, default=None, help="only copy events created before this UTC time (default: oldest existing point)")
+    parser.add_argument("--chunk", type=int, default=5000, help="events per transaction")
+    parser.add_argument("--rebuild-rollups", action="store_true", help="only recompute metric_rollups from existing metric_points")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db: Session = SessionLocal()
+    try:
+        if args.rebuild_rollups:
+            total = rebuild_rollups(db)
+            print(f"Rollup rebuild complete: {total} points.")
+            return
+        total = backfill(db, before=args.before, chunk=args.chunk)
+        print(f"Backfill complete: {total} points.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark /metrics/query style bucketed aggregation against returning raw points")
+    parser.add_argument("--points", type=int, default=1_000_000, help="points to store for the metric")
+    parser.add_argument("--series", type=int, default=50, help="series (hosts) the points are spread over")
+    parser.add_argument("--regions", type=int, default=5, help="distinct values of the 'region' tag")
+    parser.add_argument("--step", type=int, default=300, help="bucket width in seconds")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="autoops-bench-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+    import numpy as np
+    from sqlalchemy import insert, select
+
+    from ..common import models
+    from ..common.aggregate import Grid, bucketize, query_metrics
+    from ..common.db import Base, SessionLocal, engine
+    from ..common.rollups import update_rollups
+
+    Base.metadata.create_all(bind=engine)
+    rng = np.random.default_rng(0)
+    per_series = args.points // args.series
+    end = datetime.utcnow().replace(microsecond=0)
+    start = end - timedelta(seconds=10 * per_series)
+    stamps = [start + timedelta(seconds=10 * i) for i in range(per_series)]
+
+    db = SessionLocal()
+    loaded = time.perf_counter()
+    for s in range(args.series):
+        series = models.MetricSeries(metric="latency", source="bench", tags_key=f"{s:040d}", tags={"host": f"h{s}", "region": f"r{s % args.regions}"})
+        db.add(series)
+        db.flush()
+        values = (100 + np.cumsum(rng.normal(0, 1, per_series))).tolist()
+        db.execute(insert(models.MetricPoint), [
+            {"series_id": series.id, "metric": "latency", "ts": ts, "value": v} for ts, v in zip(stamps, values)
+        ])
+        update_rollups(db, [("latency", ts, v) for ts, v in zip(stamps, values)])
+        db.commit()
+    total = per_series * args.series
+    print(f"loaded {total} points in {time.perf_counter() - loaded:.1f}s ({args.series} series, {(end - start) / timedelta(hours=1):.1f}h)")
+
+    def timed(label: str, fn) -> None:
+        started = time.perf_counter()
+        body = fn()
+        elapsed = time.perf_counter() - started
+        size = len(json.dumps(body, default=str))
+        print(f"{label:<38}: {elapsed * 1000:>9.1f} ms  {size / 1024:>10.1f} KiB response")
+
+    def raw_points():
+        rows = db.execute(
+            select(models.MetricPoint.ts, models.MetricPoint.value)
+            .where(models.MetricPoint.metric == "latency")
+            .where(models.MetricPoint.ts >= start)
+        ).all()
+        return {"points": [[ts.isoformat(), v] for ts, v in rows]}
+
+    timed("raw points (client-side aggregation)", raw_points)
+    timed(f"query avg step={args.step}s (rollups)", lambda: query_metrics(db, ["latency"], start, end, args.step, "avg"))
+    timed(f"query p95 step={args.step}s (raw)", lambda: query_metrics(db, ["latency"], start, end, args.step, "p95"))
+    timed(f"query p95 by region step={args.step}s", lambda: query_metrics(db, ["latency"], start, end, args.step, "p95", group_by="region"))
+    db.close()
+
+    # the NumPy part alone, without the database fetch
+    ts = np.sort(rng.uniform(0, 10 * per_series, total))
+    values = rng.normal(100, 10, total)
+    grid = Grid(t0=0.0, step=args.step, n=int(np.ceil(10 * per_series / args.step)))
+    for agg in ("avg", "max", "p95", "rate"):
+        started = time.perf_counter()
+        bucketize(grid, ts, values, agg)
+        print(f"bucketize {agg:<5} over {total} points       : {(time.perf_counter() - started) * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+
+def _points(n: int) -> list[dict]:
+    now = datetime.utcnow().isoformat()
+    return [{"source": "bench", "metric": f"m{i % 10}", "value": float(i % 100), "timestamp": now, "tags": {"host": f"h{i % 4}"}} for i in range(n)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare single-point vs batch metric ingest throughput (in-process)")
+    parser.add_argument("--single", type=int, default=2000, help="points to send one request at a time")
+    parser.add_argument("--batch", type=int, default=50000, help="points to send through /metrics/batch")
+    parser.add_argument("--batch-size", type=int, default=5000, help="points per batch request")
+    args = parser.parse_args()
+
+    # point the app at a throwaway database before any backend module reads settings
+    tmp = tempfile.mkdtemp(prefix="autoops-bench-")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+    import json
+
+    from fastapi.testclient import TestClient
+
+    from ..api.main import app
+    from ..common.db import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(app)
+
+    single = _points(args.single)
+    start = time.perf_counter()
+    for p in single:
+        client.post("/metrics", json=p)
+    single_s = time.perf_counter() - start
+
+    batch = _points(args.batch)
+    start = time.perf_counter()
+    for i in range(0, len(batch), args.batch_size):
+        client.post("/metrics/batch", json=batch[i:i + args.batch_size])
+    batch_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, len(batch), args.batch_size):
+        body = "\n".join(json.dumps(p) for p in batch[i:i + args.batch_size])
+        client.post("/metrics/batch", content=body, headers={"Content-Type": "application/x-ndjson"})
+    ndjson_s = time.perf_counter() - start
+
+    print(f"single  : {args.single:>8} points  {args.single / single_s:>10.0f} points/s")
+    print(f"batch   : {args.batch:>8} points  {args.batch / batch_s:>10.0f} points/s")
+    print(f"ndjson  : {args.batch:>8} points  {args.batch / ndjson_s:>10.0f} points/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def _worker(args: argparse.Namespace) -> None:
+    """Run the mixed workload against DATABASE_URL in this process and print one result line."""
+    from ..common.db import Base, ReadSessionLocal, SessionLocal, engine, sqlite_performance
+    from ..common.ingest import write_metrics
+    from ..common.schemas import MetricIn
+    from ..common.timeseries import downsampled_series
+    from ..common.writer import db_writer
+
+    Base.metadata.create_all(bind=engine)
+    if sqlite_performance:
+        db_writer.start()
+    stop = time.monotonic() + args.seconds
+    lock = threading.Lock()
+    writes: list[float] = []
+    reads: list[float] = []
+    errors: list[str] = []
+
+    def writer(n: int) -> None:
+        while time.monotonic() < stop:
+            db = SessionLocal()
+            start = time.perf_counter()
+            try:
+                write_metrics(db, [MetricIn(source=f"w{n}", metric=f"m{n % 4}", value=float(i)) for i in range(args.points)])
+                with lock:
+                    writes.append(time.perf_counter() - start)
+            except Exception as exc:  # noqa: BLE001
+                with lock:
+                    errors.append(type(exc).__name__)
+            finally:
+                db.close()
+
+    def reader(n: int) -> None:
+        while time.monotonic() < stop:
+            db = ReadSessionLocal()
+            start = time.perf_counter()
+            try:
+                downsampled_series(db, f"m{n % 4}", 5, 500)
+                with lock:
+                    reads.append(time.perf_counter() - start)
+            except Exception as exc:  # noqa: BLE001
+                with lock:
+                    errors.append(type(exc).__name__)
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    db_writer.stop()
+
+    def p95(xs: list[float]) -> float:
+        return sorted(xs)[int(len(xs) * 0.95)] * 1000 if xs else float("nan")
+
+    mode = "performance" if sqlite_performance else "default"
+    print(
+        f"{mode:<12} writes {len(writes) / args.seconds:>8.1f}/s p95 {p95(writes):>7.1f} ms   "
+        f"reads {len(reads) / args.seconds:>8.1f}/s p95 {p95(reads):>7.1f} ms   errors {len(errors)}"
+        + (f" ({', '.join(sorted(set(errors)))})" if errors else "")
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mixed read/write SQLite load: default mode vs SQLITE_PERFORMANCE_MODE")
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration per mode")
+    parser.add_argument("--writers", type=int, default=8, help="concurrent writer threads (one small batch per write)")
+    parser.add_argument("--readers", type=int, default=8, help="concurrent reader threads")
+    parser.add_argument("--points", type=int, default=10, help="points per write")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        _worker(args)
+        return
+
+    # each mode runs in a fresh process: the engines are configured at import time
+    for perf in ("0", "1"):
+        tmp = tempfile.mkdtemp(prefix="autoops-bench-")
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            "SQLITE_PERFORMANCE_MODE": perf,
+            "SERIES_CACHE_ENABLED": "0",
+        }
+        cmd = [sys.executable, "-m", "backend.scripts.bench_sqlite_concurrency", "--worker", *sys.argv[1:]]
+        subprocess.run(cmd, env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def _file_size(path: str) -> int:
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare metric storage as JSON events vs Gorilla-compressed chunks")
+    parser.add_argument("--points", type=int, default=200000, help="points to store")
+    parser.add_argument("--series", type=int, default=20, help="number of series the points are spread over")
+    parser.add_argument("--chunk-points", type=int, default=1024, help="points per compressed chunk")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="autoops-bench-")
+    db_path = os.path.join(tmp, "bench.db")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{db_path}")
+
+    import json
+
+    import numpy as np
+    from sqlalchemy import select
+
+    from ..common import models, tsz
+    from ..common.compaction import encode_points
+    from ..common.db import Base, SessionLocal, engine
+    from ..common.ingest import event_row, write_events
+
+    Base.metadata.create_all(bind=engine)
+    rng = np.random.default_rng(0)
+    per_series = args.points // args.series
+    start_ts = datetime.utcnow() - timedelta(days=1)
+    stamps = [start_ts + timedelta(seconds=10 * i) for i in range(per_series)]
+    db = SessionLocal()
+
+    # one JSON event per point, as metrics were stored originally
+    base = _file_size(db_path)
+    for s in range(args.series):
+        values = np.round(50 + np.cumsum(rng.normal(0, 0.5, per_series)), 2).tolist()
+        write_events(db, [
+            event_row("bench", "metric", {"metric": f"m{s}", "value": v, "tags": {"host": f"h{s}"}}, ts)
+            for ts, v in zip(stamps, values)
+        ])
+        db.commit()
+    event_bytes = _file_size(db_path) - base
+
+    base = _file_size(db_path)
+    blob_bytes = 0
+    for s in range(args.series):
+        series = models.MetricSeries(metric=f"m{s}", source="bench", tags_key=f"{s:040d}", tags={"host": f"h{s}"})
+        db.add(series)
+        db.flush()
+        values = np.round(50 + np.cumsum(rng.normal(0, 0.5, per_series)), 2).tolist()
+        for i in range(0, per_series, args.chunk_points):
+            rows = list(zip(stamps[i:i + args.chunk_points], values[i:i + args.chunk_points]))
+            data = encode_points(rows)
+            blob_bytes += len(data)
+            db.add(models.MetricChunk(series_id=series.id, metric=f"m{s}", start_ts=rows[0][0], end_ts=rows[-1][0], count=len(rows), data=data))
+        db.commit()
+    chunk_bytes = _file_size(db_path) - base
+    total = per_series * args.series
+
+    # decode into float arrays both ways
+    started = time.perf_counter()
+    rows = db.execute(select(models.Event.payload).where(models.Event.type == "metric")).scalars()
+    np.fromiter(((p if isinstance(p, dict) else json.loads(p))["value"] for p in rows), dtype=np.float64)
+    event_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for (data,) in db.execute(select(models.MetricChunk.data)):
+        tsz.decode(data)
+    chunk_s = time.perf_counter() - started
+    db.close()
+
+    print(f"points        : {total}")
+    print(f"events  bytes : {event_bytes / total:>8.1f} bytes/point on disk   read {total / event_s:>10.0f} points/s")
+    print(f"chunks  bytes : {chunk_bytes / total:>8.1f} bytes/point on disk   read {total / chunk_s:>10.0f} points/s")
+    print(f"chunk payload : {blob_bytes / total:>8.2f} bytes/point")
+
+
+if __name__ == "__main__":
+    main()
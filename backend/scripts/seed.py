@@ -10,7 +10,9 @@ from sqlalchemy.orm import Session
 
 from ..common.db import SessionLocal, Base, engine
 from ..common import models
-from ..common.metrics_store import write_metric_influx
+from ..common.ingest import event_row, forward_metrics_influx, write_events, write_metrics
+from ..common.ops import clear_demo_data
+from ..common.schemas import MetricIn
 
 
 def _randn(scale: float = 1.0) -> float:
@@ -91,17 +93,15 @@ def seed(db: Session, realistic: bool = True, also_influx: bool = True) -> None:
             "failed_logins": [(now - timedelta(minutes=i), max(0.0, 1.0 + _randn(0.5))) for i in range(30)],
         }
 
-    # write metrics as events
-    for metric, points in series.items():
-        for t, v in points:
-            evt = models.Event(source="seed", type="metric", payload={"metric": metric, "value": float(v), "timestamp": t.isoformat(), "tags": {"env": "demo"}})
-            db.add(evt)
-            if also_influx:
-                try:
-                    write_metric_influx(metric, float(v), {"env": "demo"}, t)
-                except Exception:
-                    pass
-    db.commit()
+    # write metrics through the regular ingest path (typed points + events)
+    metrics = [
+        MetricIn(source="seed", metric=metric, value=float(v), timestamp=t, tags={"env": "demo"})
+        for metric, points in series.items()
+        for t, v in points
+    ]
+    write_metrics(db, metrics)
+    if also_influx:
+        forward_metrics_influx(metrics)
 
     # create indicative incidents and actions to tell the story
     inc_err = models.Incident(title="Incident: error_rate spike", status="mitigated", impact_minutes=6, metadata={"metric": "error_rate"})
@@ -117,10 +117,15 @@ def seed(db: Session, realistic: bool = True, also_influx: bool = True) -> None:
     db.commit()
 
     # synthetic logs (auth failures and 5xx traces) as events for realism
-    for _ in range(50):
-        db.add(models.Event(source="auth", type="log", payload={"level": "WARN", "msg": "failed login", "user": f"user{random.randint(1000,9999)}", "ip": f"192.168.1.{random.randint(2,254)}"}))
-    for _ in range(30):
-        db.add(models.Event(source="web", type="log", payload={"level": "ERROR", "msg": "HTTP 500", "path": "/api/checkout", "trace": "...stack..."}))
+    logs = [
+        event_row("auth", "log", {"level": "WARN", "msg": "failed login", "user": f"user{random.randint(1000,9999)}", "ip": f"192.168.1.{random.randint(2,254)}"})
+        for _ in range(50)
+    ]
+    logs += [
+        event_row("web", "log", {"level": "ERROR", "msg": "HTTP 500", "path": "/api/checkout", "trace": "...stack..."})
+        for _ in range(30)
+    ]
+    write_events(db, logs)
     db.commit()
 
 
@@ -139,10 +144,7 @@ def main() -> None:
         except Exception:
             pass
         if args.reset:
-            db.query(models.Action).delete()
-            db.query(models.Anomaly).delete()
-            db.query(models.Incident).delete()
-            db.query(models.Event).delete()
+            clear_demo_data(db)
             db.commit()
         seed(db, realistic=not args.minimal, also_influx=not args.no_influx)
         print("Seed complete.")
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ruamel.yaml import YAML
+
+from ..common.aggregate import parse_step
+
+
+yaml = YAML(typ="safe")
+
+KINDS = ("error_rate", "threshold")
+
+
+@dataclass(frozen=True)
+class Slo:
+    name: str
+    metric: str
+    kind: str
+    objective: float  # good percentage, e.g. 99.9
+    window_minutes: int
+    threshold: Optional[float] = None
+
+    @property
+    def budget(self) -> float:
+        """Allowed bad fraction."""
+        return 1.0 - self.objective / 100.0
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    long_minutes: int
+    short_minutes: int
+    burn_rate: float
+    severity: str
+
+    @property
+    def label(self) -> str:
+        return f"{_duration(self.long_minutes)}/{_duration(self.short_minutes)}"
+
+
+def _duration(minutes: int) -> str:
+    for unit, size in (("d", 1440), ("h", 60)):
+        if minutes % size == 0:
+            return f"{minutes // size}{unit}"
+    return f"{minutes}m"
+
+
+def _minutes(value: Any) -> int:
+    return max(1, parse_step(str(value)) // 60)
+
+
+def load_slos(path: str) -> Tuple[List[Slo], List[AlertRule]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data: Dict[str, Any] = yaml.load(f) or {}
+    except FileNotFoundError:
+        data = {}
+    slos: List[Slo] = []
+    for item in data.get("slos") or []:
+        kind = str(item.get("kind", "error_rate"))
+        if kind not in KINDS:
+            raise ValueError(f"SLO {item.get('name')!r}: kind must be one of {KINDS}")
+        if kind == "threshold" and item.get("threshold") is None:
+            raise ValueError(f"SLO {item.get('name')!r}: threshold SLOs need a threshold")
+        slos.append(Slo(
+            name=str(item["name"]),
+            metric=str(item["metric"]),
+            kind=kind,
+            objective=float(item["objective"]),
+            window_minutes=_minutes(item.get("window", "30d")),
+            threshold=float(item["threshold"]) if item.get("threshold") is not None else None,
+        ))
+    rules = [
+        AlertRule(_minutes(r["long"]), _minutes(r["short"]), float(r["burn_rate"]), str(r.get("severity", "high")))
+        for r in data.get("alerts") or []
+    ]
+    return slos, rules
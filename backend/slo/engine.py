@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..common import models
+from ..common.config import settings
+from ..common.db import SessionLocal
+from ..common.logging import get_logger
+from ..common.notify import send_webhook
+from ..common.ops import create_incident_if_needed
+from ..common.series_cache import from_epoch, to_epoch
+from ..common.sketch import DDSketch
+from .config import AlertRule, Slo, load_slos
+
+
+logger = get_logger(__name__)
+
+# always reported, on top of the alert rules' windows
+BURN_WINDOWS = (5, 60, 360, 4320)
+
+Columns = Tuple[np.ndarray, np.ndarray, np.ndarray]  # (epoch minute, total, bad)
+
+
+def _minute(ts: datetime) -> int:
+    return int(to_epoch(ts) // 60)
+
+
+def fetch_buckets(db: Session, slo: Slo, tier: int, since: datetime, until: Optional[datetime] = None) -> Columns:
+    """(bucket start minute, samples, bad samples) per stored bucket of ``tier`` in [since, until).
+
+    Error-rate SLOs read the rollups (each sample is ``value / 100`` bad); threshold SLOs
+    read the quantile sketches and count the samples above the threshold.
+    """
+    model = models.MetricRollup if slo.kind == "error_rate" else models.MetricSketch
+    cols = (model.bucket, model.count, model.sum_value) if slo.kind == "error_rate" else (model.bucket, model.data)
+    q = select(*cols).where(model.metric == slo.metric).where(model.tier == tier).where(model.bucket >= since)
+    if until is not None:
+        q = q.where(model.bucket < until)
+    rows = db.execute(q).all()
+    minutes = np.fromiter((_minute(r[0]) for r in rows), dtype=np.int64, count=len(rows))
+    if slo.kind == "error_rate":
+        total = np.fromiter((r[1] for r in rows), dtype=np.float64, count=len(rows))
+        bad = np.clip(np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows)) / 100.0, 0.0, total)
+    else:
+        sketches = [DDSketch.from_bytes(r[1]) for r in rows]
+        total = np.fromiter((s.count for s in sketches), dtype=np.float64, count=len(rows))
+        bad = np.fromiter((s.count_above(slo.threshold) for s in sketches), dtype=np.float64, count=len(rows))
+    return minutes, total, bad
+
+
+class SloState:
+    """Per-minute (samples, bad samples) over one SLO's rolling window, as a ring indexed by
+    epoch minute. Window sums are a masked NumPy reduction over at most ``window`` slots."""
+
+    def __init__(self, slo: Slo) -> None:
+        self.slo = slo
+        n = slo.window_minutes
+        self.minute = np.full(n, -1, dtype=np.int64)
+        self.total = np.zeros(n)
+        self.bad = np.zeros(n)
+        self.loaded_to: Optional[int] = None  # newest minute bucket read from the minute tier
+        self.synced_at: Optional[datetime] = None
+        self.firing: Set[str] = set()
+
+    def put(self, cols: Columns) -> None:
+        minutes, total, bad = cols
+        if not len(minutes):
+            return
+        slots = minutes % len(self.minute)
+        # a bucket read again (still filling) overwrites its slot
+        self.minute[slots] = minutes
+        self.total[slots] = total
+        self.bad[slots] = bad
+
+    def sums(self, now_minute: int, windows: List[int]) -> Dict[int, Tuple[float, float]]:
+        age = now_minute - self.minute
+        out = {}
+        for w in windows:
+            mask = (self.minute >= 0) & (age >= 0) & (age < w)
+            out[w] = (float(self.total[mask].sum()), float(self.bad[mask].sum()))
+        return out
+
+
+@dataclass
+class SloEvaluation:
+    slo: Slo
+    evaluated_at: datetime
+    total: float
+    bad: float
+    burn_rates: Dict[int, Optional[float]] = field(default_factory=dict)
+    firing: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def compliance_pct(self) -> Optional[float]:
+        return 100.0 * (1.0 - self.bad / self.total) if self.total else None
+
+    @property
+    def budget_remaining_pct(self) -> Optional[float]:
+        if not self.total or self.slo.budget <= 0:
+            return None
+        return max(0.0, 100.0 * (1.0 - (self.bad / self.total) / self.slo.budget))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.slo.name,
+            "metric": self.slo.metric,
+            "kind": self.slo.kind,
+            "objective_pct": self.slo.objective,
+            "window_minutes": self.slo.window_minutes,
+            "evaluated_at": self.evaluated_at.isoformat(),
+            "samples": self.total,
+            "compliance_pct": self.compliance_pct,
+            "error_budget_remaining_pct": self.budget_remaining_pct,
+            "burn_rates": {f"{w}m": r for w, r in self.burn_rates.items()},
+            "firing": self.firing,
+        }
+
+
+class SloEngine:
+    """Keeps every declared SLO's window in memory and evaluates multi-window burn rates.
+
+    ``refresh`` reads only the minute buckets written since the previous call (plus the
+    one still filling); a full re-read, which also picks up late points, happens every
+    ``resync_seconds``. Buckets older than the longest burn window come from the hourly
+    tier, so a 30-day window never needs minute data past the minute-tier retention.
+    """
+
+    def __init__(self, path: str | None = None, resync_seconds: float | None = None, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self.path = path or settings.slo_config_path
+        self.resync_seconds = settings.slo_resync_seconds if resync_seconds is None else resync_seconds
+        self._session_factory = session_factory
+        self._lock = threading.RLock()
+        self._mtime: Optional[float] = None
+        self.rules: List[AlertRule] = []
+        self.states: Dict[str, SloState] = {}
+        self.last: List[SloEvaluation] = []
+
+    def _load(self) -> None:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if self._mtime == mtime and (self.states or mtime is None):
+            return
+        slos, rules = load_slos(self.path)
+        self.rules = rules
+        # keep the loaded window of SLOs whose definition did not change
+        self.states = {s.name: self.states[s.name] if s.name in self.states and self.states[s.name].slo == s else SloState(s) for s in slos}
+        self._mtime = mtime
+
+    def windows(self) -> List[int]:
+        return sorted(set(BURN_WINDOWS) | {r.long_minutes for r in self.rules} | {r.short_minutes for r in self.rules})
+
+    def refresh(self, db: Session, now: datetime | None = None) -> None:
+        now = now or datetime.utcnow()
+        with self._lock:
+            self._load()
+            for state in self.states.values():
+                due = state.synced_at is None or (now - state.synced_at).total_seconds() >= self.resync_seconds
+                if due:
+                    self._resync(db, state, now)
+                else:
+                    cols = fetch_buckets(db, state.slo, 60, from_epoch((state.loaded_to - 1) * 60))
+                    state.put(cols)
+                    if len(cols[0]):
+                        state.loaded_to = max(state.loaded_to, int(cols[0].max()))
+
+    def _resync(self, db: Session, state: SloState, now: datetime) -> None:
+        slo = state.slo
+        fresh = SloState(slo)
+        fresh.firing = state.firing
+        # hourly buckets up to the longest burn window, minute buckets after that
+        split = math.floor(to_epoch(now - timedelta(minutes=max(self.windows()) + 60)) / 3600) * 3600
+        start = now - timedelta(minutes=slo.window_minutes)
+        if to_epoch(start) < split:
+            fresh.put(fetch_buckets(db, slo, 3600, start, from_epoch(split)))
+        cols = fetch_buckets(db, slo, 60, from_epoch(max(split, math.floor(to_epoch(start) / 60) * 60)))
+        fresh.put(cols)
+        fresh.loaded_to = int(cols[0].max()) if len(cols[0]) else _minute(now)
+        fresh.synced_at = now
+        state.__dict__.update(fresh.__dict__)
+
+    def evaluate(self, now: datetime | None = None) -> List[SloEvaluation]:
+        """Burn rates and firing alert rules from the in-memory windows (no database access).
+
+        The windows are only as fresh as the last ``refresh``, which the SLO loop runs; this is
+        what request handlers call.
+        """
+        now = now or datetime.utcnow()
+        now_minute = _minute(now)
+        out: List[SloEvaluation] = []
+        with self._lock:
+            self._load()
+            windows = self.windows()
+            for state in self.states.values():
+                slo = state.slo
+                sums = state.sums(now_minute, windows + [slo.window_minutes])
+                total, bad = sums[slo.window_minutes]
+                ev = SloEvaluation(slo=slo, evaluated_at=now, total=total, bad=bad)
+                for w in windows:
+                    t, b = sums[w]
+                    ev.burn_rates[w] = (b / t) / slo.budget if t and slo.budget > 0 else None
+                for rule in self.rules:
+                    long_rate, short_rate = ev.burn_rates.get(rule.long_minutes), ev.burn_rates.get(rule.short_minutes)
+                    if long_rate is not None and short_rate is not None and long_rate > rule.burn_rate and short_rate > rule.burn_rate:
+                        ev.firing.append({
+                            "rule": rule.label,
+                            "severity": rule.severity,
+                            "burn_rate_threshold": rule.burn_rate,
+                            "burn_rate_long": long_rate,
+                            "burn_rate_short": short_rate,
+                        })
+                out.append(ev)
+            self.last = out
+        return out
+
+    def status(self, db: Session, now: datetime | None = None) -> List[SloEvaluation]:
+        self.refresh(db, now)
+        return self.evaluate(now)
+
+    def run_once(self, now: datetime | None = None) -> List[SloEvaluation]:
+        """Refresh, evaluate and turn newly firing rules into anomalies (and incidents)."""
+        db = self._session_factory()
+        try:
+            evaluations = self.status(db, now)
+            fired = 0
+            with self._lock:
+                for ev in evaluations:
+                    state = self.states.get(ev.slo.name)
+                    if state is None:
+                        continue
+                    active = {f["rule"] for f in ev.firing}
+                    for alert in ev.firing:
+                        if alert["rule"] not in state.firing:
+                            self._raise(db, ev, alert)
+                            fired += 1
+                    state.firing = active
+            if fired:
+                db.commit()
+            return evaluations
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _raise(self, db: Session, ev: SloEvaluation, alert: Dict[str, Any]) -> None:
+        slo = ev.slo
+        incident = create_incident_if_needed(db, slo.metric, alert["severity"])
+        db.add(models.Anomaly(
+            metric=slo.metric,
+            score=float(alert["burn_rate_long"]),
+            severity=alert["severity"],
+            details={
+                "method": "slo_burn_rate",
+                "slo": slo.name,
+                "objective_pct": slo.objective,
+                "error_budget_remaining_pct": ev.budget_remaining_pct,
+                **alert,
+            },
+            incident_id=incident.id if incident else None,
+        ))
+        logger.warning("SLO %s burning %.1fx over %s", slo.name, alert["burn_rate_long"], alert["rule"])
+        if alert["severity"] in {"high", "critical"}:
+            send_webhook(
+                message=f"SLO burn: {slo.name} {alert['severity']}",
+                payload={"slo": slo.name, "metric": slo.metric, **alert},
+            )
+
+
+slo_engine = SloEngine()
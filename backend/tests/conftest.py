@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="autoops-tests-")
+
+
+def pytest_configure(config) -> None:
+    # a fresh database per session, set before backend.common.config reads the environment,
+    # so runs neither depend on each other nor touch the tracked autoops.db
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'autoops.db')}"
+    # likewise fitted detector models go to the temp dir, not the user's data dir
+    os.environ["DATA_DIR"] = _TMP_DIR
+    os.environ["DETECTOR_MODEL_DIR"] = os.path.join(_TMP_DIR, "models")
+
+
+def pytest_unconfigure(config) -> None:
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+
+class FakeInflux:
+    """Minimal InfluxDB v2 HTTP endpoint: counts line-protocol points posted to /api/v2/write."""
+
+    def __init__(self) -> None:
+        self.lines = 0
+        self.requests = 0
+        self.fail_writes = False
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if self.path.startswith("/api/v2/write"):
+                    if fake.fail_writes:
+                        self.send_response(500)
+                        self.end_headers()
+                        return
+                    with fake._lock:
+                        fake.requests += 1
+                        fake.lines += len([ln for ln in body.split(b"\n") if ln.strip()])
+                    self.send_response(204)
+                    self.end_headers()
+                    return
+                # /api/v2/query: an empty annotated CSV result
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv")
+                self.end_headers()
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _create_tables() -> None:
+    # the app creates tables on startup, which module-level TestClients never trigger
+    from backend.common.db import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def fake_influx(monkeypatch) -> Iterator[FakeInflux]:
+    from backend.common.config import settings
+
+    server = FakeInflux()
+    monkeypatch.setattr(settings, "influx_url", server.url)
+    monkeypatch.setattr(settings, "influx_token", "test-token")
+    monkeypatch.setattr(settings, "influx_org", "test-org")
+    monkeypatch.setattr(settings, "influx_bucket", "test-bucket")
+    try:
+        yield server
+    finally:
+        server.close()
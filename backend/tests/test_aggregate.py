@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.common.aggregate import Grid, bucketize, parse_step, query_metrics
+from backend.common.db import SessionLocal
+from backend.common.ingest import write_metrics
+from backend.common.schemas import MetricIn
+
+client = TestClient(app)
+
+
+def test_bucketize_matches_numpy_reference():
+    rng = np.random.default_rng(7)
+    ts = np.sort(rng.uniform(0, 600, 5000))
+    values = rng.normal(50, 10, 5000)
+    grid = Grid(t0=0.0, step=60, n=10)
+    idx = (ts // 60).astype(int)
+    for agg, ref in (("avg", np.mean), ("min", np.min), ("max", np.max), ("sum", np.sum), ("count", len)):
+        out, counts = bucketize(grid, ts, values, agg)
+        assert counts.sum() == 5000
+        np.testing.assert_allclose(out, [ref(values[idx == b]) for b in range(10)])
+    out, _ = bucketize(grid, ts, values, "p95")
+    np.testing.assert_allclose(out, [np.percentile(values[idx == b], 95, method="inverted_cdf") for b in range(10)])
+
+    # two counters, one resetting mid-bucket: rate is the summed increase per second
+    ts = np.array([0, 10, 20, 30, 0, 30], dtype=float)
+    values = np.array([100, 110, 5, 15, 0, 60], dtype=float)
+    series = np.array([1, 1, 1, 1, 2, 2])
+    out, _ = bucketize(Grid(t0=0.0, step=60, n=1), ts, values, "rate", series)
+    assert out[0] == (10 + 5 + 10 + 60) / 60
+
+
+def test_metrics_query_endpoint_groups_by_tag():
+    base = datetime(2003, 5, 6)
+    db = SessionLocal()
+    try:
+        for region, offset in (("eu", 0.0), ("us", 100.0)):
+            write_metrics(db, [
+                MetricIn(source="test", metric="agg_latency", value=offset + i, timestamp=base + timedelta(seconds=10 * i), tags={"region": region})
+                for i in range(30)
+            ])
+        write_metrics(db, [MetricIn(source="test", metric="agg_errors", value=1.0, timestamp=base + timedelta(seconds=i)) for i in range(90)])
+    finally:
+        db.close()
+    params = {"metric": ["agg_latency", "agg_errors"], "start": base.isoformat(), "end": (base + timedelta(minutes=5)).isoformat(), "step": "1m"}
+
+    r = client.get("/metrics/query", params={**params, "agg": "max"})
+    assert r.status_code == 200
+    series = {s["metric"]: s for s in r.json()["series"]}
+    assert series["agg_latency"]["points"] == [[(base + timedelta(minutes=m)).isoformat(), 100.0 + 6 * m + 5] for m in range(5)]
+    assert [v for _, v in series["agg_errors"]["points"]] == [1.0, 1.0]
+
+    r = client.get("/metrics/query", params={**params, "metric": "agg_latency", "agg": "count", "group_by": "region"})
+    groups = {s["group"]["region"]: s["points"] for s in r.json()["series"]}
+    assert set(groups) == {"eu", "us"} and [v for _, v in groups["eu"]] == [6.0] * 5
+
+    assert client.get("/metrics/query", params={**params, "agg": "median"}).status_code == 400
+    assert client.get("/metrics/query", params={**params, "step": "1s", "start": "2000-01-01T00:00:00"}).status_code == 400
+
+
+def test_query_uses_rollups_when_they_cover_the_step():
+    base = datetime(2004, 1, 1)
+    db = SessionLocal()
+    try:
+        write_metrics(db, [MetricIn(source="test", metric="agg_rollup", value=float(i), timestamp=base + timedelta(seconds=30 * i)) for i in range(40)])
+        kwargs = dict(start=base, end=base + timedelta(minutes=20), step=300, agg="avg", now=base + timedelta(hours=1))
+        fast = query_metrics(db, ["agg_rollup"], **kwargs)
+        raw = query_metrics(db, ["agg_rollup"], **{**kwargs, "now": datetime.utcnow()})
+    finally:
+        db.close()
+    assert fast["series"][0]["source"] == "rollup_300s" and raw["series"][0]["source"] == "raw"
+    assert fast["series"][0]["points"] == raw["series"][0]["points"]
+    assert parse_step("5m") == 300 and parse_step("90") == 90
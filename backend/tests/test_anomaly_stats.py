@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.common import models
+from backend.common.anomaly_stats import stats_cache
+from backend.common.counters import counter_reconciler
+from backend.common.db import SessionLocal
+
+client = TestClient(app)
+
+METRIC = f"stats_{uuid.uuid4().hex[:8]}"
+
+
+def _add(severity: str, age: timedelta) -> None:
+    db = SessionLocal()
+    try:
+        db.add(models.Anomaly(metric=METRIC, score=1.0, severity=severity, details={}, created_at=datetime.utcnow() - age))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_stats_are_windowed_and_cached_until_a_write():
+    counter_reconciler.run_once()
+    stats_cache.clear()
+    for severity, age in (("high", timedelta(minutes=5)), ("high", timedelta(minutes=50)), ("low", timedelta(minutes=10)), ("critical", timedelta(days=3))):
+        _add(severity, age)
+
+    assert client.get("/anomalies/stats", params={"minutes": 60}).json()[METRIC] == {"low": 1, "medium": 0, "high": 2, "critical": 0}
+    assert client.get("/anomalies/stats", params={"minutes": 7 * 1440}).json()[METRIC]["critical"] == 1
+
+    hits = stats_cache.stats()["hits"]
+    client.get("/anomalies/stats", params={"minutes": 60})
+    assert stats_cache.stats()["hits"] == hits + 1
+
+    _add("medium", timedelta(minutes=1))  # moves the write watermark
+    assert client.get("/anomalies/stats", params={"minutes": 60}).json()[METRIC]["medium"] == 1
+
+    body = client.get("/anomalies/stats/histogram", params={"minutes": 120, "bucket_minutes": 30, "metric": METRIC}).json()
+    assert len(body["buckets"]) == 5 and set(body["series"]) == {METRIC}
+    high = body["series"][METRIC]["high"]
+    assert len(high) == len(body["buckets"]) and sum(high) == 2
+    assert client.get("/anomalies/stats/histogram", params={"minutes": 100000, "bucket_minutes": 1}).status_code == 400
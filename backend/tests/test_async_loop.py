@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+from backend.api.main import app
+from backend.detector import detector
+
+
+def _run(coro):
+    # a private loop: asyncio.run() would unset the loop other tests rely on
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_health_stays_fast_during_slow_detector_cycle(monkeypatch):
+    def slow_load(db, minutes=15):
+        time.sleep(1.0)  # stands in for a long query / scoring pass
+        return {}
+
+    monkeypatch.setattr(detector, "_load_recent_metrics", slow_load)
+
+    async def scenario() -> tuple[float, float]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            cycle = asyncio.create_task(detector.run_detection_cycle())
+            await asyncio.sleep(0.05)
+            latencies = []
+            while not cycle.done():
+                start = time.perf_counter()
+                r = await client.get("/health")
+                latencies.append(time.perf_counter() - start)
+                assert r.status_code == 200
+                await asyncio.sleep(0.05)
+            await cycle
+            return max(latencies), len(latencies)
+
+    worst, samples = _run(scenario())
+    assert samples >= 5  # the loop kept serving while the cycle ran
+    assert worst < 0.25
+
+
+def test_async_ready_and_reads():
+    async def scenario() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/health/ready")).json() == {"status": "ready"}
+            r = await client.post("/metrics", json={"source": "async-test", "metric": "async_metric", "value": 1.5})
+            assert r.status_code == 200
+            assert "async_metric" in (await client.get("/metrics/keys")).json()
+            assert (await client.get("/metrics/recent", params={"metric": "async_metric"})).json()["points"]
+            assert (await client.get("/anomalies")).status_code == 200
+
+    _run(scenario())
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.detector.algorithms import mad_anomaly_score, rolling_zscore
+from backend.detector.batch import pack, score_batch
+from backend.detector.detector import _severity_from_score
+
+client = TestClient(app)
+
+
+def test_batch_scores_match_the_per_series_detectors():
+    rng = np.random.default_rng(2)
+    series = [rng.normal(50, 5, int(n)).tolist() for n in rng.integers(0, 120, 300)]
+    for s in series[::3]:
+        if s:
+            s[-1] += rng.choice([-1, 1]) * rng.uniform(10, 60)
+    series.append([5.0] * 20)  # zero spread
+    series.append([5.0] * 19 + [9.0])
+
+    flat, lengths = pack(series)
+    assert flat.shape == (sum(map(len, series)),) and lengths.tolist() == list(map(len, series))
+
+    batch = score_batch(series)
+    fired = 0
+    for i, values in enumerate(series):
+        row = batch.row(i)
+        z, mad = rolling_zscore(values), mad_anomaly_score(values)
+        expected = z if z is not None else mad
+        if expected is None:
+            assert row["score"] is None
+            continue
+        fired += 1
+        assert row["score"] == pytest.approx(expected, rel=1e-9)
+        assert row["method"] == ("rolling_zscore" if z is not None else "mad")
+        assert row["severity"] == _severity_from_score(expected)
+    assert fired > 50
+
+
+def test_score_endpoint():
+    r = client.post("/anomalies/score", json={"series": {
+        "cpu": [20.0, 21.0, 20.5, 19.5, 20.0, 20.2, 19.8, 20.1, 95.0],
+        "short": [1.0, 2.0],
+        "empty": [],
+    }})
+    assert r.status_code == 200
+    results = {row["metric"]: row for row in r.json()["results"]}
+    assert results["cpu"]["method"] == "rolling_zscore" and results["cpu"]["severity"] == "critical"
+    assert results["cpu"]["n"] == 9 and results["cpu"]["latest"] == 95.0
+    assert results["short"]["score"] is None and results["short"]["zscore"] is None
+    assert results["empty"]["latest"] is None
+
+
+def test_score_endpoint_with_skewed_lengths():
+    # padded to the longest series this would be 50k x 100k floats (40 GB); ragged it is 150k
+    rng = np.random.default_rng(3)
+    long = rng.normal(50, 5, 100_000)
+    long[-1] = 120.0
+    series = {f"s{i}": [1.0] for i in range(50_000)}
+    series["long"] = long.tolist()
+    r = client.post("/anomalies/score", json={"series": series})
+    assert r.status_code == 200
+    results = {row["metric"]: row for row in r.json()["results"]}
+    assert results["long"]["score"] == pytest.approx(rolling_zscore(series["long"]), rel=1e-9)
+    assert results["s0"]["latest"] == 1.0 and results["s0"]["score"] is None
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.common.config import settings
+from backend.common.db import SessionLocal
+from backend.common.ingest import write_metrics
+from backend.common.schemas import MetricIn
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+client = TestClient(app)
+
+
+def test_metric_export_arrow_and_parquet(monkeypatch):
+    monkeypatch.setattr(settings, "export_fetch_size", 2)  # 20-row record batches
+    base = datetime(2002, 3, 4)
+    db = SessionLocal()
+    try:
+        write_metrics(db, [MetricIn(source="test", metric="columnar_a", value=float(i), timestamp=base + timedelta(seconds=i)) for i in range(50)])
+        write_metrics(db, [MetricIn(source="test", metric="columnar_b", value=-1.0, timestamp=base + timedelta(seconds=i)) for i in range(5)])
+    finally:
+        db.close()
+    params = {"metric": ["columnar_a", "columnar_b"], "start": (base + timedelta(seconds=10)).isoformat(), "end": (base + timedelta(minutes=5)).isoformat()}
+
+    r = client.get("/export/metrics", params={**params, "format": "arrow"})
+    assert r.status_code == 200
+    reader = pa.ipc.open_stream(io.BytesIO(r.content))
+    batches = list(reader)
+    table = pa.Table.from_batches(batches)
+    assert len(batches) > 1
+    assert table.num_rows == 40
+    assert table.column("value").to_pylist()[:3] == [10.0, 11.0, 12.0]
+    assert table.column("ts")[0].as_py() == base + timedelta(seconds=10)
+
+    r = client.get("/export/metrics", params={**params, "metric": "columnar_a", "format": "parquet"})
+    assert r.status_code == 200
+    table = pq.read_table(io.BytesIO(r.content))
+    assert table.num_rows == 40 and set(table.column("metric").to_pylist()) == {"columnar_a"}
+
+    assert client.get("/export/metrics", params={"format": "xml"}).status_code == 400
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, event
+
+from backend.api.main import app
+from backend.common import models
+from backend.common.counters import counter_reconciler, read_counts, true_counts
+from backend.common.db import SessionLocal, engine
+from backend.common.retention import RetentionWorker, TableReport
+
+client = TestClient(app)
+
+
+def test_counters_follow_inserts_status_changes_and_deletes():
+    counter_reconciler.run_once()
+    db = SessionLocal()
+    try:
+        before = read_counts(db)
+        assert before == true_counts(db)
+
+        incident = models.Incident(title="Incident: counters spike")
+        action = models.Action(name="counters_test", input={}, result={}, success=True)
+        db.add_all([incident, action, models.Anomaly(metric="counters", score=1.0, severity="low", details={})])
+        db.commit()
+        incident.status = "mitigated"
+        db.delete(action)
+        db.commit()
+
+        db.add(models.Anomaly(metric="counters", score=1.0, severity="low", details={}))
+        db.flush()
+        db.rollback()  # the counter update rolls back with the row
+
+        after = read_counts(db)
+        assert after["anomalies"] == before["anomalies"] + 1
+        assert after["actions"] == before["actions"]
+        assert after["incidents"] == before["incidents"] + 1
+        assert after["incidents.open"] == before["incidents.open"]
+        assert after["incidents.mitigated"] == before["incidents.mitigated"] + 1
+        assert after == true_counts(db)
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            body = client.get("/summary").json()
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        assert body == {"anomalies": after["anomalies"], "actions": after["actions"], "incidents": after["incidents"]}
+        assert not any("count(" in s.lower() for s in statements)
+    finally:
+        db.close()
+
+
+def test_bulk_deletes_keep_counters_and_reconcile_fixes_drift():
+    counter_reconciler.run_once()
+    db = SessionLocal()
+    try:
+        db.add(models.Incident(title="Incident: ancient", status="closed", created_at=datetime(1990, 1, 1)))
+        db.commit()
+        RetentionWorker(chunk_size=10, pause_seconds=0)._prune_incidents(TableReport("incidents", 1), datetime(1991, 1, 1))
+        assert read_counts(db) == true_counts(db)
+
+        # writes behind the ORM's back drift until the next reconciliation
+        db.add(models.Action(name="drift_test", input={}, result={}, success=True))
+        db.commit()
+        db.execute(delete(models.Action).where(models.Action.name == "drift_test"))
+        db.commit()
+        assert read_counts(db)["actions"] == true_counts(db)["actions"] + 1
+        run = counter_reconciler.run_once()
+        assert run.drift == {"actions": -1}
+        assert read_counts(db) == true_counts(db)
+    finally:
+        db.close()
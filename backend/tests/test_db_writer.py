@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import sqlite3
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from backend.common import models
+from backend.common.db import SessionLocal, _sqlite_pragmas
+from backend.common.ingest import event_row, write_events
+from backend.common.writer import DbWriter
+
+
+def _count(source: str) -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(select(func.count()).select_from(models.Event).where(models.Event.source == source)).scalar_one()
+    finally:
+        db.close()
+
+
+def test_writer_group_commits_and_isolates_failures():
+    source = f"writer-{uuid.uuid4().hex[:8]}"
+    writer = DbWriter(max_batch=50, max_wait_ms=200)
+    committed: list[int] = []
+    visible: list[int] = []
+
+    def job(db, i):
+        write_events(db, [event_row(source, "metric", {"i": i})])
+        # another connection must not see this batch's earlier jobs before the COMMIT
+        visible.append(_count(source))
+        return i
+
+    def boom(db):
+        write_events(db, [event_row(source, "metric", {"i": -1})])
+        raise ValueError("bad job")
+
+    futures = [writer.submit(lambda db, i=i: job(db, i), on_commit=committed.append) for i in range(10)]
+    bad = writer.submit(boom)
+    futures += [writer.submit(lambda db, i=i: job(db, i), on_commit=committed.append) for i in range(10, 20)]
+    # queued before the thread starts, so all 21 jobs land in one batch
+    writer.start()
+    try:
+        assert [f.result(5) for f in futures] == list(range(20))
+        with pytest.raises(ValueError):
+            bad.result(5)
+    finally:
+        writer.stop()
+    stats = writer.stats()
+    assert stats["jobs"] == 21 and stats["failed_jobs"] == 1 and stats["commits"] == 1
+    assert visible == [0] * 20
+    assert sorted(committed) == list(range(20))
+    assert _count(source) == 20  # the failed job's savepoint was rolled back, the rest committed together
+
+
+def test_performance_pragmas(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "perf.db"))
+    _sqlite_pragmas(conn, query_only=True)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] > 0
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.close()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.common import models
+from backend.common.config import settings
+from backend.common.db import SessionLocal
+
+
+client = TestClient(app)
+
+
+def test_exports_stream_time_range(monkeypatch):
+    monkeypatch.setattr(settings, "export_fetch_size", 7)  # several encoded chunks
+    base = datetime(2001, 1, 1)
+    db = SessionLocal()
+    try:
+        for i in range(30):
+            db.add(models.Action(name="export-test", input={"i": i}, result={"ok": True}, success=i % 2 == 0, created_at=base + timedelta(minutes=i)))
+        db.commit()
+    finally:
+        db.close()
+    params = {"start": (base + timedelta(minutes=5)).isoformat(), "end": (base + timedelta(minutes=25)).isoformat()}
+
+    r = client.get("/export/actions.csv", params=params)
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert len(rows) == 20
+    assert [row["created_at"] for row in rows] == sorted(row["created_at"] for row in rows)
+    assert json.loads(rows[0]["input"]) == {"i": 5}
+
+    r = client.get("/export/actions.ndjson", params=params)
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert len(lines) == 20 and lines[-1]["input"] == {"i": 24}
+
+
+def test_export_kinds_and_unknown():
+    for kind in ("events", "anomalies", "incidents"):
+        assert client.get(f"/export/{kind}.ndjson", params={"since_mins": 5}).status_code == 200
+    assert client.get("/export/secrets.csv").status_code == 404
+    assert client.get("/export/actions.xml").status_code == 404
+
+
+def test_export_defaults_to_the_last_day():
+    name = f"export-{uuid.uuid4().hex[:8]}"
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        for age in (timedelta(hours=1), timedelta(hours=30)):
+            db.add(models.Action(name=name, input={"age_hours": age.total_seconds() / 3600}, result={}, success=True, created_at=now - age))
+        db.commit()
+    finally:
+        db.close()
+    lines = [json.loads(line) for line in client.get("/export/actions.ndjson").text.splitlines()]
+    assert [line["input"] for line in lines if line["name"] == name] == [{"age_hours": 1.0}]
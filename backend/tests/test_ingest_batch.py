@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+
+
+client = TestClient(app)
+
+
+def _point(i: int) -> dict:
+    return {"source": "test", "metric": "batch_cpu", "value": 10 + i, "timestamp": datetime.utcnow().isoformat(), "tags": {"i": i}}
+
+
+def test_batch_json_array_reports_rejections():
+    body = [_point(i) for i in range(5)] + [{"source": "test", "metric": "batch_cpu", "value": "not-a-number"}]
+    r = client.post("/metrics/batch", json=body)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["accepted"] == 5
+    assert data["rejected"] == 1
+    assert data["errors"][0]["index"] == 5
+
+
+def test_batch_ndjson_stream():
+    lines = [json.dumps(_point(i)) for i in range(3)] + ["{broken"]
+    r = client.post("/metrics/batch", content="\n".join(lines) + "\n", headers={"Content-Type": "application/x-ndjson"})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["accepted"] == 3
+    assert data["rejected"] == 1
+    assert data["errors"][0]["index"] == 3
+
+
+def test_batch_rejects_non_array():
+    r = client.post("/metrics/batch", json={"metric": "cpu"})
+    assert r.status_code == 400
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from backend.api import main
+from backend.common import models
+from backend.common.db import SessionLocal
+from backend.common.ingest import IngestBuffer, IngestBufferFull
+from backend.common.schemas import MetricIn
+
+
+client = TestClient(main.app)
+
+
+def _count(source: str) -> int:
+    db = SessionLocal()
+    try:
+        return db.query(models.Event).filter(models.Event.source == source).count()
+    finally:
+        db.close()
+
+
+def test_stop_flushes_buffered_points():
+    buf = IngestBuffer(capacity=100, flush_size=1000, flush_interval=60)
+    buf.start()
+    before = _count("buffer-test")
+    buf.offer([MetricIn(source="buffer-test", metric="buffer_flush", value=float(i)) for i in range(10)])
+    assert buf.stats()["depth"] == 10
+    buf.stop()
+    stats = buf.stats()
+    assert stats["depth"] == 0 and stats["flushed"] == 10
+    assert _count("buffer-test") == before + 10
+
+
+def test_offer_is_all_or_nothing_when_full():
+    buf = IngestBuffer(capacity=3, flush_size=10, flush_interval=60)
+    buf.offer([MetricIn(source="t", metric="buffer_full", value=1.0)] * 2)
+    try:
+        buf.offer([MetricIn(source="t", metric="buffer_full", value=1.0)] * 2)
+        raise AssertionError("expected IngestBufferFull")
+    except IngestBufferFull:
+        pass
+    assert buf.stats()["depth"] == 2
+    assert buf.stats()["dropped"] == 2
+
+
+def test_full_buffer_returns_429(monkeypatch):
+    buf = IngestBuffer(capacity=1, flush_size=10, flush_interval=60)
+    buf.start()
+    monkeypatch.setattr(main, "ingest_buffer", buf)
+    try:
+        point = {"source": "t", "metric": "buffer_429", "value": 1.0}
+        assert client.post("/metrics", json=point).json()["status"] == "queued"
+        r = client.post("/metrics", json=point)
+        assert r.status_code == 429
+        assert r.headers["Retry-After"]
+    finally:
+        buf.stop()
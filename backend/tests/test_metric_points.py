@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.common import models
+from backend.common.db import SessionLocal
+from backend.common.ingest import _series_ids, stage_metrics, tags_key, write_metrics
+from backend.common.schemas import MetricIn
+from backend.common.timeseries import latest_values, load_recent_series
+from backend.scripts.backfill_metric_points import backfill
+
+
+client = TestClient(app)
+
+
+def test_ingest_writes_typed_points():
+    r = client.post("/metrics", json={"source": "pt", "metric": "points_test", "value": 42.5, "tags": {"host": "a"}})
+    assert r.status_code == 200
+    db = SessionLocal()
+    try:
+        assert latest_values(db, "points_test", limit=1) == [42.5]
+        assert load_recent_series(db, minutes=5, metrics=["points_test"])["points_test"][-1][1] == 42.5
+    finally:
+        db.close()
+    assert "points_test" in client.get("/metrics/keys").json()
+
+
+def test_backfill_copies_metric_events():
+    ts = datetime.utcnow() - timedelta(minutes=1)
+    db = SessionLocal()
+    try:
+        db.add(models.Event(source="legacy", type="metric", payload={"metric": "backfill_test", "value": 7.0, "timestamp": ts.isoformat(), "tags": {}}))
+        db.commit()
+        copied = backfill(db, before=datetime.utcnow() + timedelta(seconds=1))
+        assert copied >= 1
+        assert 7.0 in latest_values(db, "backfill_test", limit=5)
+    finally:
+        db.close()
+
+
+def test_series_ids_are_shared_only_once_committed():
+    metric = f"points_{uuid.uuid4().hex[:8]}"
+    key = (metric, "pt", tags_key({}))
+    points = [MetricIn(source="pt", metric=metric, value=1.0)]
+    db = SessionLocal()
+    try:
+        # a writer that rolls back must not leave its new series id to the others
+        stage_metrics(db, points)
+        db.rollback()
+        assert key not in _series_ids
+        write_metrics(db, points)
+        series_id = _series_ids[key]
+        assert db.get(models.MetricSeries, series_id).metric == metric
+        assert latest_values(db, metric, limit=5) == [1.0]
+    finally:
+        db.close()
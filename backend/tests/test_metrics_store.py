@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime
+
+from backend.common.metrics_store import InfluxManager, _point, influx, query_recent_metrics_influx
+
+
+def test_batched_writes_reuse_one_client(fake_influx):
+    manager = InfluxManager(batch_size=1000, flush_interval_ms=100)
+    now = datetime.utcnow()
+    n = 20000
+    start = time.perf_counter()
+    for i in range(0, n, 500):
+        manager.write([_point("cpu", float(j), {"host": "h1"}, now) for j in range(i, i + 500)])
+    manager.close()
+    elapsed = time.perf_counter() - start
+    assert fake_influx.lines == n
+    # batched: far fewer HTTP requests than points
+    assert fake_influx.requests <= n // 1000 + 2
+    print(f"fake influx write throughput: {n / elapsed:.0f} points/s")
+
+
+def test_failed_batches_go_to_bounded_retry_queue(fake_influx):
+    fake_influx.fail_writes = True
+    manager = InfluxManager(batch_size=10, flush_interval_ms=50, max_retries=0, retry_queue_size=2)
+    for i in range(5):
+        manager.write([_point("cpu", float(j), None, None) for j in range(10)])
+    # every failed batch is either queued, dropped from the full queue, or was resubmitted
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        stats = manager.stats()
+        settled = stats["failed_batches"] == stats["dropped_batches"] + stats["retry_queue"] + stats["retried_batches"]
+        if stats["failed_batches"] >= 5 and settled:
+            break
+        time.sleep(0.05)
+    assert stats["retry_queue"] == 2
+    assert stats["dropped_batches"] >= 1
+    # once the backend recovers the queued batches are flushed on close
+    fake_influx.fail_writes = False
+    manager.close()
+    assert fake_influx.lines >= 20
+
+
+def test_query_uses_shared_client(fake_influx):
+    try:
+        assert query_recent_metrics_influx(5) == {}
+        assert influx.started
+    finally:
+        influx.close()
+
+
+def test_buffer_is_bounded_and_close_does_not_hang(fake_influx, monkeypatch):
+    manager = InfluxManager(batch_size=10, flush_interval_ms=50, buffer_size=30)
+    manager.timeout_ms = 200
+    release = threading.Event()
+    real_send = manager._send
+
+    def stuck_send(write_api, batch):
+        release.wait()
+        real_send(write_api, batch)
+
+    monkeypatch.setattr(manager, "_send", stuck_send)
+    manager.write([_point("cpu", float(j), None, None) for j in range(10)])
+    deadline = time.time() + 5
+    while manager.stats()["buffered"] and time.time() < deadline:
+        time.sleep(0.01)
+    # the writer is stuck on the first batch; the buffer keeps only the newest 30 points
+    for i in range(9):
+        manager.write([_point("cpu", float(j), None, None) for j in range(10)])
+    stats = manager.stats()
+    assert stats["buffered"] == 30 and stats["dropped_points"] == 60
+
+    start = time.perf_counter()
+    manager.close()
+    assert time.perf_counter() - start < 2
+    release.set()
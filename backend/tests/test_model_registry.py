@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.detector import algorithms
+from backend.detector.algorithms import isolation_forest_score
+from backend.detector.model_registry import ModelRegistry
+
+pytestmark = pytest.mark.skipif(not algorithms._SKLEARN, reason="scikit-learn not installed")
+
+
+def _points(values, start=None):
+    start = start or datetime(2026, 1, 1)
+    return [(start + timedelta(seconds=10 * i), float(v)) for i, v in enumerate(values)]
+
+
+def test_models_are_reused_refitted_in_the_pool_and_reloaded(tmp_path, monkeypatch):
+    fits = []
+    real_fit = algorithms.fit_isolation_forest
+
+    def counting_fit(values):
+        fits.append(len(values))
+        return real_fit(values)
+
+    monkeypatch.setattr("backend.detector.model_registry.fit_isolation_forest", counting_fit)
+    rng = np.random.default_rng(1)
+    values = rng.normal(20, 1, 90).tolist()
+    points = _points(values)
+    registry = ModelRegistry(model_dir=str(tmp_path), refit_seconds=3600, refit_samples=5, drift_sigma=3)
+
+    # first call fits inline and matches the per-call forest
+    assert registry.score("cpu", points) == isolation_forest_score(values)
+    assert fits == [90]
+    # same window again: nothing new, no fit and no rescoring
+    registry.score("cpu", points)
+    # a few new points: scored with the cached model
+    points += _points(rng.normal(20, 1, 3), points[-1][0] + timedelta(seconds=10))
+    registry.score("cpu", points[-90:])
+    assert fits == [90] and registry.get("cpu").samples_since == 3
+
+    # enough new points queue one background refit
+    points += _points(rng.normal(20, 1, 3), points[-1][0] + timedelta(seconds=10))
+    registry.score("cpu", points[-90:])
+    registry.wait()
+    assert fits == [90, 90] and registry.refits["samples"] == 1
+    assert registry.get("cpu").samples_since == 0 and registry.get("cpu").last_ts == points[-1][0]
+
+    # a level shift is drift
+    registry.refit_samples = 1000
+    shifted = points + _points(rng.normal(40, 1, 30), points[-1][0] + timedelta(seconds=10))
+    registry.score("cpu", shifted[-90:])
+    registry.wait()
+    assert registry.refits["drift"] == 1
+    registry.close()
+
+    # a new process loads the persisted model instead of fitting
+    restarted = ModelRegistry(model_dir=str(tmp_path), refit_samples=1000)
+    restarted.score("cpu", shifted[-90:])
+    assert len(fits) == 3 and restarted.loads == 1 and restarted.stats()["models"] == 1
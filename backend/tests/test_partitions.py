@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from backend.common.ingest import event_row
+from backend.common.partitions import EventPartitions
+
+
+def test_rows_land_in_day_files_and_retention_drops_them(tmp_path):
+    parts = EventPartitions(tmp_path)
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    rows = [
+        event_row("test", "metric", {"metric": "cpu", "value": float(i)}, created_at=today - timedelta(days=i))
+        for i in range(4)
+    ]
+    parts.insert_rows(rows)
+    assert len(parts.days()) == 4
+    assert (tmp_path / f"events_{today:%Y%m%d}.db").exists()
+
+    newest = parts.recent(2)
+    assert [r.payload["value"] for r in newest] == [0.0, 1.0]
+
+    # a range read only returns (and opens) the days it covers
+    in_range = list(parts.range(today - timedelta(days=1, hours=1), today + timedelta(hours=1)))
+    assert [r.payload["value"] for r in in_range] == [1.0, 0.0]
+
+    assert parts.drop_before(today - timedelta(days=1)) == 2
+    assert len(parts.days()) == 2
+    assert not (tmp_path / f"events_{today - timedelta(days=3):%Y%m%d}.db").exists()
+    assert len(parts.recent(10)) == 2
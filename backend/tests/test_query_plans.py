@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, delete, select, text
+
+from backend.common import models
+from backend.common.db import Base
+from backend.common.pagination import encode_cursor, keyset_page
+
+
+CUTOFF = datetime(2024, 1, 1)
+CURSOR = encode_cursor(CUTOFF, "00000000-0000-0000-0000-000000000000")
+
+# the statements behind the list endpoints, detector, policy engine, ops and retention
+QUERIES = {
+    "events_recent": select(models.Event).order_by(models.Event.created_at.desc()).limit(100),
+    "metric_events_since": select(models.Event).where(models.Event.type == "metric").where(models.Event.created_at >= CUTOFF).order_by(models.Event.created_at),
+    "anomalies_recent": select(models.Anomaly).where(models.Anomaly.created_at >= CUTOFF).order_by(models.Anomaly.created_at.desc()).limit(100),
+    "anomaly_dedup": select(models.Anomaly).where(models.Anomaly.metric == "cpu").where(models.Anomaly.severity == "high").where(models.Anomaly.created_at >= CUTOFF).limit(1),
+    "actions_recent": select(models.Action).order_by(models.Action.created_at.desc()).limit(100),
+    "actions_by_name": select(models.Action).where(models.Action.name == "rollout_undo").order_by(models.Action.created_at.desc()).limit(50),
+    "incidents_recent": select(models.Incident).order_by(models.Incident.created_at.desc()).limit(100),
+    "open_incidents": select(models.Incident).where(models.Incident.status == "open").where(models.Incident.title.ilike("%cpu%")).where(models.Incident.created_at >= CUTOFF).limit(1),
+    "points_range": select(models.MetricPoint.metric, models.MetricPoint.ts, models.MetricPoint.value).where(models.MetricPoint.metric.in_(["cpu", "mem"])).where(models.MetricPoint.ts >= CUTOFF).order_by(models.MetricPoint.metric, models.MetricPoint.ts),
+    "points_latest": select(models.MetricPoint.value).where(models.MetricPoint.metric == "cpu").order_by(models.MetricPoint.ts.desc()).limit(20),
+    "events_page": keyset_page(select(models.Event), models.Event.created_at, models.Event.id, CURSOR, 100),
+    "anomalies_page": keyset_page(select(models.Anomaly).where(models.Anomaly.created_at >= CUTOFF - timedelta(days=1)), models.Anomaly.created_at, models.Anomaly.id, CURSOR, 100),
+    "actions_page": keyset_page(select(models.Action), models.Action.created_at, models.Action.id, CURSOR, 100),
+    "incidents_page": keyset_page(select(models.Incident), models.Incident.created_at, models.Incident.id, CURSOR, 100),
+    "retention_events": delete(models.Event).where(models.Event.created_at < CUTOFF - timedelta(days=7)),
+    "retention_anomalies": delete(models.Anomaly).where(models.Anomaly.created_at < CUTOFF),
+    "retention_actions": delete(models.Action).where(models.Action.created_at < CUTOFF),
+    "retention_incidents": delete(models.Incident).where(models.Incident.created_at < CUTOFF),
+}
+
+_FULL_SCAN = re.compile(r"^SCAN \w+$")
+
+
+@pytest.fixture(scope="module")
+def engine():
+    eng = create_engine("sqlite://")
+    Base.metadata.create_all(bind=eng)
+    return eng
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+def test_hot_queries_use_indexes(engine, name):
+    sql = str(QUERIES[name].compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    assert not [p for p in plan if _FULL_SCAN.match(p)], f"{name} falls back to a full scan: {plan}"
+    assert not [p for p in plan if "TEMP B-TREE FOR ORDER BY" in p], f"{name} sorts outside an index: {plan}"
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from backend.common import models
+from backend.common.db import SessionLocal
+from backend.common.ingest import write_metrics
+from backend.common.retention import RetentionWorker
+from backend.common.schemas import MetricIn
+
+
+def test_retention_deletes_old_rows_in_chunks():
+    metric = f"retention_{uuid.uuid4().hex[:8]}"
+    now = datetime.utcnow()
+    old = [MetricIn(source="test", metric=metric, value=float(i), timestamp=now - timedelta(days=30, seconds=i)) for i in range(25)]
+    fresh = [MetricIn(source="test", metric=metric, value=1.0, timestamp=now - timedelta(minutes=1))]
+    db = SessionLocal()
+    try:
+        write_metrics(db, old + fresh)
+    finally:
+        db.close()
+
+    worker = RetentionWorker(chunk_size=10, pause_seconds=0)
+    run = worker.run_once(now=now)
+    points = next(t for t in run.tables if t.table == "metric_points")
+    assert points.deleted >= 25
+    assert points.chunks >= 3  # 25 old points at 10 per transaction
+    assert points.blocked_seconds <= points.elapsed_seconds
+    assert run.as_dict()["deleted"] >= 25
+
+    db = SessionLocal()
+    try:
+        remaining = db.execute(
+            select(func.count()).select_from(models.MetricPoint).where(models.MetricPoint.metric == metric)
+        ).scalar_one()
+        old_rollups = db.execute(
+            select(func.count()).select_from(models.MetricRollup)
+            .where(models.MetricRollup.metric == metric, models.MetricRollup.tier == 60)
+            .where(models.MetricRollup.bucket < now - timedelta(days=7))
+        ).scalar_one()
+    finally:
+        db.close()
+    assert remaining == 1
+    assert old_rollups == 0
+
+
+def test_rollups_are_pruned_in_bounded_chunks(monkeypatch):
+    metric = f"retention_{uuid.uuid4().hex[:8]}"
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        # one minute bucket per point
+        write_metrics(db, [MetricIn(source="test", metric=metric, value=1.0, timestamp=now - timedelta(days=30, minutes=i)) for i in range(25)])
+    finally:
+        db.close()
+    worker = RetentionWorker(chunk_size=10, pause_seconds=0)
+    monkeypatch.setattr(worker, "_metrics", lambda: [metric])
+    rollups = next(t for t in worker.run_once(now=now).tables if t.table == "metric_rollups_1m")
+    assert (rollups.deleted, rollups.chunks) == (25, 3)
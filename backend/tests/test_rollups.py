@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+from backend.common.db import SessionLocal
+from backend.common.rollups import bucket_start, choose_tier, rollup_rows
+
+
+client = TestClient(app)
+
+METRIC = f"rollup_{uuid.uuid4().hex[:8]}"
+
+
+def test_rollups_update_incrementally():
+    base = bucket_start(datetime.utcnow() - timedelta(minutes=5), 60)
+    values = [(base + timedelta(seconds=40), 3.0), (base + timedelta(seconds=10), 1.0), (base + timedelta(seconds=20), 8.0)]
+    for ts, v in values:  # one request per point, late point in the middle
+        r = client.post("/metrics", json={"source": "test", "metric": METRIC, "value": v, "timestamp": ts.isoformat()})
+        assert r.status_code == 200
+    db = SessionLocal()
+    try:
+        rows = rollup_rows(db, METRIC, 60, base)
+        row = next(r for r in rows if r.bucket == base)
+        assert (row.count, row.sum_value, row.min_value, row.max_value) == (3, 12.0, 1.0, 8.0)
+        assert row.last_value == 3.0  # latest timestamp wins, not latest arrival
+        assert sum(r.count for r in rollup_rows(db, METRIC, 3600, base)) >= 3
+    finally:
+        db.close()
+
+
+def test_choose_tier_respects_point_budget():
+    assert choose_tier(15, 1000, raw_points=800) == 0
+    assert choose_tier(24 * 60, 1500, raw_points=170000) == 60
+    assert choose_tier(24 * 60, 300, raw_points=170000) == 300
+    assert choose_tier(7 * 24 * 60, 200, raw_points=10**6) == 3600
+
+
+def test_recent_endpoint_downsamples():
+    r = client.get("/metrics/recent", params={"metric": METRIC, "minutes": 10, "max_points": 1})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["resolution"] != "raw"
+    assert all("count" in p for p in data["points"])
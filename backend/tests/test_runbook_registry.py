@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from ruamel.yaml.error import YAMLError
+from sqlalchemy import event
+
+from backend.api.main import app
+from backend.common import models
+from backend.common.db import SessionLocal, read_engine
+from backend.remediator.executor import execute_runbook
+from backend.remediator.registry import runbook_registry
+
+client = TestClient(app)
+
+
+def _write(path, name: str, service: str) -> None:
+    path.write_text(f"name: {name}\nservice: {service}\nowner: team-{service}\nsteps:\n  - run: echo {name}\n", encoding="utf-8")
+
+
+def test_runbooks_parse_once_and_stats_take_one_query(tmp_path, monkeypatch):
+    for i in range(40):
+        _write(tmp_path / f"rb_{i:02d}.yml", f"rb_{i:02d}", f"svc{i % 4}")
+    monkeypatch.setattr(runbook_registry, "base", tmp_path)
+    monkeypatch.setattr(runbook_registry, "rescan_seconds", 0)
+    runbook_registry.invalidate()
+
+    base = datetime.utcnow() - timedelta(hours=1)
+    db = SessionLocal()
+    try:
+        db.add_all([
+            models.Action(name="rb_00", input={}, result={}, success=(i % 3 != 0), created_at=base + timedelta(minutes=i))
+            for i in range(60)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(read_engine, "before_cursor_execute", listener)
+    try:
+        items = client.get("/runbooks").json()
+    finally:
+        event.remove(read_engine, "before_cursor_execute", listener)
+    assert len(items) == 40 and len(statements) == 1
+    by_name = {item["name"]: item for item in items}
+    # latest 50 of 60 actions: i = 10..59, every third one failed
+    assert by_name["rb_00"]["recent_success_rate"] == 34 / 50
+    assert by_name["rb_00"]["last_success_at"] == (base + timedelta(minutes=59)).isoformat()
+    assert by_name["rb_01"]["recent_success_rate"] is None
+
+    parses = runbook_registry.parses
+    services = client.get("/services").json()
+    client.get("/runbooks")
+    assert runbook_registry.parses == parses
+    assert [s["service"] for s in services] == ["svc0", "svc1", "svc2", "svc3"] and len(services[0]["runbooks"]) == 10
+
+    # an edit re-parses only that file; additions and removals are picked up too
+    edited = tmp_path / "rb_05.yml"
+    _write(edited, "rb_05", "payments")
+    st = edited.stat()
+    os.utime(edited, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    _write(tmp_path / "rb_new.yml", "rb_new", "svc0")
+    (tmp_path / "rb_39.yml").unlink()
+    names = {s["service"]: s["runbooks"] for s in client.get("/services").json()}
+    assert runbook_registry.parses == parses + 2
+    assert names["payments"] == ["rb_05"] and "rb_new" in names["svc0"] and "rb_39" not in names["svc3"]
+    assert runbook_registry.document("rb_05")["service"] == "payments"
+    runbook_registry.invalidate()
+
+
+def test_broken_runbook_is_listed_but_cannot_be_executed(tmp_path, monkeypatch):
+    (tmp_path / "broken.yml").write_text("name: broken\nsteps: [\n  - run: echo hi\n", encoding="utf-8")
+    monkeypatch.setattr(runbook_registry, "base", tmp_path)
+    monkeypatch.setattr(runbook_registry, "rescan_seconds", 0)
+    runbook_registry.invalidate()
+    try:
+        assert [item["name"] for item in runbook_registry.items()] == ["broken"]
+        with pytest.raises(YAMLError):
+            execute_runbook("broken", {"approved": True})
+        # cached: still raising without a re-parse
+        with pytest.raises(YAMLError):
+            runbook_registry.document("broken")
+    finally:
+        runbook_registry.invalidate()
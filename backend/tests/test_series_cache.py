@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backend.common.db import SessionLocal
+from backend.common.series_cache import RingBuffer, SeriesCache
+
+
+def test_ring_buffer_wraps_and_reorders_late_points():
+    buf = RingBuffer(capacity=4, complete_since=0.0)
+    for t in [1.0, 2.0, 4.0, 3.0, 5.0]:
+        buf.append(t, t * 10)
+    ts, values = buf.since(0.0)
+    assert ts.tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert values.tolist() == [20.0, 30.0, 40.0, 50.0]
+    # the overwritten point moves the completeness horizon forward
+    assert buf.complete_since == 1.0
+    assert buf.tail(2)[1].tolist() == [40.0, 50.0]
+
+
+def test_cache_serves_covered_ranges_and_falls_back_otherwise():
+    cache = SeriesCache(capacity=3, max_series=1)
+    assert cache.window("cpu", datetime.utcnow()) is None  # not warmed
+    db = SessionLocal()
+    try:
+        cache.warm(db, minutes=1)
+    finally:
+        db.close()
+    cache.clear()
+    now = datetime.utcnow()
+    cache.append_many([("cpu", now + timedelta(seconds=i), float(i)) for i in range(5)])
+    window = cache.window("cpu", now + timedelta(seconds=3))
+    assert window is not None
+    np.testing.assert_array_equal(window[1], [3.0, 4.0])
+    # older than what the 3-point ring still holds -> caller must hit the DB
+    assert cache.window("cpu", now) is None
+    # second metric exceeds max_series: never cached, always a miss
+    cache.append_many([("mem", now, 1.0)])
+    assert cache.window("mem", now + timedelta(seconds=1)) is None
+    assert cache.stats()["bytes"] == 3 * 16
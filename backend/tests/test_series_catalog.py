@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from backend.api.main import app
+
+
+client = TestClient(app)
+
+
+def test_catalog_tracks_series_and_filters_keys():
+    now = datetime.utcnow()
+    batch = [
+        {"source": "cat-a", "metric": "catalog.cpu", "value": 1.0, "timestamp": (now - timedelta(minutes=3)).isoformat()},
+        {"source": "cat-a", "metric": "catalog.cpu", "value": 2.0, "timestamp": (now - timedelta(minutes=1)).isoformat()},
+        {"source": "cat-b", "metric": "catalog.mem", "value": 3.0, "timestamp": (now - timedelta(days=2)).isoformat()},
+    ]
+    r = client.post("/metrics/batch", json=batch)
+    assert r.status_code == 200
+    client.get("/metrics/keys")  # load the catalog, then check it follows further ingest
+    r = client.post("/metrics", json={"source": "cat-a", "metric": "catalog.cpu", "value": 4.0, "timestamp": now.isoformat()})
+    assert r.status_code == 200
+
+    keys = client.get("/metrics/keys", params={"prefix": "catalog."}).json()
+    assert keys == ["catalog.cpu", "catalog.mem"]
+    assert client.get("/metrics/keys", params={"prefix": "catalog.", "source": "cat-b"}).json() == ["catalog.mem"]
+    assert client.get("/metrics/keys", params={"prefix": "catalog.", "active_minutes": 60}).json() == ["catalog.cpu"]
+
+    series = client.get("/metrics/series", params={"prefix": "catalog.cpu"}).json()
+    assert len(series) == 1
+    assert series[0]["point_count"] >= 3
+    assert series[0]["first_seen"] < series[0]["last_seen"]
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from backend.api.main import app
+from backend.common import models
+from backend.common.db import SessionLocal
+from backend.common.ingest import write_metrics
+from backend.common.quantiles import sketch_lock_keys
+from backend.common.schemas import MetricIn
+from backend.common.sketch import DDSketch
+
+client = TestClient(app)
+
+QS = (0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 0.999)
+
+
+def _exact(values: np.ndarray, q: float) -> float:
+    return float(np.sort(values)[int(np.floor(q * (len(values) - 1)))])
+
+
+def _assert_within(sketch: DDSketch, values: np.ndarray, alpha: float) -> None:
+    for q, est in zip(QS, sketch.quantiles(QS)):
+        exact = _exact(values, q)
+        assert abs(est - exact) <= alpha * abs(exact) + 1e-12, (q, est, exact)
+
+
+def test_relative_accuracy_holds_for_single_merged_and_decoded_sketches():
+    rng = np.random.default_rng(3)
+    latency = rng.lognormal(3, 1.2, 100_000)
+    signed = np.concatenate([rng.normal(0, 50, 20_000), np.zeros(100)])
+    for alpha in (0.01, 0.02):
+        for values in (latency, signed):
+            _assert_within(DDSketch(alpha).add(values), values, alpha)
+            merged = DDSketch(alpha).merge_many([DDSketch(alpha).add(part) for part in np.array_split(values, 97)])
+            _assert_within(merged, values, alpha)
+            _assert_within(DDSketch.from_bytes(merged.to_bytes()), values, alpha)
+
+    sketch = DDSketch(0.01).add(latency)
+    assert sketch.quantiles([0.0, 1.0]) == [latency.min(), latency.max()]
+    assert sketch.bins < 1000 and len(sketch.to_bytes()) < 12 * sketch.bins + 64
+    # collapsing the lowest bins only costs accuracy at the bottom
+    capped = DDSketch(0.01, max_bins=200).add(latency)
+    assert capped.bins == 200 and capped.count == len(latency)
+    assert abs(capped.quantile(0.99) - _exact(latency, 0.99)) <= 0.01 * _exact(latency, 0.99)
+    assert DDSketch().quantile(0.5) is None
+
+
+def test_quantiles_endpoint_merges_minute_and_hour_buckets():
+    metric = f"sketch_{uuid.uuid4().hex[:8]}"
+    rng = np.random.default_rng(5)
+    now = datetime.utcnow()
+    values = rng.lognormal(4, 0.8, 1000)
+    db = SessionLocal()
+    try:
+        write_metrics(db, [
+            MetricIn(source="test", metric=metric, value=float(v), timestamp=now - timedelta(seconds=9 * i + 1))
+            for i, v in enumerate(values)
+        ])
+    finally:
+        db.close()
+
+    r = client.get("/metrics/quantiles", params={"metric": metric, "q": "0.5,0.95,0.99", "window": "3h"})
+    assert r.status_code == 200
+    series = r.json()["series"][0]
+    assert series["count"] == 1000
+    for q in (0.5, 0.95, 0.99):
+        exact = _exact(values, q)
+        assert abs(series["quantiles"][str(q)] - exact) <= 0.01 * exact
+
+    assert client.get("/metrics/quantiles", params={"metric": metric, "q": "1.5"}).status_code == 400
+    assert set(client.get("/slo").json()) == {"availability_pct", "latency_p95_ms", "target_slo_pct", "error_budget_remaining_pct"}
+
+
+def test_concurrent_ingest_loses_no_sketch_updates():
+    metric = f"sketch_{uuid.uuid4().hex[:8]}"
+    ts = datetime.utcnow().replace(second=30, microsecond=0)  # every point in the same buckets
+
+    def ingest(n: int) -> None:
+        db = SessionLocal()
+        try:
+            for _ in range(10):
+                write_metrics(db, [MetricIn(source=f"t{n}", metric=metric, value=float(n + 1), timestamp=ts) for _ in range(5)])
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=ingest, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    db = SessionLocal()
+    try:
+        counts = db.execute(select(models.MetricSketch.tier, models.MetricSketch.count).where(models.MetricSketch.metric == metric)).all()
+    finally:
+        db.close()
+    assert sorted(counts) == [(60, 400), (3600, 400)]
+
+
+def test_sketch_lock_keys_are_per_sketch_int4_pairs_in_a_fixed_order():
+    minute = datetime(2026, 1, 1, 12, 30)
+    keys = [("cpu", 60, minute), ("cpu", 60, minute + timedelta(minutes=1)), ("cpu", 3600, minute.replace(minute=0)), ("mem", 60, minute)]
+    locks = sketch_lock_keys(keys)
+    assert len(set(locks)) == 4 and locks == sorted(locks) == sketch_lock_keys(reversed(keys))
+    assert all(-(1 << 31) <= k < (1 << 31) for pair in locks for k in pair)
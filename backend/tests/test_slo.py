@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from backend.api.main import app
+from backend.common import models
+from backend.common.db import SessionLocal
+from backend.common.ingest import write_metrics
+from backend.common.schemas import MetricIn
+from backend.slo.config import load_slos
+from backend.slo.engine import SloEngine, slo_engine
+
+client = TestClient(app)
+
+
+def _write(metric: str, points) -> None:
+    db = SessionLocal()
+    try:
+        write_metrics(db, [MetricIn(source="test", metric=metric, value=v, timestamp=ts) for ts, v in points])
+    finally:
+        db.close()
+
+
+def _config(tmp_path, errors: str, latency: str) -> str:
+    path = tmp_path / "slos.yml"
+    path.write_text(
+        "slos:\n"
+        f"  - {{name: avail, metric: {errors}, kind: error_rate, objective: 99, window: 1d}}\n"
+        f"  - {{name: fast, metric: {latency}, kind: threshold, threshold: 500, objective: 90, window: 1d}}\n"
+        "alerts:\n"
+        "  - {long: 1h, short: 5m, burn_rate: 10, severity: critical}\n"
+    )
+    return str(path)
+
+
+def test_config_validation(tmp_path):
+    slos, rules = load_slos(_config(tmp_path, "e", "l"))
+    assert [s.window_minutes for s in slos] == [1440, 1440]
+    assert slos[0].budget == pytest.approx(0.01) and rules[0].label == "1h/5m"
+    bad = tmp_path / "bad.yml"
+    bad.write_text("slos:\n  - {name: x, metric: m, kind: threshold, objective: 99}\n")
+    with pytest.raises(ValueError):
+        load_slos(str(bad))
+
+
+def test_incremental_burn_rates_and_alert_pipeline(tmp_path):
+    tag = uuid.uuid4().hex[:8]
+    errors, latency = f"slo_err_{tag}", f"slo_lat_{tag}"
+    engine = SloEngine(_config(tmp_path, errors, latency), resync_seconds=3600)
+    minute = datetime.utcnow().replace(second=0, microsecond=0)
+    t0 = minute - timedelta(minutes=30) + timedelta(seconds=30)
+
+    # an hour of clean traffic, 3 of 10 latency samples over the threshold
+    _write(errors, [(t0 - timedelta(minutes=i), 0.0) for i in range(1, 61)])
+    _write(latency, [(t0 - timedelta(minutes=i), 100.0 if i > 3 else 900.0) for i in range(1, 11)])
+    db = SessionLocal()
+    try:
+        avail, fast = engine.status(db, t0)
+        assert avail.total == 60 and avail.burn_rates[60] == 0 and avail.budget_remaining_pct == 100
+        assert fast.bad == 3 and fast.compliance_pct == pytest.approx(70)
+        assert not avail.firing
+        synced = engine.states["avail"].synced_at
+
+        # twenty minutes of every request failing, read incrementally
+        t1 = t0 + timedelta(minutes=20)
+        _write(errors, [(t1 - timedelta(minutes=i), 100.0) for i in range(1, 21)])
+        avail = engine.status(db, t1)[0]
+        assert engine.states["avail"].synced_at == synced
+        assert avail.burn_rates[5] == pytest.approx(100.0)
+        assert avail.burn_rates[60] == pytest.approx(20 / 59 / 0.01)
+        assert avail.budget_remaining_pct == 0 and [f["rule"] for f in avail.firing] == ["1h/5m"]
+
+        # a full re-read agrees with the incremental state
+        full = SloEngine(engine.path).status(db, t1)[0]
+        assert full.burn_rates == avail.burn_rates and full.total == avail.total
+    finally:
+        db.close()
+
+    engine.run_once(t1)
+    engine.run_once(t1)  # still firing: no second alert
+    db = SessionLocal()
+    try:
+        rows = db.execute(select(models.Anomaly).where(models.Anomaly.metric == errors)).scalars().all()
+        assert len(rows) == 1
+        assert rows[0].severity == "critical" and rows[0].details["method"] == "slo_burn_rate"
+        assert rows[0].details["slo"] == "avail" and rows[0].incident_id is not None
+    finally:
+        db.close()
+
+
+def test_slo_endpoints(monkeypatch):
+    # requests evaluate the in-memory windows; only the SLO loop reads the database
+    def refresh(*args, **kwargs):
+        raise AssertionError("refreshed inside a request")
+
+    monkeypatch.setattr(slo_engine, "refresh", refresh)
+    body = client.get("/slo/status").json()
+    assert {s["name"] for s in body["slos"]} == {"availability", "latency"}
+    assert set(body["slos"][0]["burn_rates"]) >= {"5m", "60m", "360m", "4320m"}
+    assert set(client.get("/slo").json()) == {"availability_pct", "latency_p95_ms", "target_slo_pct", "error_budget_remaining_pct"}
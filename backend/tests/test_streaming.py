@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from statistics import mean, median, pstdev
+
+import numpy as np
+import pytest
+
+from backend.common import models
+from backend.common.config import settings
+from backend.common.db import SessionLocal
+from backend.common.ingest import write_metrics
+from backend.common.schemas import MetricIn
+from backend.detector.algorithms import mad_anomaly_score, rolling_zscore
+from backend.detector.detector import run_detection_cycle
+from backend.detector.streaming import P2Quantile, StreamingDetector, StreamingSeries, streaming_detector
+
+
+def test_running_moments_are_exact_until_the_span_then_track_the_window():
+    rng = np.random.default_rng(7)
+    values = rng.normal(50, 5, 3000).tolist()
+    state = StreamingSeries(span=200)
+    for v in values[:150]:
+        state.observe(None, v)
+    assert state.mean == pytest.approx(mean(values[:150]))
+    assert state.var == pytest.approx(pstdev(values[:150]) ** 2)
+
+    for v in values[150:]:
+        state.observe(None, v)
+    window = values[-200:]
+    assert state.mean == pytest.approx(mean(window), abs=0.1 * pstdev(window))
+    assert state.var ** 0.5 == pytest.approx(pstdev(window), rel=0.1)
+
+    p2 = P2Quantile()
+    for v in values:
+        p2.add(v)
+    assert p2.value == pytest.approx(median(values), abs=0.05 * pstdev(values))
+
+
+def test_streaming_scores_match_batch_detectors():
+    rng = np.random.default_rng(11)
+    baseline = rng.normal(20, 1, 120).tolist()
+    for spike in (26.0, 35.0, 5.0):
+        values = baseline + [spike]
+        state = StreamingSeries(span=len(baseline))
+        for v in baseline:
+            state.observe(None, v)
+        assert state.zscore(spike) == pytest.approx(rolling_zscore(values), rel=0.01)
+        assert state.modified_zscore(spike) == pytest.approx(mad_anomaly_score(values), rel=0.1)
+        assert state.observe(None, spike) is not None
+    # in-range points do not fire
+    state = StreamingSeries(span=120)
+    fired = [state.observe(None, v) for v in baseline]
+    assert sum(f is not None for f in fired[10:]) <= 2
+
+
+def test_take_pending_reports_the_strongest_crossing_since_the_last_take():
+    detector = StreamingDetector(span=120)
+    baseline = [20.0 + 0.1 * (i % 5) for i in range(30)]
+    detector.observe_many(("cpu", None, v) for v in baseline + [95.0, 40.0, 20.1, 20.2])
+    pending = detector.take_pending()
+    # the spike, not the later, weaker crossing or the point back at normal
+    assert [(p["metric"], p["latest"]) for p in pending] == [("cpu", 95.0)]
+    assert pending[0]["method"] == "streaming_zscore" and pending[0]["mean"] == pytest.approx(mean(baseline))
+    assert detector.take_pending() == []
+    detector.observe("cpu", None, 20.1)
+    assert detector.take_pending() == []
+
+
+def test_streaming_mode_detects_on_ingest(monkeypatch):
+    monkeypatch.setattr(settings, "detector_mode", "streaming")
+    streaming_detector.clear()
+    streaming_detector.warmed = True
+    now = datetime.utcnow()
+    metric = "stream_cpu"
+    db = SessionLocal()
+    try:
+        points = [20.0 + 0.1 * (i % 5) for i in range(30)] + [95.0]
+        write_metrics(db, [
+            MetricIn(source="test", metric=metric, value=v, timestamp=now - timedelta(seconds=len(points) - i))
+            for i, v in enumerate(points)
+        ])
+        assert streaming_detector.get(metric).n == len(points)
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(run_detection_cycle())
+        finally:
+            loop.close()
+        anomaly = db.query(models.Anomaly).filter(models.Anomaly.metric == metric).order_by(models.Anomaly.id.desc()).first()
+        assert anomaly is not None and anomaly.details["method"] == "streaming_zscore"
+        assert anomaly.severity == "critical" and anomaly.details["latest"] == 95.0
+        # scored once: nothing pending until new points arrive
+        assert streaming_detector.take_pending() == []
+    finally:
+        db.close()
+        streaming_detector.clear()
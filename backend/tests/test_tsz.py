@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import func, select
+
+from backend.common import models, tsz
+from backend.common.compaction import Compactor
+from backend.common.db import SessionLocal
+from backend.common.ingest import write_metrics
+from backend.common.schemas import MetricIn
+from backend.common.timeseries import latest_values, recent_window
+
+
+def test_roundtrip_is_bit_exact():
+    rng = np.random.default_rng(7)
+    ts = (1_700_000_000_000 + np.cumsum(rng.integers(995, 1005, 500))).astype(np.int64)
+    cases = [
+        np.round(40 + np.cumsum(rng.normal(0, 0.5, 500)), 2),
+        np.full(500, 1.5),
+        rng.normal(0, 1e6, 500),
+        np.array([np.nan, np.inf, -np.inf, -0.0, 5e-324] + [0.0] * 495),
+    ]
+    for values in cases:
+        out_ts, out_values = tsz.decode(tsz.encode(ts, values))
+        assert np.array_equal(out_ts, ts)
+        assert np.array_equal(out_values.view(np.int64), values.view(np.int64))
+    wide = np.array([-5, 0, 10**13, 10**13 + 1], dtype=np.int64)  # exercises the 64-bit dod bucket
+    assert np.array_equal(tsz.decode(tsz.encode(wide, np.zeros(4)))[0], wide)
+    assert len(tsz.decode(tsz.encode(np.empty(0, dtype=np.int64), np.empty(0)))[0]) == 0
+
+
+def test_regular_series_compresses_well():
+    ts = 1_700_000_000_000 + np.arange(1024, dtype=np.int64) * 1000
+    assert len(tsz.encode(ts, np.full(1024, 42.0))) / 1024 < 1.5
+
+
+def test_compaction_moves_old_points_into_chunks():
+    metric = f"tsz_{uuid.uuid4().hex[:8]}"
+    now = datetime.utcnow()
+    points = [
+        MetricIn(source="test", metric=metric, value=float(i), timestamp=now - timedelta(minutes=200) + timedelta(seconds=10 * i))
+        for i in range(100)
+    ]
+    db = SessionLocal()
+    try:
+        write_metrics(db, points)
+        before = recent_window(db, metric, 300)
+        # three full chunks; the 4-point tail is younger than the tail cutoff and stays raw
+        run = Compactor(age_minutes=30, chunk_points=32, tail_age_minutes=1440).run_once(now=now)
+        assert run.points >= 96 and run.chunks >= 3
+        raw = select(func.count()).select_from(models.MetricPoint).where(models.MetricPoint.metric == metric)
+        assert db.execute(raw).scalar_one() == 4
+        run = Compactor(age_minutes=30, chunk_points=32, tail_age_minutes=120).run_once(now=now)
+        assert run.points >= 4 and run.chunks >= 1
+        assert db.execute(raw).scalar_one() == 0
+        after = recent_window(db, metric, 300)
+        assert np.allclose(after[0], before[0], atol=1e-3)
+        assert np.array_equal(after[1], before[1])
+        assert latest_values(db, metric, 3) == [99.0, 98.0, 97.0]
+    finally:
+        db.close()